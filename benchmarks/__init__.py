@@ -0,0 +1 @@
+"""Performance benchmarks for the life_expectancy pipeline"""
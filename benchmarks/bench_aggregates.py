@@ -0,0 +1,98 @@
+"""Benchmark queries answered by an AggregateCube against the detail rows.
+
+Answers "EU mean, min and max by year for a sex and age", "sex gap of a
+region by year" and "yearly changes of a region" by grouping the cleaned
+rows of every region, the way a consumer of the region outputs would, and
+with lookups in the cube built from them.
+
+Usage:
+    python -m benchmarks.bench_aggregates [--input-file path/to/file.tsv]
+        [--queries N]
+"""
+
+import argparse
+import logging
+from pathlib import Path
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from life_expectancy.aggregates import AggregateCube
+from life_expectancy.main import PipelineOptions, load_cleaned_by_region
+from life_expectancy.tests import FIXTURES_DIR
+
+
+def per_query_ms(func: Callable[[int], object], n_queries: int) -> float:
+    """Mean time of `func(i)` for i in range(n_queries), in milliseconds"""
+    start = time.perf_counter()
+    for i in range(n_queries):
+        func(i)
+    return (time.perf_counter() - start) / n_queries * 1e3
+
+
+def time_detail_rows(df: pd.DataFrame, regions: np.ndarray, n_queries: int) -> None:
+    """Time the queries computed from the detail rows"""
+
+    def by_year(_: int) -> pd.DataFrame:
+        rows = df[(df["sex"] == "T") & (df["age"] == "Y65")]
+        return rows.groupby("year")["value"].agg(["mean", "min", "max", "count"])
+
+    def gap(i: int) -> pd.Series:
+        rows = df[(df["region"] == regions[i]) & (df["age"] == "Y65")]
+        values = rows.pivot_table("value", "year", "sex", observed=True)
+        return values["F"] - values["M"]
+
+    def changes(i: int) -> pd.Series:
+        rows = df[
+            (df["region"] == regions[i]) & (df["sex"] == "T") & (df["age"] == "Y65")
+        ]
+        return rows.set_index("year")["value"].sort_index().diff()
+
+    queries: Dict[str, Callable[[int], object]] = {
+        "mean by year": by_year,
+        "sex gap": gap,
+        "changes": changes,
+    }
+    for name, query in queries.items():
+        print(f"{name + ', rows':<24} {per_query_ms(query, n_queries):>10.3f} ms")
+
+
+def time_cube(cube: AggregateCube, regions: np.ndarray, n_queries: int) -> None:
+    """Time the queries answered by the cube"""
+    queries: Dict[str, Callable[[int], object]] = {
+        "mean by year": lambda i: cube.regions_by_year("T", "Y65"),
+        "sex gap": lambda i: cube.gap(regions[i], "Y65"),
+        "changes": lambda i: cube.yearly_changes(regions[i], "T", "Y65"),
+    }
+    for name, query in queries.items():
+        print(f"{name + ', cube':<24} {per_query_ms(query, n_queries):>10.3f} ms")
+
+
+def main() -> None:
+    """Run the benchmark and print the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--input-file", type=Path, default=FIXTURES_DIR / "eu_life_expectancy_raw.tsv"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    _, df_by_region = load_cleaned_by_region(
+        None, args.input_file, args.input_file.suffix.lower(), PipelineOptions()
+    )
+    df = pd.concat(df_by_region.values(), ignore_index=True)
+    start = time.perf_counter()
+    cube = AggregateCube.from_cleaned(df_by_region.values())
+    print(f"rows: {len(df):,}, cube built in {time.perf_counter() - start:.3f} s")
+
+    present = [region.value for region in df_by_region]
+    regions = np.random.default_rng(0).choice(present, args.queries)
+    time_detail_rows(df, regions, args.queries)
+    time_cube(cube, regions, args.queries)
+
+
+if __name__ == "__main__":
+    main()
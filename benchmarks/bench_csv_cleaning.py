@@ -0,0 +1,106 @@
+"""Benchmark CSVCleaningStrategy.clean on a full-size Eurostat TSV.
+
+Times the vectorized cleaning against the previous melt + regex implementation
+(kept below as `legacy_clean`) and checks both produce the same frame.
+
+Usage:
+    python -m benchmarks.bench_csv_cleaning [--input-file path/to/file.tsv]
+
+Without --input-file a synthetic TSV with the shape of the Eurostat extract
+(1 unit x 3 sexes x 86 ages x 56 regions, 62 years) is generated.
+"""
+
+import argparse
+import logging
+import time
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, List
+
+import numpy as np
+import pandas as pd
+
+from life_expectancy.data_cleaning import CSVCleaningStrategy
+
+COMPOSED_COL = "unit,sex,age,geo\\time"
+DECOMPOSED_COLS = ["unit", "sex", "age", "region"]
+
+
+def synthetic_tsv(
+    n_ages: int = 86, n_regions: int = 56, n_years: int = 62, seed: int = 0
+) -> str:
+    """Build a TSV shaped like the Eurostat life expectancy extract"""
+    rng = np.random.default_rng(seed)
+    ages = ["Y_LT1"] + [f"Y{i}" for i in range(1, n_ages - 1)] + ["Y_GE85"]
+    regions = [f"{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(n_regions)]
+    keys = [
+        f"YR,{sex},{age},{region}"
+        for sex in ("F", "M", "T")
+        for age in ages[:n_ages]
+        for region in regions
+    ]
+    years = [f"{2021 - i} " for i in range(n_years)]
+    values = rng.uniform(1, 90, size=(len(keys), n_years)).round(1).astype(str)
+    flags = rng.choice(["", " e", " p", " b", " ep"], size=values.shape)
+    cells = np.char.add(values, flags)
+    cells[rng.random(values.shape) < 0.2] = ": "
+    lines = ["\t".join([COMPOSED_COL] + years)]
+    lines += ["\t".join([key] + list(row)) for key, row in zip(keys, cells)]
+    return "\n".join(lines) + "\n"
+
+
+def legacy_clean(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """The melt + regex implementation the vectorized version replaced"""
+    df_raw = df_raw.copy()
+    df_raw[DECOMPOSED_COLS] = df_raw[COMPOSED_COL].str.split(",", expand=True)
+    df_raw = df_raw.drop(columns=[COMPOSED_COL])
+    df_final = pd.melt(df_raw, id_vars=DECOMPOSED_COLS, var_name="year")
+    for col in ["unit", "sex", "age", "region"]:
+        df_final[col] = df_final[col].astype("str")
+    df_final["year"] = df_final["year"].astype("int")
+    df_final["value"] = pd.to_numeric(
+        df_final["value"].astype(str).str.extract(r"(\d+(?:\.\d+)?)", expand=False)
+    )
+    return df_final
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    """Best wall time in seconds over `repeat` runs"""
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the benchmark and print the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input-file", type=Path, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    if args.input_file is None:
+        source = StringIO(synthetic_tsv())
+    else:
+        source = args.input_file
+    df_raw = pd.read_csv(source, sep="\t", na_values=[":"])
+
+    strategy = CSVCleaningStrategy(COMPOSED_COL, DECOMPOSED_COLS)
+    pd.testing.assert_frame_equal(strategy.clean(df_raw), legacy_clean(df_raw))
+
+    legacy = best_of(lambda: legacy_clean(df_raw), args.repeat)
+    vectorized = best_of(lambda: strategy.clean(df_raw), args.repeat)
+    n_cells = df_raw.shape[0] * (df_raw.shape[1] - 1)
+    print(f"input: {df_raw.shape[0]} rows x {df_raw.shape[1] - 1} years")
+    print(f"legacy:     {legacy * 1000:8.1f} ms ({n_cells / legacy:,.0f} values/s)")
+    print(
+        f"vectorized: {vectorized * 1000:8.1f} ms ({n_cells / vectorized:,.0f} values/s)"
+    )
+    print(f"speedup:    {legacy / vectorized:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark loading a mix of TSV, JSON and zip inputs with `ingest`.
+
+Loads the inputs of the benchmark suite (see `benchmarks.suite`) one after
+the other, then concurrently with `life_expectancy.ingestion.ingest` in a
+thread pool and in a process pool, and compares the job times with the sum
+and the maximum of the single-file times.
+
+Usage:
+    python -m benchmarks.bench_ingestion [--scale K] [--max-workers N]
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+import logging
+import os
+from pathlib import Path
+import time
+from typing import List, Optional, Sequence
+
+from benchmarks.suite import BENCHMARKS_DIR, FORMATS, prepare_dataset
+from life_expectancy.ingestion import ingest, load_file
+
+
+def ingest_time(
+    paths: Sequence[Path], max_pending: int, executor: Optional[Executor] = None
+) -> float:
+    """Wall time of ingesting every path"""
+
+    async def run() -> None:
+        async for _ in ingest(paths, max_pending, executor=executor):
+            pass
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark and print the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--max-workers", type=int, default=len(FORMATS))
+    parser.add_argument("--data-dir", type=Path, default=BENCHMARKS_DIR / ".data")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    paths = [prepare_dataset(args.data_dir, fmt, args.scale) for fmt in FORMATS]
+    print(f"cpus: {os.cpu_count()}")
+    single: List[float] = []
+    for path in paths:
+        single.append(load_file(path).seconds)
+        print(f"{path.name:<36} {single[-1]:8.3f} s")
+    print(f"{'sum (sequential)':<36} {sum(single):8.3f} s")
+    print(f"{'slowest file':<36} {max(single):8.3f} s")
+
+    threads = ingest_time(paths, args.max_workers)
+    print(f"{'ingest, threads':<36} {threads:8.3f} s")
+    with ProcessPoolExecutor(max_workers=args.max_workers) as executor:
+        # Start the workers before timing
+        list(executor.map(abs, range(args.max_workers)))
+        processes = ingest_time(paths, args.max_workers, executor)
+    print(f"{'ingest, processes':<36} {processes:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark the out-of-core pipeline against the batch one.
+
+Runs the batch pipeline (load, clean and split the whole input in memory,
+then save every region) and the out-of-core engine (see
+life_expectancy.out_of_core) on an input of the benchmark suite, each in a
+fresh process, and reports their wall time, how much their peak RSS grew
+over the run, and whether they wrote the same files.
+
+Usage:
+    python -m benchmarks.bench_out_of_core [--format tsv|json] [--scale K]
+        [--chunk-size N] [--buffer-rows N]
+"""
+
+import argparse
+import gc
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.suite import BENCHMARKS_DIR, prepare_dataset
+from life_expectancy.instrumentation import reset_peak_rss, rss_kb
+from life_expectancy.main import PipelineOptions, build_pipeline
+from life_expectancy.out_of_core import OutOfCoreEngine
+from life_expectancy.region import Region
+
+
+def run_pipeline(
+    pipeline: str, path: Path, output_dir: Path, chunk_size: int, buffer_rows: int
+) -> Dict[str, float]:
+    """Run one pipeline and measure it; runs in its own process"""
+    logging.disable(logging.CRITICAL)
+    filehandler, cleaner = build_pipeline(path.suffix, options=PipelineOptions())
+
+    def output_path(region: Region) -> Path:
+        return output_dir / f"{region.value.lower()}_life_expectancy.csv"
+
+    gc.collect()
+    reset_peak_rss()
+    rss_before = rss_kb()[0]
+    start = time.perf_counter()
+    if pipeline == "batch":
+        df_raw = filehandler.load_data(path)
+        for region, df_region in cleaner.clean_data_by_region(df_raw).items():
+            filehandler.save_data(df_region, output_path(region), region.value)
+    else:
+        with tempfile.TemporaryDirectory() as spill_dir:
+            engine = OutOfCoreEngine(
+                filehandler, cleaner, Path(spill_dir), buffer_rows=buffer_rows
+            )
+            engine.spill(filehandler.load_data_chunks(path, chunk_size))
+            engine.finish(output_path)
+    return {
+        "wall_s": time.perf_counter() - start,
+        "peak_growth_mb": (rss_kb()[1] - rss_before) / 1024,
+    }
+
+
+def same_files(dir_a: Path, dir_b: Path) -> bool:
+    """Whether two directories hold files with the same names and contents"""
+    names = sorted(path.name for path in dir_a.iterdir())
+    return names == sorted(path.name for path in dir_b.iterdir()) and all(
+        (dir_a / name).read_bytes() == (dir_b / name).read_bytes() for name in names
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print the measurements"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=["tsv", "json"], default="tsv")
+    parser.add_argument("--scale", type=float, default=10)
+    parser.add_argument("--data-dir", type=Path, default=BENCHMARKS_DIR / ".data")
+    parser.add_argument("--chunk-size", type=int, default=PipelineOptions.chunk_size)
+    parser.add_argument(
+        "--buffer-rows", type=int, default=PipelineOptions.spill_buffer_rows
+    )
+    args = parser.parse_args()
+
+    path = prepare_dataset(args.data_dir, args.format, args.scale)
+    print(f"input: {path.name}, {path.stat().st_size / 2**20:.1f} MB")
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pipeline in ("batch", "out_of_core"):
+            output_dir = Path(tmp_dir) / pipeline
+            output_dir.mkdir()
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(
+                    run_pipeline,
+                    pipeline,
+                    path,
+                    output_dir,
+                    args.chunk_size,
+                    args.buffer_rows,
+                ).result()
+            print(
+                f"{pipeline:<12} {result['wall_s']:>8.2f} s"
+                f" {result['peak_growth_mb']:>8.1f} MB peak RSS growth"
+            )
+        identical = same_files(Path(tmp_dir) / "batch", Path(tmp_dir) / "out_of_core")
+        print(f"identical outputs: {identical}")
+
+
+if __name__ == "__main__":
+    main()
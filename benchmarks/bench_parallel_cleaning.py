@@ -0,0 +1,65 @@
+"""Benchmark cleaning a Eurostat TSV with 1 to N worker processes.
+
+Times `DataCleaner.clean` serially and with the process-pool engine of
+`life_expectancy.parallel`, and checks every run writes the same bytes.
+
+Usage:
+    python -m benchmarks.bench_parallel_cleaning [--input-file path/to/file.tsv]
+        [--max-workers N] [--scale K]
+
+Without --input-file the synthetic TSV of `bench_csv_cleaning` is used, with
+`--scale` times as many regions. --max-workers defaults to the number of CPUs.
+"""
+
+import argparse
+from functools import partial
+import logging
+import os
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.bench_csv_cleaning import (
+    COMPOSED_COL,
+    DECOMPOSED_COLS,
+    best_of,
+    synthetic_tsv,
+)
+from life_expectancy.data_cleaning import CSVCleaningStrategy, DataCleaner
+
+
+def main() -> None:
+    """Run the benchmark and print the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input-file", type=Path, default=None)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--scale", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    if args.input_file is None:
+        source = StringIO(synthetic_tsv(n_regions=56 * args.scale))
+    else:
+        source = args.input_file
+    df_raw = pd.read_csv(source, sep="\t", na_values=[":"])
+    strategy = CSVCleaningStrategy(COMPOSED_COL, DECOMPOSED_COLS)
+
+    expected = DataCleaner(strategy).clean(df_raw).to_csv(index=False)
+    print(f"input: {df_raw.shape[0]} rows x {df_raw.shape[1] - 1} years")
+    print(f"cpus:  {os.cpu_count()}")
+    serial = 0.0
+    for workers in range(1, args.max_workers + 1):
+        cleaner = DataCleaner(strategy, workers)
+        assert cleaner.clean(df_raw).to_csv(index=False) == expected
+        timing = best_of(partial(cleaner.clean, df_raw), args.repeat)
+        serial = serial or timing
+        print(
+            f"workers={workers:<3d} {timing * 1000:8.1f} ms"
+            f"  speedup {serial / timing:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
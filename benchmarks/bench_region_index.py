@@ -0,0 +1,79 @@
+"""Benchmark region resolution with a RegionIndex against scanning the frame.
+
+Selects one region (PT) and splits every region out of the cleaned data, with
+compact and string columns, the way DataCleaner did before the index (find
+the countries with `Region.get_actual_countries`, then a boolean mask or a
+groupby) and with the index, built once per frame and timed separately.
+
+Usage:
+    python -m benchmarks.bench_region_index [--input-file path/to/file.tsv]
+        [--repeat N]
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+
+from benchmarks.bench_csv_cleaning import best_of
+from life_expectancy.data_cleaning import CleanedDataCleaningStrategy, DataCleaner
+from life_expectancy.main import build_pipeline
+from life_expectancy.region import Region
+from life_expectancy.region_index import RegionIndex
+from life_expectancy.tests import FIXTURES_DIR
+
+
+def scan_select(df: pd.DataFrame, region: Region) -> pd.DataFrame:
+    """Select a region by scanning the frame"""
+    if region.value not in Region.get_actual_countries(df, "region"):
+        raise ValueError(f"Invalid region: {region}")
+    df_region = df[df["region"] == region.value].dropna(subset=["value"])
+    return df_region.reset_index(drop=True)
+
+
+def scan_split(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Split every region out of the frame with a groupby"""
+    countries = set(Region.get_actual_countries(df, "region"))
+    return {
+        str(code): group.dropna(subset=["value"]).reset_index(drop=True)
+        for code, group in df.groupby("region", sort=False, observed=True)
+        if code in countries
+    }
+
+
+def time_frame(name: str, df: pd.DataFrame, repeat: int) -> None:
+    """Time region selection and splitting of a cleaned frame"""
+    cleaner = DataCleaner(CleanedDataCleaningStrategy())
+    cleaner.region_index(df)
+    timings = {
+        "select, scan": best_of(lambda: scan_select(df, Region.PT), repeat),
+        "select, index": best_of(lambda: cleaner.select_region(df, Region.PT), repeat),
+        "split, groupby": best_of(lambda: scan_split(df), repeat),
+        "split, index": best_of(lambda: cleaner.split_by_region(df), repeat),
+        "build index": best_of(lambda: RegionIndex(df["region"]), repeat),
+    }
+    print(f"{name} columns, {len(df):,} rows")
+    for label, seconds in timings.items():
+        print(f"  {label:<20} {seconds * 1e3:10.2f} ms")
+
+
+def main() -> None:
+    """Run the benchmark and print the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--input-file", type=Path, default=FIXTURES_DIR / "eu_life_expectancy_raw.tsv"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    filehandler, cleaner = build_pipeline(args.input_file.suffix.lower())
+    df_raw = filehandler.load_data(args.input_file)
+    time_frame("compact", cleaner.clean(df_raw, compact=True), args.repeat)
+    time_frame("string", cleaner.clean(df_raw), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark region requests to the pipeline server against CLI runs.
+
+Times a run of the command line extracting one region (imports, load,
+cleaning and save in a fresh process), then starts a `PipelineServer` on the
+same input and times repeated requests of the region with `RegionClient`:
+the first one serializes the response, the others are served from memory.
+
+Usage:
+    python -m benchmarks.bench_server [--input-file path/to/file.tsv]
+        [--requests N]
+"""
+
+import argparse
+import logging
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from life_expectancy.client import RegionClient
+from life_expectancy.main import output_file_path
+from life_expectancy.region import Region
+from life_expectancy.server import PipelineServer, WarmDataset
+from life_expectancy.tests import FIXTURES_DIR
+
+
+def main() -> None:
+    """Run the benchmark and print the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--input-file", type=Path, default=FIXTURES_DIR / "eu_life_expectancy_raw.tsv"
+    )
+    parser.add_argument("--region", default="PT")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    # The command line writes its output next to the package
+    output_file_path(Region(args.region)).parent.mkdir(exist_ok=True)
+    start = time.perf_counter()
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "life_expectancy.main",
+            "--no-cache",
+            "--input-file",
+            str(args.input_file),
+            "--region",
+            args.region,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    print(f"{'CLI run':<28} {(time.perf_counter() - start) * 1e3:10.1f} ms")
+
+    start = time.perf_counter()
+    dataset = WarmDataset(args.input_file)
+    print(f"{'server load':<28} {(time.perf_counter() - start) * 1e3:10.1f} ms")
+    with PipelineServer(dataset, ("127.0.0.1", 0), watch_interval=None) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        client = RegionClient(server.url)
+        latencies = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            client.region(args.region)
+            latencies.append((time.perf_counter() - start) * 1e3)
+        server.shutdown()
+        thread.join()
+
+    print(f"{'first request':<28} {latencies[0]:10.1f} ms")
+    warm = sorted(latencies[1:])
+    print(f"{'warm request, median':<28} {statistics.median(warm):10.1f} ms")
+    print(f"{'warm request, p99':<28} {warm[int(len(warm) * 0.99)]:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark the startup time of the command line.
+
+Imports `life_expectancy.main` with `python -X importtime` and runs
+`python -m life_expectancy.main --help` in fresh processes, and reports the
+best import time and the best wall time of `--help`, net of a bare
+interpreter start. The run fails (exit status 1) if the import time is over
+`--budget-ms` or if `--help` imports one of the modules the command line
+should only load when a code path needs them (pandas, numpy, pyarrow and the
+loading and cleaning strategies).
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat N] [--budget-ms MS]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Sequence, Tuple
+
+# Modules `--help` must not import
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "life_expectancy.file_handler",
+    "life_expectancy.data_cleaning",
+)
+IMPORT_TIME = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$")
+
+
+def run(command: Sequence[str]) -> Tuple[float, str]:
+    """Wall time (ms) and standard error of a command"""
+    start = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return (time.perf_counter() - start) * 1e3, result.stderr
+
+
+def cumulative_import_ms(importtime: str) -> Dict[str, float]:
+    """Cumulative import time (ms) of every module in -X importtime output"""
+    times: Dict[str, float] = {}
+    for line in importtime.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            times[match.group(2)] = int(match.group(1)) / 1e3
+    return times
+
+
+def main() -> None:
+    """Run the benchmark, print the timings and check the budget"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    importtime = [sys.executable, "-X", "importtime"]
+    bare: List[float] = []
+    walls: List[float] = []
+    imports: List[float] = []
+    heavy: List[str] = []
+    for _ in range(args.repeat):
+        bare.append(run([sys.executable, "-c", "pass"])[0])
+        times = cumulative_import_ms(
+            run([*importtime, "-c", "import life_expectancy.main"])[1]
+        )
+        imports.append(times["life_expectancy.main"])
+        wall, stderr = run([*importtime, "-m", "life_expectancy.main", "--help"])
+        walls.append(wall)
+        heavy = [name for name in HEAVY_MODULES if name in cumulative_import_ms(stderr)]
+
+    print(f"{'import life_expectancy.main':<32} {min(imports):8.1f} ms")
+    print(f"{'--help, net of interpreter':<32} {min(walls) - min(bare):8.1f} ms")
+    failures = []
+    if min(imports) > args.budget_ms:
+        failures.append(f"import time over the {args.budget_ms:g} ms budget")
+    if heavy:
+        failures.append(f"--help imports {', '.join(heavy)}")
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
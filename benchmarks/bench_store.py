@@ -0,0 +1,105 @@
+"""Benchmark lookups in a LifeExpectancyStore against boolean masks.
+
+Answers "value for region, sex, age and year" and "values for region, sex
+and age over a range of years" by masking the cleaned frame, the way
+`DataCleaner.filter_by_region` selects a region, and with the store built
+from it, one lookup at a time and batched.
+
+Usage:
+    python -m benchmarks.bench_store [--input-file path/to/file.tsv]
+        [--queries N]
+"""
+
+import argparse
+import logging
+from pathlib import Path
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from life_expectancy.main import build_pipeline
+from life_expectancy.store import KEY_COLUMNS, LifeExpectancyStore
+from life_expectancy.tests import FIXTURES_DIR
+
+
+def per_query_us(func: Callable[[int], object], n_queries: int) -> float:
+    """Mean time of `func(i)` for i in range(n_queries), in microseconds"""
+    start = time.perf_counter()
+    for i in range(n_queries):
+        func(i)
+    return (time.perf_counter() - start) / n_queries * 1e6
+
+
+def time_masks(df: pd.DataFrame, sample: pd.DataFrame) -> None:
+    """Time lookups of the sample rows by masking the frame"""
+    regions, sexes, ages = (sample[column].to_numpy() for column in KEY_COLUMNS[:3])
+    years = sample["year"].to_numpy()
+
+    def point(i: int) -> pd.Series:
+        return df["value"][
+            (df["region"] == regions[i])
+            & (df["sex"] == sexes[i])
+            & (df["age"] == ages[i])
+            & (df["year"] == years[i])
+        ]
+
+    def ranged(i: int) -> pd.Series:
+        return df["value"][
+            (df["region"] == regions[i])
+            & (df["sex"] == sexes[i])
+            & (df["age"] == ages[i])
+            & df["year"].between(2010, 2021)
+        ]
+
+    print(f"{'point, mask':<24} {per_query_us(point, len(sample)):>12.1f} us")
+    print(f"{'range, mask':<24} {per_query_us(ranged, len(sample)):>12.1f} us")
+
+
+def time_store(store: LifeExpectancyStore, sample: pd.DataFrame) -> None:
+    """Time lookups of the sample rows in the store"""
+    regions, sexes, ages = (sample[column].to_numpy() for column in KEY_COLUMNS[:3])
+    years = sample["year"].to_numpy()
+
+    point = per_query_us(
+        lambda i: store.value(regions[i], sexes[i], ages[i], years[i]), len(sample)
+    )
+    print(f"{'point, store':<24} {point:>12.1f} us")
+    ranged = per_query_us(
+        lambda i: store.series(regions[i], sexes[i], ages[i], (2010, 2021)),
+        len(sample),
+    )
+    print(f"{'range, store':<24} {ranged:>12.1f} us")
+    start = time.perf_counter()
+    values = store.values(regions, sexes, ages, years)
+    batched = (time.perf_counter() - start) / len(sample) * 1e6
+    print(f"{'point, store batched':<24} {batched:>12.3f} us")
+    assert np.array_equal(values, sample["value"].to_numpy(), equal_nan=True)
+
+
+def main() -> None:
+    """Run the benchmark and print the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--input-file", type=Path, default=FIXTURES_DIR / "eu_life_expectancy_raw.tsv"
+    )
+    parser.add_argument("--queries", type=int, default=10_000)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    filehandler, cleaner = build_pipeline(args.input_file.suffix.lower())
+    df = cleaner.clean(filehandler.load_data(args.input_file), compact=True)
+    start = time.perf_counter()
+    store = LifeExpectancyStore(df)
+    print(f"rows: {len(df):,}, store built in {time.perf_counter() - start:.3f} s")
+
+    sample = df.iloc[np.random.default_rng(0).integers(0, len(df), args.queries)]
+    sample = sample.astype({column: str for column in KEY_COLUMNS[:3]})
+    # Masks take milliseconds: time fewer of them
+    time_masks(df, sample.iloc[:200])
+    time_store(store, sample)
+
+
+if __name__ == "__main__":
+    main()
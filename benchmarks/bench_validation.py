@@ -0,0 +1,72 @@
+"""Benchmark the validation of cleaned data against the cleaning.
+
+Cleans an input with compact dtypes and validates the cleaned frame against
+`CLEANED_SCHEMA`, then validates the region selected from the non-compact
+cleaned data (what `loading_cleaning_saving` validates), and reports the best
+time of each and the validation overhead relative to the cleaning. The run
+fails (exit status 1) if the overhead is over `--budget-pct`.
+
+Usage:
+    python -m benchmarks.bench_validation [--input-file path/to/file.tsv]
+        [--repeat N] [--budget-pct PCT]
+"""
+
+import argparse
+import logging
+from pathlib import Path
+import sys
+
+from benchmarks.bench_csv_cleaning import best_of
+from life_expectancy.main import PipelineOptions, build_pipeline
+from life_expectancy.region import Region
+from life_expectancy.tests import FIXTURES_DIR
+from life_expectancy.validation import CLEANED_SCHEMA
+
+
+def main() -> None:
+    """Run the benchmark, print the timings and check the budget"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--input-file", type=Path, default=FIXTURES_DIR / "eu_life_expectancy_raw.tsv"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-pct", type=float, default=5.0)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    filehandler, cleaner = build_pipeline(
+        args.input_file.suffix.lower(), options=PipelineOptions(validation=None)
+    )
+    df_raw = filehandler.load_data(args.input_file)
+    df_compact = cleaner.clean(df_raw, compact=True)
+    df_region = cleaner.select_region(cleaner.clean(df_raw), Region.PT)
+
+    timings = {
+        "clean, compact": best_of(
+            lambda: cleaner.clean(df_raw, compact=True), args.repeat
+        ),
+        "validate, compact": best_of(
+            lambda: CLEANED_SCHEMA.validate(df_compact), args.repeat
+        ),
+        "clean": best_of(lambda: cleaner.clean(df_raw), args.repeat),
+        "validate, one region": best_of(
+            lambda: CLEANED_SCHEMA.validate(df_region), args.repeat
+        ),
+    }
+    for name, seconds in timings.items():
+        print(f"{name:<24} {seconds * 1e3:10.1f} ms")
+
+    overheads = {
+        "compact": timings["validate, compact"] / timings["clean, compact"] * 100,
+        "one region": timings["validate, one region"] / timings["clean"] * 100,
+    }
+    for name, overhead in overheads.items():
+        print(f"{'overhead, ' + name:<24} {overhead:10.1f} %")
+    over = [name for name, overhead in overheads.items() if overhead > args.budget_pct]
+    if over:
+        print(f"FAILED: {', '.join(over)} over the {args.budget_pct:g}% budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
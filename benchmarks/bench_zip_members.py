@@ -0,0 +1,95 @@
+"""Benchmark loading regions from zip archives with many members.
+
+Splits the JSON input of the benchmark suite (see `benchmarks.suite`) into an
+archive with one member per country, named like the region outputs, and
+compares loading one region from it with loading the same region from the
+single-member archive of the suite. Also times loading every member with one
+thread and with `--max-workers` threads.
+
+Usage:
+    python -m benchmarks.bench_zip_members [--scale K] [--max-workers N]
+"""
+
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+import time
+import zipfile
+from typing import Dict, List
+
+from benchmarks.suite import BENCHMARKS_DIR, prepare_dataset
+from life_expectancy.file_handler import ZipFileLoadingStrategy
+from life_expectancy.projection import Projection
+from life_expectancy.region import Region
+
+
+def split_by_country(json_path: Path) -> Path:
+    """Write an archive with one member per country of a JSON input, unless
+    it already exists"""
+    path = json_path.with_name(f"{json_path.stem}_by_country.zip")
+    if path.exists():
+        return path
+    with open(json_path, encoding="utf-8") as file:
+        records = json.load(file)
+    by_country: Dict[str, List[Dict]] = {}
+    for record in records:
+        by_country.setdefault(record["country"], []).append(record)
+    tmp_path = path.with_name(f".{path.name}")
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for country, country_records in by_country.items():
+            zip_file.writestr(
+                f"{country.lower()}_life_expectancy.json", json.dumps(country_records)
+            )
+    tmp_path.replace(path)
+    return path
+
+
+def load_time(strategy: ZipFileLoadingStrategy, path: Path, repeat: int = 3) -> float:
+    """Best wall time of loading an archive"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        strategy.load_data(path)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    """Run the benchmark and print the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--data-dir", type=Path, default=BENCHMARKS_DIR / ".data")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    single = prepare_dataset(args.data_dir, "zip", args.scale)
+    by_country = split_by_country(prepare_dataset(args.data_dir, "json", args.scale))
+    with zipfile.ZipFile(by_country) as zip_file:
+        n_members = len(zip_file.namelist())
+    print(f"cpus: {os.cpu_count()}, members: {n_members}")
+
+    projection = Projection()
+    timings = {
+        "PT, single member": load_time(
+            ZipFileLoadingStrategy([Region.PT], projection), single
+        ),
+        "PT, one member per country": load_time(
+            ZipFileLoadingStrategy([Region.PT], projection), by_country
+        ),
+        "all, 1 thread": load_time(
+            ZipFileLoadingStrategy(projection=projection, max_workers=1), by_country
+        ),
+        f"all, {args.max_workers} threads": load_time(
+            ZipFileLoadingStrategy(projection=projection, max_workers=args.max_workers),
+            by_country,
+        ),
+    }
+    for name, seconds in timings.items():
+        print(f"{name:<36} {seconds:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Benchmark suite for the load -> clean -> save pipeline.
+
+Measures each stage separately for TSV, JSON and zip inputs:
+
+- load: `FileHandler.load_data` with the loading strategy of the format
+- clean: `CSVCleaningStrategy.clean` (TSV) or `JSONCleaningStrategy.clean`
+- filter: `DataCleaner.filter_by_region` (PT) on the cleaned data
+- countries: `Region.get_actual_countries` on the cleaned data
+- save: `FileHandler.save_data` of the cleaned data to CSV
+
+Inputs are the Eurostat test fixtures scaled to `--scales` times the size of
+`eurostat_life_expect.json` (474k records) by repeating their rows. They are
+written once to `--data-dir` and reused.
+
+Every measurement runs in a fresh process and records the best wall time over
+`--repeat` runs, the peak RSS while running the stage and the rows per second
+(rows loaded for `load`, rows cleaned otherwise). Results are written as JSON
+to `--output` and compared with `--baseline` if it exists: a stage slower or
+bigger than the baseline beyond the tolerances (and the noise floors of 10 ms
+and 5 MB) is a regression and the suite exits with status 1. `--save-baseline`
+stores the results as the new baseline.
+
+Usage:
+    python -m benchmarks.suite [--scales 1 10 100] [--formats tsv json zip]
+        [--stages load clean filter countries save] [--save-baseline]
+"""
+
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+import pandas as pd
+
+from benchmarks.bench_csv_cleaning import best_of
+from life_expectancy.data_cleaning import (
+    CleaningStrategy,
+    CSVCleaningStrategy,
+    DataCleaner,
+    JSONCleaningStrategy,
+)
+from life_expectancy.file_handler import (
+    CSVFileLoadingStrategy,
+    FileHandler,
+    FileLoadingStrategy,
+    JSONFileLoadingStrategy,
+    ZipFileLoadingStrategy,
+)
+from life_expectancy.instrumentation import reset_peak_rss, rss_kb
+from life_expectancy.projection import Projection
+from life_expectancy.region import Region
+from life_expectancy.tests import FIXTURES_DIR
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+FORMATS = ("tsv", "json", "zip")
+STAGES = ("load", "clean", "filter", "countries", "save")
+JSON_MEMBER = "eurostat_life_expect.json"
+# Differences below these are noise, whatever the relative tolerance
+NOISE_FLOORS = {"wall_s": 0.01, "peak_rss_mb": 5.0}
+
+
+def scaled(items: Sequence[str], scale: float) -> Iterator[str]:
+    """Repeat items to `scale` times their number (fractions take a prefix)"""
+    for _ in range(int(scale)):
+        yield from items
+    yield from items[: round((scale - int(scale)) * len(items))]
+
+
+def json_pieces(scale: float) -> Iterator[str]:
+    """Pieces of the JSON fixture scaled to `scale` times its records"""
+    with open(FIXTURES_DIR / "eu_life_expectancy_expected.json", encoding="utf-8") as f:
+        records = [json.dumps(record) for record in json.load(f)]
+    yield "["
+    for i, record in enumerate(scaled(records, scale)):
+        yield f",\n{record}" if i else record
+    yield "]"
+
+
+def tsv_pieces(scale: float) -> Iterator[str]:
+    """Pieces of the raw TSV fixture scaled to `scale` times its rows"""
+    with open(FIXTURES_DIR / "eu_life_expectancy_raw.tsv", encoding="utf-8") as f:
+        header, *lines = f.read().splitlines(keepends=True)
+    yield header
+    yield from scaled(lines, scale)
+
+
+def prepare_dataset(data_dir: Path, fmt: str, scale: float) -> Path:
+    """Write the input of a format at a scale, unless it already exists"""
+    path = data_dir / f"eurostat_life_expect_{scale:g}x.{fmt}"
+    if path.exists():
+        return path
+    data_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}")
+    if fmt == "zip":
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            with zip_file.open(JSON_MEMBER, "w", force_zip64=True) as member:
+                for piece in json_pieces(scale):
+                    member.write(piece.encode("utf-8"))
+    else:
+        pieces = tsv_pieces(scale) if fmt == "tsv" else json_pieces(scale)
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.writelines(pieces)
+    tmp_path.replace(path)
+    return path
+
+
+def strategies(fmt: str) -> Tuple[FileLoadingStrategy, CleaningStrategy]:
+    """Loading and cleaning strategies of a format"""
+    if fmt == "tsv":
+        return CSVFileLoadingStrategy(), CSVCleaningStrategy(
+            "unit,sex,age,geo\\time", ["unit", "sex", "age", "region"]
+        )
+    # Like build_pipeline, only load the fields the cleaning uses
+    if fmt == "json":
+        return JSONFileLoadingStrategy(projection=Projection()), JSONCleaningStrategy()
+    return ZipFileLoadingStrategy(projection=Projection()), JSONCleaningStrategy()
+
+
+def run_stage(fmt: str, stage: str, path: Path, repeat: int) -> Dict[str, float]:
+    """Measure one stage; runs in its own process"""
+    logging.disable(logging.CRITICAL)
+    loading_strategy, cleaning_strategy = strategies(fmt)
+    filehandler = FileHandler(loading_strategy)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        func: Callable[[], Any]
+        if stage == "load":
+            func = partial(filehandler.load_data, path)
+            rows = len(func())
+        else:
+            df_cleaned = cleaning_strategy.clean(filehandler.load_data(path))
+            rows = len(df_cleaned)
+            if stage == "clean":
+                func = partial(cleaning_strategy.clean, filehandler.load_data(path))
+                del df_cleaned
+            elif stage == "filter":
+                cleaner = DataCleaner(cleaning_strategy)
+                func = partial(cleaner.filter_by_region, df_cleaned, Region.PT)
+            elif stage == "countries":
+                func = partial(Region.get_actual_countries, df_cleaned, "region")
+            else:
+                output_file_path = Path(tmp_dir) / "life_expectancy.csv"
+                func = partial(
+                    filehandler.save_data, df_cleaned, output_file_path, "all"
+                )
+
+        gc.collect()
+        reset_peak_rss()
+        wall_s = best_of(func, repeat)
+        return {
+            "wall_s": round(wall_s, 4),
+            "peak_rss_mb": round(rss_kb()[1] / 1024, 1),
+            "rows": rows,
+            "rows_per_s": round(rows / wall_s) if wall_s else 0,
+        }
+
+
+def measure(fmt: str, stage: str, path: Path, repeat: int) -> Dict[str, float]:
+    """Run a stage in a fresh process, so its peak RSS is its own"""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_stage, fmt, stage, path, repeat).result()
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> List[str]:
+    """Regressions of the results against the baseline"""
+    regressions = []
+    for key, result in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(key)
+        if base is None:
+            continue
+        for metric, tolerance in (
+            ("wall_s", time_tolerance),
+            ("peak_rss_mb", memory_tolerance),
+        ):
+            limit = max(
+                base[metric] * (1 + tolerance), base[metric] + NOISE_FLOORS[metric]
+            )
+            if result[metric] > limit:
+                regressions.append(
+                    f"{key}: {metric} {result[metric]} > baseline {base[metric]}"
+                    f" (+{tolerance:.0%})"
+                )
+    return regressions
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """Measure every stage of every format at every scale"""
+    results: Dict[str, Any] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "benchmarks": {},
+    }
+    print(f"{'benchmark':<22} {'wall s':>9} {'peak MB':>9} {'rows/s':>13}")
+    for scale in args.scales:
+        for fmt in args.formats:
+            path = prepare_dataset(args.data_dir, fmt, scale)
+            for stage in args.stages:
+                key = f"{fmt}/{stage}/{scale:g}x"
+                result = measure(fmt, stage, path, args.repeat)
+                results["benchmarks"][key] = result
+                print(
+                    f"{key:<22} {result['wall_s']:>9.3f} "
+                    f"{result['peak_rss_mb']:>9.1f} {result['rows_per_s']:>13,}"
+                )
+    return results
+
+
+def main() -> None:
+    """Run the suite, store the results and compare them with the baseline"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", type=Path, default=BENCHMARKS_DIR / ".data")
+    parser.add_argument(
+        "--output", type=Path, default=BENCHMARKS_DIR / "results" / "latest.json"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=BENCHMARKS_DIR / "results" / "baseline.json"
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print("No baseline to compare with; create one with --save-baseline")
+        return
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+This module provides precomputed aggregates of the cleaned data.
+
+An `AggregateCube` is built once from the cleaned rows of the regions of a
+run and holds the rollups consumers otherwise derive from the region outputs:
+- by_year: mean, min and max of the regions, and their number, for each
+  (sex, age, unit, year), with the change of the mean from the previous year
+- sex_gap: female and male values and their difference (female minus male)
+  for each (region, age, unit, year)
+- changes: value and change from the previous year for each
+  (region, sex, age, unit, year)
+Each table is indexed and sorted by its keys, so queries are index lookups
+rather than scans of the detail rows. Means are unweighted over the regions.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from life_expectancy.output_files import COMPRESSIONS
+from life_expectancy.region import Region
+from life_expectancy.store import DEFAULT_UNIT, RegionLike
+
+# Key columns of each table
+TABLE_KEYS: Dict[str, List[str]] = {
+    "by_year": ["sex", "age", "unit", "year"],
+    "sex_gap": ["region", "age", "unit", "year"],
+    "changes": ["region", "sex", "age", "unit", "year"],
+}
+
+
+def _previous_year_delta(
+    df: pd.DataFrame, series: List[str], column: str
+) -> np.ndarray:
+    """Change of `column` from the previous year of the same series, for rows
+    sorted by `series` then year; NaN where the previous year is missing"""
+    values = df[column].to_numpy(dtype="float64")
+    years = df["year"].to_numpy()
+    follows = np.zeros(len(df), dtype=bool)
+    follows[1:] = years[1:] == years[:-1] + 1
+    for key in series:
+        codes = df[key].to_numpy()
+        follows[1:] &= codes[1:] == codes[:-1]
+    delta = np.full(len(df), np.nan)
+    delta[1:] = values[1:] - values[:-1]
+    return np.where(follows, delta, np.nan)
+
+
+def _region_code(region: RegionLike) -> str:
+    return region.value if isinstance(region, Region) else region
+
+
+@dataclass
+class AggregateCube:
+    """Rollups of cleaned data, indexed by the keys in TABLE_KEYS"""
+
+    by_year: pd.DataFrame
+    sex_gap: pd.DataFrame
+    changes: pd.DataFrame
+
+    @classmethod
+    def from_cleaned(cls, frames: Iterable[pd.DataFrame]) -> "AggregateCube":
+        """Aggregate cleaned frames (e.g. the region frames of a batch run)"""
+        df = pd.concat(
+            [
+                pd.DataFrame(
+                    {
+                        **{
+                            key: frame[key].astype(str)
+                            for key in TABLE_KEYS["changes"][:-1]
+                        },
+                        "year": frame["year"].astype("int64"),
+                        "value": frame["value"].astype("float64"),
+                    }
+                )
+                for frame in frames
+            ],
+            ignore_index=True,
+        )
+
+        changes = df.sort_values(TABLE_KEYS["changes"], ignore_index=True)
+        changes["delta"] = _previous_year_delta(
+            changes, TABLE_KEYS["changes"][:-1], "value"
+        )
+
+        by_year = (
+            df.groupby(TABLE_KEYS["by_year"])["value"]
+            .agg(["mean", "min", "max", "count"])
+            .rename(columns={"count": "regions"})
+            .reset_index()
+        )
+        by_year["mean_delta"] = _previous_year_delta(
+            by_year, TABLE_KEYS["by_year"][:-1], "mean"
+        )
+
+        sex_gap = (
+            df[df["sex"].isin(["F", "M"])]
+            .set_index([*TABLE_KEYS["sex_gap"], "sex"])["value"]
+            .unstack("sex")
+            .reindex(columns=["F", "M"])
+            .rename(columns={"F": "female", "M": "male"})
+            .rename_axis(columns=None)
+        )
+        sex_gap["gap"] = sex_gap["female"] - sex_gap["male"]
+
+        return cls._indexed(
+            {
+                "by_year": by_year,
+                "sex_gap": sex_gap.reset_index(),
+                "changes": changes,
+            }
+        )
+
+    @classmethod
+    def _indexed(cls, tables: Dict[str, pd.DataFrame]) -> "AggregateCube":
+        """Cube of tables with their keys as columns"""
+        return cls(
+            **{
+                name: table.set_index(TABLE_KEYS[name]).sort_index()
+                for name, table in tables.items()
+            }
+        )
+
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        """The tables with their keys as columns, e.g. to save them"""
+        return {name: getattr(self, name).reset_index() for name in TABLE_KEYS}
+
+    @classmethod
+    def load(
+        cls,
+        directory: Union[str, Path],
+        extension: str = ".csv",
+        compression: Optional[str] = None,
+    ) -> "AggregateCube":
+        """Load the tables saved in `directory` as `<table><extension>` files,
+        CSV ones compressed with one of
+        life_expectancy.output_files.COMPRESSIONS (None: uncompressed)"""
+        if compression is not None and extension != ".csv":
+            raise ValueError(f"Only CSV tables are compressed, not {extension}")
+        readers: Dict[str, Callable[[Path], pd.DataFrame]] = {
+            ".csv": lambda path: pd.read_csv(
+                path, keep_default_na=False, na_values=[""]
+            ),
+            ".parquet": pd.read_parquet,
+            ".feather": pd.read_feather,
+        }
+        read = readers[extension]
+        # pd.read_csv infers the compression from the file extension
+        extension += "" if compression is None else COMPRESSIONS[compression]
+        return cls._indexed(
+            {name: read(Path(directory) / f"{name}{extension}") for name in TABLE_KEYS}
+        )
+
+    def regions_by_year(
+        self,
+        sex: str,
+        age: str,
+        years: Tuple[Optional[int], Optional[int]] = (None, None),
+        unit: str = DEFAULT_UNIT,
+    ) -> pd.DataFrame:
+        """Mean, min, max, number of regions and change of the mean by year,
+        for years from `years[0]` to `years[1]` (inclusive; None is
+        unbounded). Raises KeyError if there is no such series."""
+        return self.by_year.loc[(sex, age, unit), :].loc[slice(*years)]
+
+    def gap(
+        self,
+        region: RegionLike,
+        age: str,
+        years: Tuple[Optional[int], Optional[int]] = (None, None),
+        unit: str = DEFAULT_UNIT,
+    ) -> pd.Series:
+        """Female minus male values of a region by year"""
+        table = self.sex_gap.loc[(_region_code(region), age, unit), :]
+        return table["gap"].loc[slice(*years)]
+
+    def yearly_changes(
+        self,
+        region: RegionLike,
+        sex: str,
+        age: str,
+        years: Tuple[Optional[int], Optional[int]] = (None, None),
+        unit: str = DEFAULT_UNIT,
+    ) -> pd.DataFrame:
+        """Values of a region and their change from the previous year, by year"""
+        table = self.changes.loc[(_region_code(region), sex, age, unit), :]
+        return table.loc[slice(*years)]
+
+    def change(
+        self,
+        region: RegionLike,
+        sex: str,
+        age: str,
+        years: Tuple[int, int],
+        unit: str = DEFAULT_UNIT,
+    ) -> float:
+        """Change of the value of a region from `years[0]` to `years[1]`;
+        raises KeyError if either year is missing"""
+        values = self.changes["value"]
+        key = (_region_code(region), sex, age, unit)
+        return float(values.loc[(*key, years[1])] - values.loc[(*key, years[0])])
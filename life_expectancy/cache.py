@@ -0,0 +1,155 @@
+"""
+This module provides an on-disk cache of cleaned datasets.
+
+Each entry is a directory with one `.npy` file per column plus a `meta.json`
+describing how to rebuild the frame, so a warm run only has to read a few
+binary arrays instead of decompressing and parsing the input again.
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+# Bump when the cleaning output or the entry layout changes
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / "data" / ".cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class DatasetCache:
+    """Cache of cleaned all-regions frames keyed by input file, with LRU eviction.
+
+    With `refresh`, existing entries are ignored (and overwritten on store)."""
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        refresh: bool = False,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+
+    def key(self, input_file_path: Union[str, Path], variant: str = "") -> str:
+        """Key of an input file (see `file_key`)"""
+        return file_key(input_file_path, variant)
+
+    def load(self, key: str) -> Optional[pd.DataFrame]:
+        """Return the cached frame for a key, or None on a miss."""
+        if self.refresh:
+            return None
+        entry = self.cache_dir / key
+        try:
+            with open(entry / "meta.json", encoding="utf-8") as file:
+                meta = json.load(file)
+            data = {
+                column["name"]: _read_column(entry / f"{i}.npy", column)
+                for i, column in enumerate(meta["columns"])
+            }
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        # Mark the entry as recently used
+        os.utime(entry)
+        logging.info("Loaded cleaned data from cache entry %s", key)
+        return pd.DataFrame(data)
+
+    def store(self, key: str, df: pd.DataFrame) -> None:
+        """Store a frame under a key and evict old entries beyond the size limit."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-"))
+        try:
+            columns: List[Dict[str, Any]] = []
+            for i, name in enumerate(df.columns):
+                columns.append(_write_column(tmp_dir / f"{i}.npy", name, df[name]))
+            with open(tmp_dir / "meta.json", "w", encoding="utf-8") as file:
+                json.dump({"rows": len(df), "columns": columns}, file)
+            entry = self.cache_dir / key
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_dir, entry)
+        except OSError as error:
+            logging.warning("Could not write cache entry %s: %s", key, error)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits its size limit."""
+        if not self.cache_dir.exists():
+            return
+        entries = [
+            entry
+            for entry in self.cache_dir.iterdir()
+            if entry.is_dir() and not entry.name.startswith(".")
+        ]
+        sizes = {entry: _dir_size(entry) for entry in entries}
+        total = sum(sizes.values())
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= sizes[entry]
+            logging.info("Evicted cache entry %s", entry.name)
+
+
+def file_key(input_file_path: Union[str, Path], variant: str = "") -> str:
+    """Key of an input file: its path, size, mtime and content hash.
+
+    `variant` distinguishes different cleanings of the same file."""
+    path = Path(input_file_path).resolve()
+    stat = path.stat()
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    parts = [
+        str(CACHE_VERSION),
+        str(path),
+        str(stat.st_size),
+        str(stat.st_mtime_ns),
+        digest.hexdigest(),
+        variant,
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _write_column(path: Path, name: str, column: pd.Series) -> Dict[str, Any]:
+    """Write one column to a .npy file and describe how to read it back."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        np.save(path, column.cat.codes.to_numpy(), allow_pickle=False)
+        return {
+            "name": name,
+            "kind": "category",
+            "categories": column.cat.categories.tolist(),
+        }
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+        np.save(path, column.to_numpy(), allow_pickle=False)
+        return {"name": name, "kind": "numeric"}
+    # Strings are stored dictionary-encoded, like categoricals
+    codes, uniques = pd.factorize(column)
+    np.save(path, codes, allow_pickle=False)
+    return {"name": name, "kind": "string", "categories": uniques.tolist()}
+
+
+def _read_column(path: Path, column: Dict[str, Any]) -> Any:
+    """Read back a column written by `_write_column`."""
+    values = np.load(path, allow_pickle=False)
+    if column["kind"] == "category":
+        return pd.Categorical.from_codes(values, categories=column["categories"])
+    if column["kind"] == "string":
+        categorical = pd.Categorical.from_codes(values, categories=column["categories"])
+        return pd.Series(categorical).astype(str).where(values >= 0)
+    return values
+
+
+def _dir_size(path: Path) -> int:
+    """Total size in bytes of the files in a directory."""
+    return sum(file.stat().st_size for file in path.iterdir() if file.is_file())
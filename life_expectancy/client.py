@@ -0,0 +1,74 @@
+"""
+This module provides a small client of the pipeline server (see
+life_expectancy.server).
+
+It only imports the standard library, so that fetching a region from a
+running server does not pay the import time of pandas; `RegionClient.frame`
+imports it on first use.
+
+Usage:
+    python -m life_expectancy.client PT [--format json] [--output pt.csv]
+        [--url http://127.0.0.1:8765]
+"""
+
+import argparse
+from io import BytesIO
+import json
+from pathlib import Path
+import sys
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+from urllib.request import urlopen
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+
+class RegionClient:
+    """Client of a pipeline server at `url`"""
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _get(self, path: str) -> bytes:
+        """Body of a GET request; raises urllib.error.HTTPError on errors"""
+        with urlopen(f"{self.url}{path}", timeout=self.timeout) as response:
+            return response.read()
+
+    def regions(self) -> List[str]:
+        """Codes of the regions served"""
+        return json.loads(self._get("/regions"))
+
+    def status(self) -> Dict[str, Any]:
+        """Description of the data served"""
+        return json.loads(self._get("/status"))
+
+    def region(self, region: str, response_format: str = "csv") -> bytes:
+        """Cleaned data of a region as csv or json records"""
+        return self._get(f"/regions/{quote(region)}?format={response_format}")
+
+    def frame(self, region: str) -> Any:
+        """Cleaned data of a region as a pandas DataFrame"""
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+
+        return pd.read_csv(BytesIO(self.region(region)))
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """Fetch a region and write it to a file or to the standard output"""
+    parser = argparse.ArgumentParser(description="Fetch a region from the server")
+    parser.add_argument("region", help="Region code, e.g. PT")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"default: {DEFAULT_URL}")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--output", type=Path, default=None)
+    parsed = parser.parse_args(args)
+
+    body = RegionClient(parsed.url).region(parsed.region, parsed.format)
+    if parsed.output is None:
+        sys.stdout.buffer.write(body)
+    else:
+        parsed.output.write_bytes(body)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
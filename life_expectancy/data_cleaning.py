@@ -1,10 +1,32 @@
 """ This module contains the DataCleaner class, which is responsible for cleaning the raw data"""
 
-from typing import List
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 import logging
+import re
 from abc import ABC, abstractmethod
+import weakref
+import numpy as np
 import pandas as pd
+from life_expectancy.instrumentation import stage
+from life_expectancy.parallel import clean_in_parallel
+from life_expectancy.projection import CLEANED_COLUMNS, JSON_FIELDS
 from life_expectancy.region import Region
+from life_expectancy.region_index import RegionIndex
+
+if TYPE_CHECKING:
+    from life_expectancy.validation import Schema
 
 
 class CleaningStrategy(ABC):
@@ -14,16 +36,44 @@ class CleaningStrategy(ABC):
     def clean(self, df_raw: pd.DataFrame) -> pd.DataFrame:
         """Abstract method for cleaning data"""
 
+    def partition(self, df_raw: pd.DataFrame, n_parts: int) -> List[pd.DataFrame]:
+        """Split the raw data into at most `n_parts` non-empty parts that can be
+        cleaned independently, such that concatenating the cleaned parts in
+        order gives the same frame as cleaning the whole. Defaults to
+        contiguous row ranges."""
+        return [
+            df_raw.iloc[start:stop] for start, stop in _ranges(len(df_raw), n_parts)
+        ]
+
+    def cleaned_order(  # pylint: disable=unused-argument
+        self, n_raw: int, n_cleaned: int, offset: int
+    ) -> np.ndarray:
+        """Sort keys of the `n_cleaned` rows cleaned from `n_raw` raw rows
+        starting at raw row `offset` of the input, such that sorting the
+        cleaned rows of every chunk of the input by them gives the row order of
+        cleaning the whole input. Defaults to one cleaned row per raw row."""
+        return np.arange(offset, offset + n_cleaned, dtype="int64")
+
+
+def _ranges(n_items: int, n_parts: int) -> List[Tuple[int, int]]:
+    """Split range(n_items) into at most `n_parts` non-empty contiguous ranges"""
+    bounds = np.linspace(0, n_items, max(min(n_parts, n_items), 1) + 1).astype(int)
+    return [
+        (start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+    ]
+
 
 class JSONCleaningStrategy(CleaningStrategy):
     """Concrete class for cleaning JSON data"""
 
+    # Fields of the records the cleaning uses, so loaders can skip the others
+    fields = list(JSON_FIELDS.values())
+
     def clean(self, df_raw: pd.DataFrame) -> pd.DataFrame:
-        # Implement JSON cleaning strategy here
+        # Implement JSON cleaning strategy here; fields left out by a
+        # projection are left out of the cleaned data too
         df_final = pd.DataFrame(df_raw)
-        df_final = df_final[
-            ["unit", "sex", "age", "country", "year", "life_expectancy"]
-        ]
+        df_final = df_final[[field for field in self.fields if field in df_final]]
         df_final = df_final.rename(
             columns={"country": "region", "life_expectancy": "value"}
         )
@@ -31,23 +81,62 @@ class JSONCleaningStrategy(CleaningStrategy):
         return df_final
 
 
+class CleanedDataCleaningStrategy(CleaningStrategy):
+    """Concrete class for data that was already cleaned, e.g. by this package"""
+
+    columns = list(CLEANED_COLUMNS)
+
+    def clean(self, df_raw: pd.DataFrame) -> pd.DataFrame:
+        return df_raw[[column for column in self.columns if column in df_raw]]
+
+
 class CSVCleaningStrategy(CleaningStrategy):
-    """Concrete class for cleaning CSV data"""
+    """Concrete class for cleaning CSV data.
 
-    def __init__(self, composed_col: str, decomposed_cols: List[str]):
+    With `columns`, only those cleaned columns are built (see
+    life_expectancy.projection)."""
+
+    def __init__(
+        self,
+        composed_col: str,
+        decomposed_cols: List[str],
+        columns: Optional[Sequence[str]] = None,
+    ):
         self.composed_col = composed_col
         self.decomposed_cols = decomposed_cols
+        self.columns = list(columns) if columns is not None else None
 
     def clean(self, df_raw: pd.DataFrame) -> pd.DataFrame:
-        df_raw = df_raw.copy()
-        # Split first column into 4 columns
-        df_raw[self.decomposed_cols] = df_raw[self.composed_col].str.split(
-            ",", expand=True
-        )
-        df_raw = df_raw.drop(columns=[self.composed_col])
+        columns = self.columns or self.decomposed_cols + ["year", "value"]
+        # Split first column into 4 columns in one pass
+        keys = df_raw[self.composed_col].str.split(",", expand=True)
+        if df_raw.empty:
+            # No rows (e.g. every region filtered out while loading): no keys
+            # to split into columns
+            keys = pd.DataFrame(
+                index=df_raw.index, columns=range(len(self.decomposed_cols))
+            )
+        keys.columns = self.decomposed_cols
+
+        # Year columns are labelled like "2021 "
+        year_cols = [col for col in df_raw.columns if col != self.composed_col]
+        years = np.array([int(str(col).strip()) for col in year_cols], dtype="int64")
 
-        # Transform data into long format, filter out missings
-        df_final = pd.melt(df_raw, id_vars=self.decomposed_cols, var_name="year")
+        # Transform data into long format (same row order as pd.melt: year-major)
+        n_rows = len(df_raw)
+        data: Dict[str, np.ndarray] = {
+            col: np.tile(keys[col].to_numpy(dtype=object), len(years))
+            for col in self.decomposed_cols
+            if col in columns
+        }
+        if "year" in columns:
+            data["year"] = np.repeat(years, n_rows)
+        unparseable: Dict[str, int] = {}
+        if "value" in columns:
+            # Parse all values in one pass
+            data["value"], unparseable = parse_values(
+                df_raw[year_cols].to_numpy(dtype=object).ravel(order="F")
+            )
 
         # Convert column data types explicitly
         data_types = {
@@ -55,44 +144,208 @@ class CSVCleaningStrategy(CleaningStrategy):
             "sex": "str",
             "age": "str",
             "region": "str",
-            "year": "int",
+            "year": "int64",
             "value": "float64",
         }
+        df_final = pd.DataFrame(data, copy=False).astype(
+            {col: dtype for col, dtype in data_types.items() if col in data}
+        )
+        if unparseable:
+            df_final.attrs[UNPARSEABLE_VALUES] = unparseable
+        return df_final
+
+    def partition(self, df_raw: pd.DataFrame, n_parts: int) -> List[pd.DataFrame]:
+        # The cleaned rows are year-major, so split the year columns rather
+        # than the rows to keep the serial row order
+        year_cols = [col for col in df_raw.columns if col != self.composed_col]
+        return [
+            df_raw[[self.composed_col] + year_cols[start:stop]]
+            for start, stop in _ranges(len(year_cols), n_parts)
+        ]
+
+    def cleaned_order(self, n_raw: int, n_cleaned: int, offset: int) -> np.ndarray:
+        # Cleaned row i is year i // n_raw of raw row i % n_raw: order by year
+        # then raw row (below 2**40 raw rows)
+        cleaned = np.arange(n_cleaned, dtype="int64")
+        if n_raw == 0:
+            return cleaned
+        return ((cleaned // n_raw) << 40) + offset + cleaned % n_raw
+
+
+# Eurostat observation flags suffixed to values after a space (e.g. "21.7 e",
+# "84.3 bp"); ":" is the placeholder of missing values (e.g. ": ", ": c")
+EUROSTAT_FLAGS = re.compile(r"\s+[bcdefnprsuz]+$")
+
+
+# Key of the attrs of cleaned frames holding the number of cells of each
+# unparseable value (see parse_values), reported by DataCleaner.clean
+UNPARSEABLE_VALUES = "unparseable_values"
 
-        column_groups = {
-            value: [key for key, val in data_types.items() if val == value]
-            for value in set(data_types.values())
+
+def parse_values(values: np.ndarray) -> Tuple[np.ndarray, Dict[str, int]]:
+    """Parse Eurostat values (e.g. "21.7 e", ": ", 84.3) to floats.
+
+    Eurostat extracts only contain a few thousand distinct cells, so the values
+    are factorized first and only the distinct ones have their flags stripped
+    and are parsed; anything left unparseable becomes NaN and is returned with
+    its number of cells.
+    """
+    codes, uniques = pd.factorize(values)
+    originals = pd.Series(uniques, dtype=object)
+    stripped = (
+        originals.astype(str).str.strip().str.replace(EUROSTAT_FLAGS, "", regex=True)
+    )
+    stripped = stripped.mask(stripped.eq(":"), "")
+    parsed = pd.to_numeric(stripped, errors="coerce")
+    invalid = (parsed.isna() & stripped.ne("")).to_numpy()
+    unparseable: Dict[str, int] = {}
+    if invalid.any():
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        unparseable = {
+            str(originals[i]): int(counts[i]) for i in np.flatnonzero(invalid)
         }
+    lookup = np.append(parsed.to_numpy(dtype="float64", na_value=np.nan), np.nan)
+    # Missing cells have code -1, which picks the trailing NaN
+    return lookup[codes], unparseable
 
-        def convert_datatypes(
-            dataframe: pd.DataFrame, cols_2_convert: List[str], dtype: str
-        ) -> pd.DataFrame:
-            """
-            This function iterates on each group of columns to convert to the determined data type
-            """
-            for col in cols_2_convert:
-                if cols_2_convert == ["value"]:
-                    try:
-                        dataframe[col] = pd.to_numeric(
-                            dataframe[col].str.extract(
-                                r"(\d+(?:\.\d+)?)", expand=False
-                            ),
-                            errors="raise",
-                        )
-                    except ValueError as error:
-                        logging.error("Datatype conversion error %s", error)
-                else:
-                    try:
-                        dataframe[col] = dataframe[col].astype(
-                            dtype=dtype, errors="raise"
-                        )  # type: ignore
-                    except ValueError as error:
-                        logging.error("Datatype conversion error %s", error)
-            return dataframe
-
-        for dtype, cols in column_groups.items():
-            df_final[cols] = convert_datatypes(df_final.loc[:, cols], cols, dtype)
-        return df_final
+
+# Stable category sets shared by every compact frame, so codes mean the same
+# thing across files and runs
+UNIT_CATEGORIES = ["YR"]
+SEX_CATEGORIES = ["F", "M", "T"]
+AGE_CATEGORIES = ["Y_LT1"] + [f"Y{age}" for age in range(1, 85)] + ["Y_GE85"]
+REGION_CATEGORIES = [region.value for region in Region]
+# Code columns of the cleaned data and their category sets
+_CODE_COLUMNS = {
+    "unit": UNIT_CATEGORIES,
+    "sex": SEX_CATEGORIES,
+    "age": AGE_CATEGORIES,
+}
+
+
+def to_compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert a cleaned frame to compact dtypes.
+
+    `unit`, `sex` and `age` become categoricals over the shared category sets
+    (extended with any unexpected code, so nothing is lost) and `region` a
+    categorical over the `Region` codes; rows of other regions (aggregates such
+    as EU27_2020, or countries outside `Region`) are dropped. `year` becomes
+    int16 and `value` float32 when that round-trips the data's decimals.
+    """
+    df = df[df["region"].isin(REGION_CATEGORIES)]
+    year_fits_int16 = value_fits_float32 = None
+    if "year" in df:
+        years = df["year"].to_numpy()
+        year_fits_int16 = not years.size or _fits_int16(years.min(), years.max())
+    if "value" in df:
+        value_fits_float32 = _fits_float32(df["value"].to_numpy(dtype="float64"))
+    data_types = _compact_dtypes(
+        {col: df[col].dropna().unique() for col in _CODE_COLUMNS if col in df},
+        year_fits_int16,
+        value_fits_float32,
+    )
+    return df.astype(data_types).reset_index(drop=True)
+
+
+def _compact_dtypes(
+    codes: Mapping[str, Iterable[str]],
+    year_fits_int16: Optional[bool],
+    value_fits_float32: Optional[bool],
+) -> Dict[str, Any]:
+    """Compact dtypes of the columns of cleaned data, from the codes found in
+    each code column and whether the years and values fit the smaller dtypes
+    (None for columns left out by a projection)"""
+    data_types: Dict[str, Any] = {
+        "region": pd.CategoricalDtype(REGION_CATEGORIES),
+    }
+    for col, found in codes.items():
+        categories = _CODE_COLUMNS[col]
+        unexpected = sorted(set(found) - set(categories))
+        if unexpected:
+            logging.warning("Unexpected %s codes: %s", col, unexpected)
+        data_types[col] = pd.CategoricalDtype(categories + unexpected)
+    if year_fits_int16:
+        data_types["year"] = "int16"
+    if value_fits_float32:
+        data_types["value"] = "float32"
+    return data_types
+
+
+def _fits_int16(low: int, high: int) -> bool:
+    """Whether int16 holds every year between `low` and `high`"""
+    return bool(low >= np.iinfo(np.int16).min and high <= np.iinfo(np.int16).max)
+
+
+def _fits_float32(values: np.ndarray, max_decimals: int = 6) -> bool:
+    """Whether float32 keeps every value at the data's decimal precision"""
+    values = values[~np.isnan(values)]
+    for decimals in range(max_decimals + 1):
+        if np.array_equal(np.round(values, decimals), values):
+            as_float32 = values.astype("float32").astype("float64")
+            return np.array_equal(np.round(as_float32, decimals), values)
+    return False
+
+
+class CompactDtypes:
+    """
+    The dtypes to_compact_dtypes gives cleaned data, decided from its parts:
+    `update` with each part of the cleaned data (e.g. the cleaned chunks of an
+    input read chunk by chunk), then `dtypes` gives the dtypes of the whole.
+    Only the codes found, the range of the years and, for each number of
+    decimals, whether the values and their float32 conversion are exact at
+    that precision are kept, so memory does not grow with the parts.
+    """
+
+    def __init__(self, max_decimals: int = 6):
+        self.codes: Dict[str, Set[str]] = {}
+        self.years: Optional[Tuple[int, int]] = None
+        self.has_year = False
+        self.has_value = False
+        # Whether every value, and its float32 conversion, is exact at
+        # 0..max_decimals decimals
+        self.exact = np.ones(max_decimals + 1, dtype=bool)
+        self.exact_float32 = np.ones(max_decimals + 1, dtype=bool)
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Add a part of the cleaned data (rows of other regions than
+        `Region`s are left out, like in to_compact_dtypes)"""
+        df = df[df["region"].isin(REGION_CATEGORIES)]
+        for col in _CODE_COLUMNS:
+            if col in df:
+                self.codes.setdefault(col, set()).update(df[col].dropna().unique())
+        if "year" in df:
+            self.has_year = True
+            years = df["year"].to_numpy()
+            if len(years):
+                low, high = int(years.min()), int(years.max())
+                if self.years is not None:
+                    low, high = min(low, self.years[0]), max(high, self.years[1])
+                self.years = (low, high)
+        if "value" in df:
+            self.has_value = True
+            values = df["value"].to_numpy(dtype="float64")
+            values = values[~np.isnan(values)]
+            as_float32 = values.astype("float32").astype("float64")
+            # The whole is exact at a precision if every part is; precisions
+            # some part is not exact at are settled
+            for decimals in np.flatnonzero(self.exact):
+                self.exact[decimals] = np.array_equal(
+                    np.round(values, decimals), values
+                )
+                self.exact_float32[decimals] &= self.exact[decimals] and (
+                    np.array_equal(np.round(as_float32, decimals), values)
+                )
+
+    def dtypes(self) -> Dict[str, Any]:
+        """Compact dtypes of the whole, like to_compact_dtypes decides them"""
+        year_fits_int16 = value_fits_float32 = None
+        if self.has_year:
+            year_fits_int16 = self.years is None or _fits_int16(*self.years)
+        if self.has_value:
+            # At the data's decimal precision, as in _fits_float32
+            precise = np.flatnonzero(self.exact)
+            value_fits_float32 = bool(len(precise)) and self.exact_float32[precise[0]]
+        return _compact_dtypes(self.codes, year_fits_int16, value_fits_float32)
 
 
 class DataCleaner:
@@ -105,28 +358,258 @@ class DataCleaner:
         NoDataException: Exception raised when no data is found for a given region
         """
 
-    def __init__(self, cleaning_strategy: CleaningStrategy):
-        """Constructor for DataCleaner"""
+    def __init__(
+        self,
+        cleaning_strategy: CleaningStrategy,
+        workers: int = 1,
+        schema: Optional["Schema"] = None,
+        strict: bool = False,
+    ):
+        """Constructor for DataCleaner. With `workers > 1`, cleaning runs in a
+        pool of that many processes (see life_expectancy.parallel). With a
+        `schema`, compact cleaned data and regions selected from non-compact
+        data are validated against it, as are the values that could not be
+        parsed (see life_expectancy.validation): the violations are logged, or
+        raise ValidationError if `strict`."""
         self.cleaning_strategy = cleaning_strategy
+        self.workers = workers
+        self.schema = schema
+        self.strict = strict
+        # Region index of the last frame indexed, while that frame is alive
+        self._region_index: Optional[Tuple[weakref.ref, RegionIndex]] = None
+
+    def clean(self, df_raw: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+        """This method cleans the raw data of every region.
+
+        With `compact`, the result uses the dtypes of `to_compact_dtypes`."""
+        with stage("clean") as record:
+            if self.workers > 1:
+                df_cleaned = clean_in_parallel(
+                    self.cleaning_strategy, df_raw, self.workers
+                )
+            else:
+                df_cleaned = self.cleaning_strategy.clean(df_raw)
+            unparseable = df_cleaned.attrs.pop(UNPARSEABLE_VALUES, {})
+            if compact:
+                with stage("compact"):
+                    df_cleaned = to_compact_dtypes(df_cleaned)
+            record.rows = len(df_cleaned)
+        self.report_unparseable(len(df_cleaned), unparseable)
+        if compact:
+            self.validate(df_cleaned)
+        return df_cleaned
+
+    def report_unparseable(self, rows: int, unparseable: Dict[str, int]) -> None:
+        """This method reports the cells of `rows` cleaned rows whose value
+        could not be parsed (see parse_values): as a violation of the schema
+        if any, which raises ValidationError if `strict`, else in the log."""
+        if not unparseable:
+            return
+        if self.schema is None:
+            logging.error(
+                "Datatype conversion error: unparseable values %s",
+                list(unparseable)[:5],
+            )
+            return
+        self.schema.validate_parsing(rows, unparseable).enforce(self.strict)
+
+    def validate(self, df_cleaned: pd.DataFrame) -> None:
+        """This method validates cleaned data against the schema, if any.
+
+        Compact data is validated as a whole; string columns take much longer
+        to check, so non-compact data is only validated region by region."""
+        if self.schema is None:
+            return
+        with stage("validate") as record:
+            report = self.schema.validate(df_cleaned)
+            record.rows = len(df_cleaned)
+        report.enforce(self.strict)
 
-    def clean_data(self, df_raw: pd.DataFrame, region_filter: Region) -> pd.DataFrame:
-        """This method cleans the raw data and filters by region"""
-        df_cleaned = self.cleaning_strategy.clean(df_raw)
+    def clean_data(
+        self,
+        df_raw: pd.DataFrame,
+        region_filter: Region,
+        compact: bool = False,
+        available: Optional[Iterable[str]] = None,
+    ) -> pd.DataFrame:
+        """This method cleans the raw data and filters by region. `available`
+        are the region codes of the input when the loader filtered its regions
+        (see FileHandler.regions_seen), for the error of a missing region."""
+        df_cleaned = self.clean(df_raw, compact)
+        df_region = self.select_region(df_cleaned, region_filter, available)
+        if not compact:
+            self.validate(df_region)
+        return df_region
 
-        # Get the list of countries in the cleaned data
-        countries = Region.get_actual_countries(df_cleaned, "region")
+    def clean_data_by_region(
+        self,
+        df_raw: pd.DataFrame,
+        regions: Optional[Sequence[Region]] = None,
+        compact: bool = True,
+        available: Optional[Iterable[str]] = None,
+    ) -> Dict[Region, pd.DataFrame]:
+        """This method cleans the raw data once and splits it by region.
 
+        If `regions` is None, every region present in the data is returned.
+        Compact dtypes are used unless `compact` is False. `available` is as
+        in clean_data."""
+        df_cleaned = self.clean(df_raw, compact)
+        return self.split_by_region(df_cleaned, regions, available)
+
+    def region_index(self, df_cleaned: pd.DataFrame) -> RegionIndex:
+        """This method returns the index of the regions of cleaned data, built
+        in one pass the first time the frame is indexed (the frame must not
+        be modified afterwards)"""
+        if self._region_index is not None:
+            indexed, index = self._region_index
+            if indexed() is df_cleaned:
+                return index
+        with stage("region_index") as record:
+            if "region" in df_cleaned:
+                index = RegionIndex(df_cleaned["region"])
+            else:
+                # No input was loaded: no region has rows
+                index = RegionIndex(pd.Series(index=df_cleaned.index, dtype=object))
+            record.rows = len(df_cleaned)
+        self._region_index = (weakref.ref(df_cleaned), index)
+        return index
+
+    def countries(self, df_cleaned: pd.DataFrame) -> List[str]:
+        """Codes of the `Region`s present in cleaned data, like
+        Region.get_actual_countries, from the region index"""
+        index = self.region_index(df_cleaned)
+        return [region.value for region in Region if region.value in index]
+
+    def available_countries(
+        self, df_cleaned: pd.DataFrame, available: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """Codes of the `Region`s of the input, for errors: those of
+        `available` if given (the input's regions, before a loader filtered
+        them), else those of the cleaned data"""
+        if available is None:
+            return self.countries(df_cleaned)
+        codes = set(available)
+        return [region.value for region in Region if region.value in codes]
+
+    def select_region(
+        self,
+        df_cleaned: pd.DataFrame,
+        region_filter: Region,
+        available: Optional[Iterable[str]] = None,
+    ) -> pd.DataFrame:
+        """This method validates the region filter and filters cleaned data by
+        it. `available` is as in clean_data."""
         # Validate the region filter
-        if region_filter.value not in countries:
+        if region_filter.value not in self.region_index(df_cleaned):
             raise ValueError(
-                f"Invalid region: {region_filter}. Available regions: {countries}"
+                f"Invalid region: {region_filter}. "
+                f"Available regions: {self.available_countries(df_cleaned, available)}"
             )
 
         return self.filter_by_region(df_cleaned, region_filter)
 
+    def select_regions(
+        self, df_cleaned: pd.DataFrame, regions: Sequence[Region]
+    ) -> pd.DataFrame:
+        """This method selects the rows of several regions (e.g. a group of
+        region.REGION_GROUPS) in one take, region by region, without missing
+        values. Regions without data raise ValueError."""
+        self._check_present(df_cleaned, regions)
+        with stage("filter") as record:
+            index = self.region_index(df_cleaned)
+            df_selected = index.select(df_cleaned, [region.value for region in regions])
+            df_selected = df_selected.dropna(subset=["value"]).reset_index(drop=True)
+            record.rows = len(df_selected)
+        return df_selected
+
+    def split_by_region(
+        self,
+        df_cleaned: pd.DataFrame,
+        regions: Optional[Sequence[Region]] = None,
+        available: Optional[Iterable[str]] = None,
+    ) -> Dict[Region, pd.DataFrame]:
+        """This method splits cleaned data by region using the region index.
+
+        If `regions` is None, every region present in the data is returned.
+        `available` is as in clean_data."""
+        if regions is None:
+            regions = [Region(country) for country in self.countries(df_cleaned)]
+        self._check_present(df_cleaned, regions, available)
+
+        return self._group_by_region(df_cleaned, regions)
+
+    def _check_present(
+        self,
+        df_cleaned: pd.DataFrame,
+        regions: Sequence[Region],
+        available: Optional[Iterable[str]] = None,
+    ):
+        """Raise ValueError if some of the regions have no rows"""
+        index = self.region_index(df_cleaned)
+        invalid = [region for region in regions if region.value not in index]
+        if invalid:
+            raise ValueError(
+                f"Invalid regions: {invalid}. "
+                f"Available regions: {self.available_countries(df_cleaned, available)}"
+            )
+
+    def clean_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        regions: Optional[Sequence[Region]] = None,
+        compact: bool = True,
+    ) -> Iterator[Dict[Region, pd.DataFrame]]:
+        """This method cleans raw data chunk by chunk and splits each chunk by
+        region, so memory stays bounded by the chunk size.
+
+        If `regions` is None, every region is kept. Requested regions that were
+        not found in any chunk raise NoDataException once the input is exhausted.
+        """
+        found: Set[Region] = set()
+        for df_raw in chunks:
+            df_cleaned = self.clean(df_raw, compact)
+            index = self.region_index(df_cleaned)
+            chunk_regions = [
+                region
+                for region in (regions if regions is not None else Region)
+                if region.value in index
+            ]
+            by_region = self._group_by_region(df_cleaned, chunk_regions)
+            found.update(by_region)
+            yield by_region
+
+        missing = [region for region in regions or [] if region not in found]
+        if missing:
+            raise DataCleaner.NoDataException(f"No data for regions {missing}")
+
+    def _group_by_region(
+        self, df_cleaned: pd.DataFrame, regions: Sequence[Region]
+    ) -> Dict[Region, pd.DataFrame]:
+        """Split cleaned data into the given regions (which must be present)"""
+        index = self.region_index(df_cleaned)
+        with stage("split") as record:
+            # Rows without missing values, taken at once and sliced by region
+            frames = index.split(
+                df_cleaned,
+                [region.value for region in regions],
+                keep=df_cleaned["value"].notna().to_numpy(),
+            )
+            by_region = {region: frames[region.value] for region in regions}
+            record.rows = sum(len(df) for df in by_region.values())
+        return by_region
+
     def filter_by_region(self, df: pd.DataFrame, region_filter: Region) -> pd.DataFrame:
         """This method filters the data by region and drops rows with missing values"""
-        df_filtered = df[df["region"] == region_filter.value]
+        with stage("filter") as record:
+            df_filtered = self._filter_by_region(df, region_filter)
+            record.rows = len(df_filtered)
+        return df_filtered
+
+    def _filter_by_region(
+        self, df: pd.DataFrame, region_filter: Region
+    ) -> pd.DataFrame:
+        """Rows of a region, without missing values"""
+        df_filtered = self.region_index(df).select(df, [region_filter.value])
 
         if df_filtered.empty:
             raise DataCleaner.NoDataException(f"No data for region {region_filter}")
@@ -2,35 +2,81 @@
 This module provides a class to load and save files.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import fnmatch
 from pathlib import Path
 import logging
-from io import StringIO
-import json
+import os
+from io import BufferedIOBase, StringIO, TextIOWrapper
+import re
+import time
 import zipfile
-from typing import Union
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 from abc import ABC, abstractmethod
 import pandas as pd
-
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+from life_expectancy.instrumentation import stage
+from life_expectancy.json_backends import (
+    JSONParserBackend,
+    iter_json_batches,
+    json_backend,
+)
+from life_expectancy.output_files import (
+    COMPRESSIONS,
+    atomic_output,
+    open_text,
+    replace_durably,
+    temporary_path,
+    throughput,
+)
+from life_expectancy.projection import JSON_FIELDS, Projection
+from life_expectancy.region import Region
 
 
 class FileHandler:
-    """Class to load and save files."""
+    """Class to load and save files.
+
+    Files are loaded with `strategy` and saved with `saving_strategy` (CSV by
+    default)."""
 
-    def __init__(self, strategy=None):
+    def __init__(self, strategy=None, saving_strategy=None):
         self.strategy = strategy
+        self.saving_strategy = saving_strategy or CSVFileSavingStrategy()
 
     def save_data(
-        self, df_final: pd.DataFrame, output_file_path: Path, region_filter: str
+        self,
+        df_final: pd.DataFrame,
+        output_file_path: Path,
+        region_filter: str,
+        label: str = "cleaned data for region",
     ) -> None:
-        """Save the final dataframe to a file."""
+        """Save the final dataframe to a file. `label` describes what
+        `region_filter` names in the log, e.g. "aggregate table"."""
         if df_final is None:
             logging.warning("The final dataframe is None. Nothing will be saved.")
             return
 
         try:
-            df_final.to_csv(output_file_path, index=False)
+            with stage("save") as record:
+                start = time.perf_counter()
+                with atomic_output(Path(output_file_path)) as temp_path:
+                    self.saving_strategy.save_data(df_final, temp_path)
+                    n_bytes = temp_path.stat().st_size
+                record.rows = len(df_final)
+                record.bytes = n_bytes
+                wall_s = time.perf_counter() - start
         except PermissionError:
             logging.error(
                 "Output file %s could not be created or written to.", output_file_path
@@ -38,41 +84,328 @@ class FileHandler:
             return
 
         logging.info(
-            "Successfully saved cleaned data for region %s at %s",
+            "Successfully saved %s %s at %s (%s)",
+            label,
             region_filter,
             output_file_path,
+            throughput(n_bytes, wall_s),
         )
 
     def load_data(self, input_file_path: Union[str, Path]) -> pd.DataFrame:
         """Load the data from a file."""
         if self.strategy:
-            return self.strategy.load_data(input_file_path)
+            with stage("load") as record:
+                df_raw = self.strategy.load_data(input_file_path)
+                record.rows = len(df_raw)
+            return df_raw
         logging.error("No file handling strategy has been set.")
         return pd.DataFrame()
 
+    def load_data_chunks(
+        self, input_file_path: Union[str, Path], chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """Load the data from a file as a sequence of frames of bounded size."""
+        if self.strategy:
+            return self.strategy.load_data_chunks(input_file_path, chunk_size)
+        logging.error("No file handling strategy has been set.")
+        return iter([])
+
+    def regions_seen(self) -> Optional[Set[str]]:
+        """Codes of the regions of the last input loaded, rows dropped by the
+        region filter of the loader included (None if it does not track them)"""
+        return self.strategy.regions_seen if self.strategy else None
+
+    def open_chunk_writer(self, output_file_path: Path) -> "ChunkWriter":
+        """Open a writer that saves a dataframe to a file chunk by chunk."""
+        return self.saving_strategy.open_chunk_writer(output_file_path)
+
+
+class ChunkWriter:
+    """Writer saving a dataframe that arrives in chunks.
+
+    Chunks are written to a temporary file that replaces the output file when
+    the writer is closed, or is removed if the writer exits with an error.
+    This default implementation collects the chunks and saves them all at once
+    when closed; strategies that can append override it."""
+
+    def __init__(self, strategy: "FileSavingStrategy", output_file_path: Path):
+        self.strategy = strategy
+        self.output_file_path = Path(output_file_path)
+        self.temp_path = temporary_path(self.output_file_path)
+        self.rows = 0
+        # Bytes written to the file so far (all of them once closed)
+        self.bytes = 0
+        self._frames: List[pd.DataFrame] = []
+
+    def write(self, df_chunk: pd.DataFrame) -> None:
+        """Write one chunk."""
+        self._frames.append(df_chunk)
+        self.rows += len(df_chunk)
+
+    def close(self) -> None:
+        """Finish the file and move it in place."""
+        self._finish()
+        if self._frames:
+            df_final = pd.concat(self._frames, ignore_index=True)
+            self.strategy.save_data(df_final, self.temp_path)
+            self._frames = []
+        if self.temp_path.exists():
+            self.bytes = self.temp_path.stat().st_size
+            replace_durably(self.temp_path, self.output_file_path)
+
+    def abort(self) -> None:
+        """Discard what was written, leaving any previous output file as is."""
+        self._finish()
+        self._frames = []
+        self.temp_path.unlink(missing_ok=True)
+
+    def _finish(self) -> None:
+        """Close what the writer holds open on the temporary file"""
+
+    def _written(self) -> None:
+        """Update the bytes written after a chunk"""
+        self.bytes = self.temp_path.stat().st_size
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class CSVChunkWriter(ChunkWriter):
+    """Writer appending each chunk to a CSV file as it arrives, through one
+    (possibly compressed) stream."""
+
+    def __init__(self, strategy: "CSVFileSavingStrategy", output_file_path: Path):
+        super().__init__(strategy, output_file_path)
+        self._file: Optional[IO[str]] = None
+
+    def write(self, df_chunk: pd.DataFrame) -> None:
+        """Write one chunk."""
+        strategy: CSVFileSavingStrategy = self.strategy  # type: ignore[assignment]
+        first = self._file is None
+        if self._file is None:
+            self._file = strategy.open_file(self.temp_path)
+        df_chunk.to_csv(self._file, index=False, header=first)
+        self.rows += len(df_chunk)
+        self._written()
+
+    def _finish(self) -> None:
+        """Close the stream"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class FileSavingStrategy(ABC):
+    """Interface for saving files."""
+
+    @abstractmethod
+    def save_data(self, df_final: pd.DataFrame, output_file_path: Path) -> None:
+        """Save a dataframe to a file."""
+        raise NotImplementedError
+
+    def open_chunk_writer(self, output_file_path: Path) -> ChunkWriter:
+        """Open a writer that saves a dataframe to a file chunk by chunk."""
+        return ChunkWriter(self, output_file_path)
+
+
+class CSVFileSavingStrategy(FileSavingStrategy):
+    """Class to save CSV files, compressed with one of
+    life_expectancy.output_files.COMPRESSIONS (None: uncompressed)."""
+
+    def __init__(self, compression: Optional[str] = None):
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unsupported CSV compression: {compression}. "
+                f"Supported: {sorted(COMPRESSIONS)}"
+            )
+        self.compression = compression
+
+    def open_file(self, output_file_path: Path) -> IO[str]:
+        """Open a file to write CSV text to, through the compressor"""
+        return open_text(output_file_path, self.compression)
+
+    def save_data(self, df_final: pd.DataFrame, output_file_path: Path) -> None:
+        """Save a dataframe to a file."""
+        with self.open_file(output_file_path) as file:
+            df_final.to_csv(file, index=False)
+
+    def open_chunk_writer(self, output_file_path: Path) -> ChunkWriter:
+        """Open a writer that appends chunks to the file as they arrive."""
+        return CSVChunkWriter(self, output_file_path)
+
+
+class ParquetFileSavingStrategy(FileSavingStrategy):
+    """Class to save Parquet files.
+
+    When the frame has a `partition_col` column, each of its values is written
+    as its own row group(s), so readers filtering on it can skip the others."""
+
+    def __init__(self, compression: str = "snappy", partition_col: str = "region"):
+        self.compression = compression
+        self.partition_col = partition_col
+
+    def save_data(self, df_final: pd.DataFrame, output_file_path: Path) -> None:
+        """Save a dataframe to a file."""
+        pa = _import_pyarrow()
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+        df_final = df_final.reset_index(drop=True)
+        schema = pa.Schema.from_pandas(df_final, preserve_index=False)
+        with pq.ParquetWriter(
+            output_file_path, schema, compression=self.compression
+        ) as writer:
+            if self.partition_col not in df_final.columns:
+                writer.write_table(pa.Table.from_pandas(df_final, schema=schema))
+                return
+            for _, group in df_final.groupby(
+                self.partition_col, sort=False, observed=True
+            ):
+                writer.write_table(
+                    pa.Table.from_pandas(group, schema=schema, preserve_index=False)
+                )
+
+    def open_chunk_writer(self, output_file_path: Path) -> ChunkWriter:
+        """Open a writer that appends chunks to the file as row groups."""
+        return ParquetChunkWriter(self, output_file_path)
+
+
+class ParquetChunkWriter(ChunkWriter):
+    """Writer appending each chunk to a Parquet file as new row groups."""
+
+    def __init__(self, strategy: ParquetFileSavingStrategy, output_file_path: Path):
+        super().__init__(strategy, output_file_path)
+        self._writer: Any = None
+        self._schema: Any = None
+
+    def write(self, df_chunk: pd.DataFrame) -> None:
+        """Write one chunk."""
+        pa = _import_pyarrow()
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+        strategy: ParquetFileSavingStrategy = self.strategy  # type: ignore[assignment]
+        if self._writer is None:
+            self._schema = pa.Schema.from_pandas(df_chunk, preserve_index=False)
+            self._writer = pq.ParquetWriter(
+                self.temp_path, self._schema, compression=strategy.compression
+            )
+        self._writer.write_table(
+            pa.Table.from_pandas(df_chunk, schema=self._schema, preserve_index=False)
+        )
+        self.rows += len(df_chunk)
+        self._written()
+
+    def _finish(self) -> None:
+        """Close the Parquet writer"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class FeatherFileSavingStrategy(FileSavingStrategy):
+    """Class to save Feather (Arrow IPC) files."""
+
+    def __init__(
+        self, compression: Literal["zstd", "lz4", "uncompressed"] = "uncompressed"
+    ):
+        self.compression = compression
+
+    def save_data(self, df_final: pd.DataFrame, output_file_path: Path) -> None:
+        """Save a dataframe to a file."""
+        _import_pyarrow()
+        # A single record batch lets memory-mapped readers view each column
+        # as one contiguous buffer
+        df_final.reset_index(drop=True).to_feather(
+            output_file_path,
+            compression=self.compression,
+            chunksize=max(len(df_final), 1),
+        )
+
+
+def _import_pyarrow() -> Any:
+    """Import pyarrow, which the Parquet and Feather formats need"""
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError(
+            "Parquet and Feather files need pyarrow: pip install -e '.[arrow]'"
+        ) from err
+    return pyarrow
+
 
 class FileLoadingStrategy(ABC):
     """Interface for loading files."""
 
+    # Codes of the regions of the last input loaded, including those of the
+    # rows a region filter dropped; None when the strategy does not track them
+    regions_seen: Optional[Set[str]] = None
+
     @abstractmethod
     def load_data(self, input_file_path: Union[str, Path]) -> pd.DataFrame:
         """Load the data from a file."""
         raise NotImplementedError
 
-    @abstractmethod
     def load_data_from_content(self, content: str) -> pd.DataFrame:
-        """Load the data from a string."""
-        raise NotImplementedError
+        """Load the data from a string. Strategies of binary formats, which
+        cannot come from text, keep this default that raises TypeError."""
+        raise TypeError(
+            f"{type(self).__name__} reads a binary format: "
+            "load it from a file or stream, not a string"
+        )
+
+    def load_data_from_stream(self, stream: IO[bytes]) -> pd.DataFrame:
+        """Load the data from a binary stream (e.g. a zip member).
+
+        The default implementation reads the whole stream into memory; strategies
+        that can parse incrementally should override it."""
+        return self.load_data_from_content(stream.read().decode("utf-8"))
+
+    def load_data_chunks(
+        self, input_file_path: Union[str, Path], chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """Load the data from a file as a sequence of frames of about
+        `chunk_size` rows.
+
+        The default implementation loads the whole file as a single chunk;
+        strategies that can parse incrementally should override it."""
+        del chunk_size
+        yield self.load_data(input_file_path)
+
+
+def _region_codes(regions: Optional[Iterable[Region]]) -> Optional[Set[str]]:
+    """Turn an optional region filter into the set of codes to keep"""
+    if regions is None:
+        return None
+    return {region.value for region in regions}
 
 
 class CSVFileLoadingStrategy(FileLoadingStrategy):
-    """Class to load CSV files."""
+    """Class to load CSV files.
+
+    When `regions` is given, rows whose `geo` code (the last field of the
+    composed first column) is not one of them are dropped before pandas
+    parses them. With the years of a `projection`, the columns of other years
+    are not converted by pandas.
+    """
+
+    def __init__(
+        self,
+        regions: Optional[Iterable[Region]] = None,
+        projection: Optional[Projection] = None,
+    ):
+        self.region_codes = _region_codes(regions)
+        self.projection = projection
 
     def load_data(self, input_file_path: Union[str, Path]) -> pd.DataFrame:
         """Load the data from a file."""
         try:
             with open(Path(input_file_path), encoding="utf-8") as filename:
-                df_raw = pd.read_csv(filename, sep="\t", na_values=[":"])
+                df_raw = self._read_lines(filename)
         except FileNotFoundError:
             logging.error("Input file %s not found.", input_file_path)
             return pd.DataFrame()
@@ -81,18 +414,121 @@ class CSVFileLoadingStrategy(FileLoadingStrategy):
 
     def load_data_from_content(self, content: str) -> pd.DataFrame:
         """Load the data from a string."""
-        return pd.read_csv(StringIO(content), sep="\t", na_values=[":"])
+        return self._read_lines(StringIO(content))
+
+    def load_data_from_stream(self, stream: IO[bytes]) -> pd.DataFrame:
+        """Load the data from a binary stream, letting pandas buffer the reads."""
+        if self.region_codes is None:
+            return self._read_csv(stream, encoding="utf-8")
+        text = TextIOWrapper(stream, encoding="utf-8")
+        try:
+            return self._read_lines(text)
+        finally:
+            text.detach()
+
+    def load_data_chunks(
+        self, input_file_path: Union[str, Path], chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """Load the data from a file, `chunk_size` rows at a time."""
+        try:
+            with open(Path(input_file_path), encoding="utf-8") as filename:
+                yield from self._read_line_chunks(filename, chunk_size)
+        except FileNotFoundError:
+            logging.error("Input file %s not found.", input_file_path)
+            return
+        logging.info("Successfully loaded %s", input_file_path)
+
+    def _read_lines(self, lines: IO[str]) -> pd.DataFrame:
+        """Parse tab separated lines, skipping rows of unwanted regions"""
+        if self.region_codes is None:
+            return self._read_csv(lines)
+        self.regions_seen = set()
+        # Even without kept lines, the header gives the frame its columns
+        header = next(lines, "")
+        kept = [header]
+        kept.extend(self._kept_lines(lines))
+        return self._read_csv(StringIO("".join(kept)))
+
+    def _read_line_chunks(
+        self, lines: IO[str], chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """Parse tab separated lines in chunks, skipping rows of unwanted regions"""
+        if self.region_codes is None:
+            with self._read_csv(lines, chunksize=chunk_size) as reader:
+                yield from reader
+            return
+        self.regions_seen = set()
+        header = next(lines, "")
+        kept: List[str] = []
+        for line in self._kept_lines(lines):
+            kept.append(line)
+            if len(kept) >= chunk_size:
+                yield self._read_csv(StringIO("".join([header] + kept)))
+                kept = []
+        if kept:
+            yield self._read_csv(StringIO("".join([header] + kept)))
+
+    def _read_csv(self, source: Any, **kwargs: Any) -> Any:
+        """pd.read_csv of the tab separated source, with the projected columns"""
+        usecols = None
+        if self.projection is not None and self.projection.years is not None:
+            usecols = self._keeps_column
+        return pd.read_csv(source, sep="\t", na_values=[":"], usecols=usecols, **kwargs)
+
+    def _keeps_column(self, name: str) -> bool:
+        """Whether a column is read: the composed key column and the columns of
+        the projected years"""
+        try:
+            year = int(name.strip())
+        except ValueError:
+            return True
+        return self.projection is None or self.projection.keeps_year(year)
+
+    def _kept_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """Lines whose `geo` code is one of the requested regions; the codes of
+        every line are added to `regions_seen`"""
+        seen = cast(Set[str], self.regions_seen)
+        for line in lines:
+            geo = line.split("\t", 1)[0].rsplit(",", 1)[-1].strip()
+            seen.add(geo)
+            if geo in self.region_codes:  # type: ignore[operator]
+                yield line
 
 
 class JSONFileLoadingStrategy(FileLoadingStrategy):
-    """Class to load JSON files."""
+    """Class to load JSON files.
+
+    Files and streams are parsed incrementally from bytes: each read is parsed
+    in one call to the parser backend (see `json_backend`) and the records are
+    turned into a DataFrame every `chunk_size` records, so neither the whole
+    document nor the full list of record dicts is ever held in memory. With a
+    `projection`, records of other years are dropped and only the fields of
+    the cleaned columns it keeps (see JSON_FIELDS) become columns, so e.g.
+    `flag` and `flag_detail` never do.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 50_000,
+        read_size: int = 1 << 20,
+        regions: Optional[Iterable[Region]] = None,
+        projection: Optional[Projection] = None,
+        backend: Optional[JSONParserBackend] = None,
+    ):
+        self.chunk_size = chunk_size
+        self.read_size = read_size
+        self.region_codes = _region_codes(regions)
+        self.projection = projection
+        self.fields = None
+        if projection is not None:
+            self.fields = [JSON_FIELDS[column] for column in projection.columns()]
+        self.backend = backend or json_backend()
 
     def load_data(self, input_file_path: Union[str, Path]) -> pd.DataFrame:
         """Load the data from a file."""
         try:
-            with open(Path(input_file_path), encoding="utf-8") as filename:
-                data = json.load(filename)
-                df_raw = pd.DataFrame(data)
+            with open(Path(input_file_path), "rb") as filename:
+                df_raw = self.load_data_from_stream(filename)
         except FileNotFoundError:
             logging.error("Input file %s not found.", input_file_path)
             return pd.DataFrame()
@@ -101,37 +537,376 @@ class JSONFileLoadingStrategy(FileLoadingStrategy):
 
     def load_data_from_content(self, content: str) -> pd.DataFrame:
         """Load the data from a string."""
-        data = json.loads(content)
-        return pd.DataFrame(data)
+        data = self.backend.loads(content)
+        if not isinstance(data, list):
+            return pd.DataFrame(data)
+        self._reset_regions_seen()
+        return self._frame(self._kept(data))
+
+    def load_data_from_stream(self, stream: IO[bytes]) -> pd.DataFrame:
+        """Load a JSON array of records from a binary stream, chunk by chunk."""
+        frames = list(self._iter_frames(stream, self.chunk_size))
+        if not frames:
+            return self._frame([])
+        if len(frames) == 1:
+            return frames[0]
+        # Chunks may disagree on dtypes (e.g. a column that is all null in one
+        # chunk), so re-infer once on the combined columns
+        return pd.concat(frames, ignore_index=True).infer_objects()
+
+    def load_data_chunks(
+        self, input_file_path: Union[str, Path], chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """Load the data from a file, `chunk_size` records at a time."""
+        try:
+            with open(Path(input_file_path), "rb") as filename:
+                yield from self._iter_frames(filename, chunk_size)
+        except FileNotFoundError:
+            logging.error("Input file %s not found.", input_file_path)
+            return
+        logging.info("Successfully loaded %s", input_file_path)
+
+    def _iter_frames(
+        self, stream: IO[bytes], chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the records of the requested regions as frames of `chunk_size`"""
+        self._reset_regions_seen()
+        batches = iter_json_batches(stream, self.read_size, self.backend)
+        records: List[Dict[str, Any]] = []
+        while True:
+            with stage("parse") as parse_record:
+                # Only read on when the records left over from the last read
+                # do not fill a chunk, so they never pile up
+                while len(records) < chunk_size:
+                    batch = next(batches, None)
+                    if batch is None:
+                        break
+                    records.extend(self._kept(batch))
+                parse_record.rows = min(len(records), chunk_size)
+            if not records:
+                return
+            with stage("construct") as construct_record:
+                df_chunk = self._frame(records[:chunk_size])
+                construct_record.rows = len(df_chunk)
+            del records[:chunk_size]
+            yield df_chunk
+
+    def _frame(self, records: List[Dict[str, Any]]) -> pd.DataFrame:
+        """DataFrame of records, built column by column when `fields` are set.
+        Without records, its columns are the fields the cleaning uses."""
+        fields = self.fields
+        if fields is None:
+            if records:
+                return pd.DataFrame(records)
+            fields = list(JSON_FIELDS.values())
+        return pd.DataFrame(
+            {field: [record.get(field) for record in records] for field in fields}
+        )
+
+    def _reset_regions_seen(self) -> None:
+        """Start tracking the regions of a new input, when filtering them"""
+        if self.region_codes is not None:
+            self.regions_seen = set()
+
+    def _kept(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The records of the requested regions and years; the regions of
+        every record are added to `regions_seen`"""
+        if self.region_codes is not None:
+            codes = self.region_codes
+            cast(Set[str], self.regions_seen).update(
+                {record.get("country", "") for record in records}
+            )
+            records = [record for record in records if record.get("country") in codes]
+        if self.projection is not None and self.projection.years is not None:
+            first, last = self.projection.years
+            records = [
+                record
+                for record in records
+                if isinstance(year := record.get("year"), int) and first <= year <= last
+            ]
+        return records
+
+
+class ParquetFileLoadingStrategy(FileLoadingStrategy):
+    """Class to load Parquet files, e.g. cleaned data saved by this package.
+
+    With `regions` or the years of a `projection`, the filter is passed to the
+    Parquet reader so row groups of other regions are skipped; only the
+    columns a `projection` keeps are read."""
+
+    def __init__(
+        self,
+        regions: Optional[Iterable[Region]] = None,
+        projection: Optional[Projection] = None,
+    ):
+        self.region_codes = _region_codes(regions)
+        self.projection = projection
+
+    def load_data(self, input_file_path: Union[str, Path]) -> pd.DataFrame:
+        """Load the data from a file."""
+        try:
+            with open(Path(input_file_path), "rb") as filename:
+                df_raw = self.load_data_from_stream(filename)
+        except FileNotFoundError:
+            logging.error("Input file %s not found.", input_file_path)
+            return pd.DataFrame()
+        logging.info("Successfully loaded %s", input_file_path)
+        return df_raw
+
+    def load_data_from_stream(self, stream: IO[bytes]) -> pd.DataFrame:
+        """Load the data from a binary stream."""
+        _import_pyarrow()
+        filters: List[Tuple[str, str, Any]] = []
+        if self.region_codes is not None:
+            filters.append(("region", "in", sorted(self.region_codes)))
+        columns = None
+        if self.projection is not None:
+            columns = self.projection.columns()
+            if self.projection.years is not None:
+                filters.append(("year", ">=", self.projection.years[0]))
+                filters.append(("year", "<=", self.projection.years[1]))
+        return pd.read_parquet(stream, columns=columns, filters=filters or None)
+
+
+class FeatherFileLoadingStrategy(FileLoadingStrategy):
+    """Class to load Feather (Arrow IPC) files, e.g. cleaned data saved by this
+    package. Only the columns a `projection` keeps are read."""
+
+    def __init__(
+        self,
+        regions: Optional[Iterable[Region]] = None,
+        projection: Optional[Projection] = None,
+    ):
+        self.region_codes = _region_codes(regions)
+        self.projection = projection
+
+    def load_data(self, input_file_path: Union[str, Path]) -> pd.DataFrame:
+        """Load the data from a file."""
+        try:
+            with open(Path(input_file_path), "rb") as filename:
+                df_raw = self.load_data_from_stream(filename)
+        except FileNotFoundError:
+            logging.error("Input file %s not found.", input_file_path)
+            return pd.DataFrame()
+        logging.info("Successfully loaded %s", input_file_path)
+        return df_raw
+
+    def load_data_from_stream(self, stream: IO[bytes]) -> pd.DataFrame:
+        """Load the data from a binary stream."""
+        _import_pyarrow()
+        columns = None
+        if self.projection is not None:
+            # The year is needed to filter the rows, even if it is not kept
+            columns = list(dict.fromkeys(self.projection.columns() + ["year"]))
+        df_raw = pd.read_feather(stream, columns=columns)
+        mask = pd.Series(True, index=df_raw.index)
+        if self.region_codes is not None:
+            mask &= df_raw["region"].isin(self.region_codes)
+        if self.projection is not None and self.projection.years is not None:
+            mask &= df_raw["year"].between(*self.projection.years)
+        if not mask.all():
+            df_raw = df_raw[mask].reset_index(drop=True)
+        if self.projection is not None:
+            df_raw = df_raw[self.projection.columns()]
+        return df_raw
+
+
+class ArrowMemoryMapLoadingStrategy(FileLoadingStrategy):
+    """Class to load Arrow IPC / Feather v2 files through a memory map.
+
+    The file is mapped rather than read, so uncompressed columns without nulls
+    reach pandas as views over the mapped pages instead of copies in the
+    process heap, and processes reading the same file share one copy of it in
+    the page cache. With `regions` or the years of a `projection`, rows are
+    filtered on the mapped buffers, and only the columns a `projection` keeps
+    are converted to pandas.
+    """
+
+    def __init__(
+        self,
+        regions: Optional[Iterable[Region]] = None,
+        projection: Optional[Projection] = None,
+    ):
+        self.region_codes = _region_codes(regions)
+        self.projection = projection
+
+    def load_data(self, input_file_path: Union[str, Path]) -> pd.DataFrame:
+        """Load the data from a file."""
+        pa = _import_pyarrow()
+        try:
+            source = pa.memory_map(str(input_file_path), "r")
+        except FileNotFoundError:
+            logging.error("Input file %s not found.", input_file_path)
+            return pd.DataFrame()
+        df_raw = self._read(source)
+        logging.info("Successfully memory-mapped %s", input_file_path)
+        return df_raw
+
+    def load_data_from_stream(self, stream: IO[bytes]) -> pd.DataFrame:
+        """Load the data from a binary stream (read into memory, not mapped)."""
+        _import_pyarrow()
+        return self._read(stream)
+
+    def _read(self, source: Any) -> pd.DataFrame:
+        """Read an Arrow IPC file, filter it by region and convert it to pandas"""
+        pa = _import_pyarrow()
+        import pyarrow.compute as pc  # pylint: disable=import-outside-toplevel
+
+        table = pa.ipc.open_file(source).read_all()
+        if self.region_codes is not None:
+            value_set = pa.array(sorted(self.region_codes))
+            mask = pc.is_in(  # pylint: disable=no-member
+                table["region"], value_set=value_set
+            )
+            table = table.filter(mask)
+        if self.projection is not None:
+            if self.projection.years is not None:
+                first, last = self.projection.years
+                year = pc.field("year")  # pylint: disable=no-member
+                table = table.filter((year >= first) & (year <= last))
+            table = table.select(self.projection.columns())
+        # Table.to_pandas copies every column, so build the frame column by
+        # column, viewing the Arrow buffers wherever numpy can use them as is
+        data: Dict[str, Any] = {}
+        for name, column in zip(table.column_names, table.columns):
+            if (
+                column.num_chunks == 1
+                and column.null_count == 0
+                and (
+                    pa.types.is_integer(column.type)
+                    or pa.types.is_floating(column.type)
+                )
+            ):
+                data[name] = column.chunk(0).to_numpy(zero_copy_only=True)
+            else:
+                data[name] = column.to_pandas()
+        return pd.DataFrame(data, copy=False)
 
 
 class ZipFileLoadingStrategy(FileLoadingStrategy):
-    """Class to load zip files."""
+    """Class to load zip files.
+
+    An archive may hold one member or many (e.g. one per region). Only the
+    selected members are decompressed:
+    - `members`: a name pattern (fnmatch syntax, e.g. "*_life_expectancy.json")
+      selecting the members to load; None selects every member
+    - `regions`: if members are named after the requested regions (see
+      `member_region`), only those are loaded; otherwise the members not
+      named after a region are, as they may hold any region
+    Several selected members are loaded in `max_workers` threads (default:
+    one per CPU), as decompressing them releases the GIL, and concatenated in
+    archive order. `regions` and `projection` are also passed on to the
+    loading strategy of each member, and `backend` to the
+    JSONFileLoadingStrategy of JSON members."""
+
+    def __init__(
+        self,
+        regions: Optional[Iterable[Region]] = None,
+        projection: Optional[Projection] = None,
+        backend: Optional[JSONParserBackend] = None,
+        members: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.regions = list(regions) if regions is not None else None
+        self.projection = projection
+        self.backend = backend
+        self.members = members
+        self.max_workers = max_workers
+
+    def select_members(self, names: Iterable[str]) -> List[str]:
+        """Names of the members to load, in archive order"""
+        selected = [
+            name
+            for name in names
+            if not name.endswith("/")
+            and (self.members is None or fnmatch.fnmatch(name, self.members))
+        ]
+        codes = _region_codes(self.regions)
+        if codes is None:
+            return selected
+        regions = [member_region(name) for name in selected]
+        requested = [
+            name
+            for name, region in zip(selected, regions)
+            if region is not None and region.value in codes
+        ]
+        # An archive split by region holds the requested regions in their
+        # members only; otherwise any member not named after another region
+        # may hold them
+        return requested or [
+            name for name, region in zip(selected, regions) if region is None
+        ]
+
+    def _member_strategy(self, name: str) -> FileLoadingStrategy:
+        """Loading strategy of a member, by its extension"""
+        file_ext = Path(name).suffix.lower()
+        if file_ext in (".csv", ".tsv"):
+            return CSVFileLoadingStrategy(self.regions, self.projection)
+        if file_ext == ".json":
+            return JSONFileLoadingStrategy(
+                regions=self.regions, projection=self.projection, backend=self.backend
+            )
+        logging.error("Unsupported file type inside zip: %s", file_ext)
+        raise KeyError(file_ext)
 
     def load_data(self, input_file_path: Union[str, Path]) -> pd.DataFrame:
         if not Path(input_file_path).exists():
             logging.error("Input file %s not found.", input_file_path)
             return pd.DataFrame()
 
-        strategies = {
-            ".csv": CSVFileLoadingStrategy,
-            ".tsv": CSVFileLoadingStrategy,
-            ".json": JSONFileLoadingStrategy,
-        }
-
         try:
             with zipfile.ZipFile(Path(input_file_path), "r") as zip_ref:
-                file = zip_ref.namelist()[0]
-                file_ext = Path(file).suffix.lower()
-                try:
-                    strategy = strategies[file_ext]()
-                except KeyError as err:
-                    logging.error("Unsupported file type inside zip: %s", file_ext)
-                    raise err
-
-                with zip_ref.open(file, "r") as file_ref:
-                    file_content = file_ref.read().decode("utf-8")
-                    return strategy.load_data_from_content(file_content)
+                names = self.select_members(zip_ref.namelist())
+                if self.regions is not None:
+                    # Members named after a region hold that region
+                    self.regions_seen = {
+                        region.value
+                        for region in map(member_region, zip_ref.namelist())
+                        if region is not None
+                    }
+                    if not names:
+                        # An archive split by region without the requested
+                        # ones: load one of its members anyway, whose rows
+                        # are all filtered out, for the columns of the data
+                        names = [
+                            name
+                            for name in ZipFileLoadingStrategy(
+                                members=self.members
+                            ).select_members(zip_ref.namelist())
+                            if member_region(name) is not None
+                        ][:1]
+                if not names:
+                    logging.error(
+                        "No member of %s matches %s.",
+                        input_file_path,
+                        self.members or "the requested regions",
+                    )
+                    return pd.DataFrame()
+                strategies = [self._member_strategy(name) for name in names]
+
+                def load_member(
+                    name: str, strategy: FileLoadingStrategy
+                ) -> pd.DataFrame:
+                    with zip_ref.open(name, "r") as file_ref:
+                        return strategy.load_data_from_stream(
+                            cast(IO[bytes], _UnzipTimedStream(file_ref))
+                        )
+
+                if len(names) == 1:
+                    frames = [load_member(names[0], strategies[0])]
+                else:
+                    # ZipFile reads of different members can run concurrently
+                    with ThreadPoolExecutor(
+                        max_workers=self.max_workers or os.cpu_count(),
+                        thread_name_prefix="unzip",
+                    ) as executor:
+                        frames = list(executor.map(load_member, names, strategies))
+                if self.regions_seen is not None:
+                    for strategy in strategies:
+                        self.regions_seen |= strategy.regions_seen or set()
+                if len(frames) == 1:
+                    return frames[0]
+                return pd.concat(frames, ignore_index=True)
         except zipfile.BadZipFile:
             logging.error("Input file %s is not a valid zip file.", input_file_path)
             return pd.DataFrame()
@@ -140,3 +915,37 @@ class ZipFileLoadingStrategy(FileLoadingStrategy):
         """Load the data from a string."""
         file_content = content
         return self.load_data(file_content)
+
+
+def member_region(name: str) -> Optional[Region]:
+    """Region of a zip member named after it, either by a directory (e.g.
+    `PT/life_expectancy.json`) or by the start of its file name, like the
+    region outputs (e.g. `pt_life_expectancy.json`, `PT.tsv`); None if the
+    name does not start with a region code"""
+    path = Path(name)
+    candidates = [*path.parent.parts, re.split(r"[_\-.]", path.name)[0]]
+    for candidate in candidates:
+        try:
+            return Region(candidate.upper())
+        except ValueError:
+            continue
+    return None
+
+
+class _UnzipTimedStream(BufferedIOBase):
+    """Binary stream over a zip member whose reads (which decompress it) are
+    timed as the accumulated `unzip` stage."""
+
+    def __init__(self, stream: IO[bytes]):
+        super().__init__()
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        with stage("unzip", accumulate=True):
+            return self._stream.read(-1 if size is None else size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self.read(size)
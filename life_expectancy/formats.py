@@ -0,0 +1,59 @@
+"""
+This module provides the registry of input formats, keyed by file extension.
+
+A format is registered with the location of its pipeline builder, as
+"module:function"; the builder takes the regions and the PipelineOptions and
+returns the loading and cleaning strategies of the format. The module is
+only imported when an input of the format is first loaded, so importing the
+registry (and the command line) does not import pandas and the strategies.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from life_expectancy.data_cleaning import CleaningStrategy
+    from life_expectancy.file_handler import FileLoadingStrategy
+    from life_expectancy.main import PipelineOptions
+    from life_expectancy.region import Region
+
+PipelineBuilder = Callable[
+    [Optional[Sequence["Region"]], "PipelineOptions"],
+    Tuple["FileLoadingStrategy", "CleaningStrategy"],
+]
+
+# Location of the pipeline builder of each extension
+_INPUT_FORMATS: Dict[str, str] = {}
+_BUILDERS: Dict[str, PipelineBuilder] = {}
+
+
+def register_input_format(extensions: Sequence[str], builder: str) -> None:
+    """Register the pipeline builder ("module:function") of the inputs with
+    these extensions (e.g. ".tsv"); replaces any previous registration"""
+    for extension in extensions:
+        _INPUT_FORMATS[extension.lower()] = builder
+        _BUILDERS.pop(extension.lower(), None)
+
+
+def input_extensions() -> List[str]:
+    """Extensions of the registered input formats"""
+    return sorted(_INPUT_FORMATS)
+
+
+def pipeline_builder(extension: str) -> PipelineBuilder:
+    """The pipeline builder of an input file extension, imported on first use;
+    raises ValueError for unregistered extensions"""
+    extension = extension.lower()
+    if extension not in _BUILDERS:
+        if extension not in _INPUT_FORMATS:
+            raise ValueError(f"Unsupported file type: {extension}")
+        module_name, _, function_name = _INPUT_FORMATS[extension].partition(":")
+        _BUILDERS[extension] = getattr(import_module(module_name), function_name)
+    return _BUILDERS[extension]
+
+
+register_input_format([".csv", ".tsv"], "life_expectancy.pipelines:eurostat_tsv")
+register_input_format([".json"], "life_expectancy.pipelines:eurostat_json")
+register_input_format([".zip"], "life_expectancy.pipelines:eurostat_zip")
+register_input_format([".parquet"], "life_expectancy.pipelines:cleaned_parquet")
+register_input_format([".feather", ".arrow"], "life_expectancy.pipelines:cleaned_arrow")
@@ -0,0 +1,238 @@
+"""
+This module provides incremental refreshes of the region output files.
+
+A manifest records, for every region output written, the input file it was
+written from and a hash of each of its rows, keyed by unit, sex, age and
+year. A refresh diffs the newly cleaned data of each region against it and
+only rewrites the outputs of the regions that changed. When the input file
+itself is unchanged, nothing is loaded at all.
+"""
+
+from dataclasses import dataclass, field
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from life_expectancy.region import Region
+
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST_DIR = Path(__file__).resolve().parent / "data" / ".manifest"
+KEY_COLUMNS = ["unit", "sex", "age", "year"]
+
+
+@dataclass
+class RegionHashes:
+    """
+    Hashes of the rows of a region, sorted by key:
+    - keys: hashes of the key columns
+    - values: hashes of the values
+    - order: positions of the rows in the frame they were computed from (not
+      stored in the manifest)
+    """
+
+    keys: np.ndarray
+    values: np.ndarray
+    order: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "RegionHashes":
+        """Hash the rows of a cleaned region frame"""
+        # Hashes do not depend on the dtype (categorical or str, int16 or
+        # int64), so compact and plain frames hash alike; values are hashed as
+        # float32, the narrowest type compact frames may hold them in
+        keys = pd.util.hash_pandas_object(df[KEY_COLUMNS], index=False).to_numpy()
+        values = pd.util.hash_array(df["value"].to_numpy(dtype="float32"))
+        order = np.argsort(keys, kind="stable")
+        return cls(keys[order], values[order], order)
+
+    def digest(self) -> str:
+        """Hash of all the rows"""
+        digest = hashlib.sha256(self.keys.tobytes())
+        digest.update(self.values.tobytes())
+        return digest.hexdigest()
+
+
+@dataclass
+class RegionChanges:
+    """
+    Rows of a region that changed since the last refresh:
+    - added, removed: number of keys that appeared or disappeared
+    - changed: number of keys whose value was revised
+    - new_years: years of the added rows
+    """
+
+    added: int = 0
+    removed: int = 0
+    changed: int = 0
+    new_years: List[int] = field(default_factory=list)
+
+    @classmethod
+    def between(
+        cls, old: Optional[RegionHashes], new: RegionHashes, df: pd.DataFrame
+    ) -> "RegionChanges":
+        """Changes from `old` (None for a new region) to `new`, the hashes of `df`"""
+        if old is None or len(old.keys) == 0:
+            found = np.zeros(len(new.keys), dtype=bool)
+            changed = found
+        else:
+            index = np.minimum(np.searchsorted(old.keys, new.keys), len(old.keys) - 1)
+            found = old.keys[index] == new.keys
+            changed = found & (old.values[index] != new.values)
+        years = df["year"].to_numpy()[new.order][~found]
+        return cls(
+            added=int((~found).sum()),
+            removed=(0 if old is None else len(old.keys)) - int(found.sum()),
+            changed=int(changed.sum()),
+            new_years=sorted({int(year) for year in years}),
+        )
+
+    def __str__(self) -> str:
+        years = f" (new years: {self.new_years})" if self.new_years else ""
+        return (
+            f"{self.added} added{years}, {self.changed} changed, "
+            f"{self.removed} removed"
+        )
+
+
+@dataclass
+class RefreshReport:
+    """
+    Outcome of an incremental refresh:
+    - rewritten: regions whose output was rewritten, with their changes
+    - unchanged: regions whose output was kept
+    - missing: regions of the last refresh absent from the new input (their
+      outputs are kept)
+    - input_unchanged: the input file was the one of the last refresh, so it
+      was not even loaded
+    """
+
+    rewritten: Dict[Region, RegionChanges] = field(default_factory=dict)
+    unchanged: List[Region] = field(default_factory=list)
+    missing: List[Region] = field(default_factory=list)
+    input_unchanged: bool = False
+
+    def __str__(self) -> str:
+        if self.input_unchanged:
+            return "Input unchanged since the last refresh: nothing rewritten"
+        lines = [
+            f"{region.value}: {changes}" for region, changes in self.rewritten.items()
+        ]
+        lines.append(
+            f"{len(self.rewritten)} region outputs rewritten, "
+            f"{len(self.unchanged)} unchanged"
+        )
+        if self.missing:
+            lines.append(
+                f"No longer in the input: {[region.value for region in self.missing]}"
+            )
+        return "\n".join(lines)
+
+
+class RefreshManifest:
+    """
+    Manifest of the region outputs written by incremental refreshes.
+
+    `manifest.json` holds, for every region, the key of the input it was
+    written from (see life_expectancy.cache.file_key), the output path and a
+    digest of its rows; the row hashes themselves are in `<region>.npz`.
+    """
+
+    def __init__(self, manifest_dir: Union[str, Path] = DEFAULT_MANIFEST_DIR):
+        self.manifest_dir = Path(manifest_dir)
+        self.data: Dict[str, Any] = self._read()
+
+    def _read(self) -> Dict[str, Any]:
+        """The stored manifest, or an empty one"""
+        try:
+            with open(self.manifest_dir / "manifest.json", encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        if data.get("version") != MANIFEST_VERSION:
+            data = {"version": MANIFEST_VERSION, "regions": {}}
+        return data
+
+    def is_current(
+        self,
+        input_key: str,
+        regions: Optional[Sequence[Region]],
+        output_path: Callable[[Region], Path],
+    ) -> bool:
+        """Whether the outputs of the regions (None: every region of the
+        input) were written from this input and still exist"""
+        if regions is None:
+            if self.data.get("all_regions_input_key") != input_key:
+                return False
+            regions = [Region(code) for code in self.data["all_regions"]]
+        entries = self.data["regions"]
+        return all(
+            region.value in entries
+            and entries[region.value]["input_key"] == input_key
+            and entries[region.value]["output"] == str(output_path(region))
+            and output_path(region).exists()
+            for region in regions
+        )
+
+    def output_matches(
+        self, region: Region, hashes: RegionHashes, output_file_path: Path
+    ) -> bool:
+        """Whether the output of a region exists and has the hashed rows"""
+        entry = self.data["regions"].get(region.value)
+        return (
+            entry is not None
+            and entry["digest"] == hashes.digest()
+            and entry["output"] == str(output_file_path)
+            and output_file_path.exists()
+        )
+
+    def hashes(self, region: Region) -> Optional[RegionHashes]:
+        """The row hashes stored for a region"""
+        try:
+            with np.load(self.manifest_dir / f"{region.value}.npz") as stored:
+                return RegionHashes(stored["keys"], stored["values"])
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def update(
+        self,
+        region: Region,
+        input_key: str,
+        output_file_path: Path,
+        hashes: Optional[RegionHashes] = None,
+    ) -> None:
+        """Record the output of a region; `hashes` are only needed if its rows
+        changed"""
+        entry = self.data["regions"].setdefault(region.value, {})
+        entry["input_key"] = input_key
+        entry["output"] = str(output_file_path)
+        if hashes is not None:
+            self.manifest_dir.mkdir(parents=True, exist_ok=True)
+            path = self.manifest_dir / f"{region.value}.npz"
+            with tempfile.NamedTemporaryFile(
+                dir=self.manifest_dir, suffix=".npz", delete=False
+            ) as file:
+                np.savez(file, keys=hashes.keys, values=hashes.values)
+            os.replace(file.name, path)
+            entry["digest"] = hashes.digest()
+            entry["rows"] = len(hashes.keys)
+
+    def save(
+        self, input_key: Optional[str] = None, regions: Sequence[Region] = ()
+    ) -> None:
+        """Write the manifest; `input_key` and `regions` record a refresh of
+        every region of an input"""
+        if input_key is not None:
+            self.data["all_regions_input_key"] = input_key
+            self.data["all_regions"] = [region.value for region in regions]
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.manifest_dir, suffix=".json", delete=False, encoding="utf-8"
+        ) as file:
+            json.dump(self.data, file, indent=2)
+        os.replace(file.name, self.manifest_dir / "manifest.json")
+        logging.info("Saved refresh manifest at %s", self.manifest_dir)
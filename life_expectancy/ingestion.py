@@ -0,0 +1,120 @@
+"""
+This module provides asynchronous ingestion of many input files.
+
+`ingest` loads a mix of TSV, JSON and zip inputs (any type `build_pipeline`
+supports) concurrently in a bounded executor and yields each parsed frame as
+soon as it is ready, so the time of a job approaches that of its slowest file
+rather than the sum of all of them. At most `max_pending` files are being
+loaded or waiting to be consumed at any time: new loads only start as the
+consumer takes results, which bounds memory when the consumer is slower than
+the loaders.
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+import time
+from typing import AsyncIterator, Dict, Iterable, Optional, Sequence, Set, Union
+import pandas as pd
+from life_expectancy.main import build_pipeline
+from life_expectancy.region import Region
+
+
+@dataclass
+class IngestedFile:
+    """
+    An input file loaded by `ingest`:
+    - data: the raw frame, or the cleaned one when ingesting with `clean`
+    - seconds: wall time spent loading (and cleaning) it in the executor
+    """
+
+    path: Path
+    data: pd.DataFrame
+    seconds: float
+
+
+def load_file(
+    path: Path, regions: Optional[Sequence[Region]] = None, clean: bool = False
+) -> IngestedFile:
+    """Load (and clean) one input file with the strategies of its type.
+
+    This is what `ingest` runs in its executor; it is a module-level function
+    so that process pools can run it too."""
+    start = time.perf_counter()
+    filehandler, cleaner = build_pipeline(path.suffix.lower(), regions)
+    df = filehandler.load_data(path)
+    if clean:
+        df = cleaner.clean(df)
+    return IngestedFile(path, df, time.perf_counter() - start)
+
+
+async def ingest(
+    paths: Iterable[Union[str, Path]],
+    max_pending: int = 4,
+    regions: Optional[Sequence[Region]] = None,
+    clean: bool = False,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[IngestedFile]:
+    """
+    Load the input files concurrently and yield them in completion order.
+
+    At most `max_pending` files are in flight, counting the loaded ones not
+    yet consumed. They are loaded in a pool of `max_pending` threads, or in
+    `executor` if given (e.g. a ProcessPoolExecutor, so that parsing JSON,
+    which holds the GIL, runs in parallel too).
+    `regions` is pushed down into the loaders; with `clean` the frames are
+    also cleaned, so inputs of different types come out with the same columns.
+    A file that fails to load raises its error when its turn comes.
+    """
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    pool = executor or ThreadPoolExecutor(
+        max_workers=max_pending, thread_name_prefix="ingest"
+    )
+    remaining = iter(paths)
+    pending: Set["asyncio.Future[IngestedFile]"] = set()
+    try:
+        while True:
+            # Refill the window; loads only start as results are consumed
+            while len(pending) < max_pending:
+                path = next(remaining, None)
+                if path is None:
+                    break
+                pending.add(
+                    loop.run_in_executor(pool, load_file, Path(path), regions, clean)
+                )
+            if not pending:
+                return
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            # The window is only refilled once every done file was consumed
+            for future in done:
+                yield future.result()
+    finally:
+        # Cancelling the pending futures cancels their executor jobs that
+        # have not started (shutdown's cancel_futures needs Python 3.9)
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            pool.shutdown(wait=False)
+
+
+def ingest_all(
+    paths: Iterable[Union[str, Path]],
+    max_pending: int = 4,
+    regions: Optional[Sequence[Region]] = None,
+    clean: bool = False,
+) -> Dict[Path, pd.DataFrame]:
+    """Synchronous wrapper of `ingest`: the frames of every file by path"""
+
+    async def collect() -> Dict[Path, pd.DataFrame]:
+        return {
+            ingested.path: ingested.data
+            async for ingested in ingest(
+                paths, max_pending, regions=regions, clean=clean
+            )
+        }
+
+    return asyncio.run(collect())
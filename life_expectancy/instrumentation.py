@@ -0,0 +1,315 @@
+"""
+This module provides per-stage timing and memory instrumentation.
+
+Code marks its stages with `stage(name)`; they are only measured while an
+`Instrumentation` is active (see `instrumented`), so marking a stage costs
+next to nothing otherwise. Each measured stage produces a `StageRecord` with
+its wall time, CPU time, peak memory delta and row count, which is kept for
+the final breakdown and handed to the instrumentation's sinks.
+"""
+
+from abc import ABC, abstractmethod
+import cProfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+import json
+import logging
+from pathlib import Path
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+@dataclass
+class StageRecord:
+    """
+    Measurements of one run of a stage:
+    - wall_s, cpu_s: wall and CPU time (CPU of the whole process)
+    - peak_memory_delta_mb: peak RSS during the stage minus the RSS when it
+      started; None for accumulated stages, which are only timed
+    - rows: number of rows the stage produced, when it sets it
+    - bytes: number of bytes the stage wrote, when it sets it
+    - depth: nesting level (0 for top-level stages)
+    """
+
+    stage: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_memory_delta_mb: Optional[float] = None
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    depth: int = 0
+
+
+class InstrumentationSink(ABC):
+    """Abstract class for destinations of stage records"""
+
+    @abstractmethod
+    def record(self, stage_record: StageRecord) -> None:
+        """Abstract method for handling a stage record"""
+
+
+class LoggingSink(InstrumentationSink):
+    """Class logging each stage record"""
+
+    def __init__(self, level: int = logging.INFO):
+        self.level = level
+
+    def record(self, stage_record: StageRecord) -> None:
+        logging.log(
+            self.level,
+            "Stage %s: %.3fs wall, %.3fs CPU, %s MB peak, %s rows",
+            stage_record.stage,
+            stage_record.wall_s,
+            stage_record.cpu_s,
+            stage_record.peak_memory_delta_mb,
+            stage_record.rows,
+        )
+
+
+class JSONLinesSink(InstrumentationSink):
+    """Class appending each stage record to a JSON lines file"""
+
+    def __init__(self, output_file_path: Union[str, Path]):
+        self.output_file_path = Path(output_file_path)
+
+    def record(self, stage_record: StageRecord) -> None:
+        with open(self.output_file_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(asdict(stage_record)) + "\n")
+
+
+class CallbackSink(InstrumentationSink):
+    """Class passing each stage record to a callback"""
+
+    def __init__(self, callback: Callable[[StageRecord], None]):
+        self.callback = callback
+
+    def record(self, stage_record: StageRecord) -> None:
+        self.callback(stage_record)
+
+
+@dataclass
+class _OpenStage:
+    """A stage being measured"""
+
+    record: StageRecord
+    start_wall: float
+    start_cpu: float
+    start_rss_kb: int
+    peak_rss_kb: int
+    # Accumulated child stages, recorded when this stage ends
+    accumulated: Dict[str, StageRecord] = field(default_factory=dict)
+
+
+class Instrumentation:
+    """
+    Collects the stage records of the code run while it is active.
+
+    With `profile`, every top-level stage also runs under cProfile, so the
+    profile of the slowest one can be saved with `dump_hot_profile`.
+    """
+
+    def __init__(
+        self, sinks: Sequence[InstrumentationSink] = (), profile: bool = False
+    ):
+        self.sinks = list(sinks)
+        self.profile = profile
+        self.records: List[StageRecord] = []
+        self._open: List[_OpenStage] = []
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        # Order in which stages first started, so parents precede children
+        self._order: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str, accumulate: bool = False) -> Iterator[StageRecord]:
+        """Measure the code run in the context as stage `name`.
+
+        Stages run many times in a tight loop (e.g. reads of a stream) should
+        `accumulate`: they are only timed, and their runs are added up into a
+        single record when the enclosing stage ends."""
+        self._order.setdefault(name, len(self._order))
+        if accumulate and self._open:
+            yield from self._accumulated_stage(name)
+            return
+
+        current_kb, peak_kb = rss_kb()
+        for open_stage in self._open:
+            open_stage.peak_rss_kb = max(open_stage.peak_rss_kb, peak_kb)
+        reset_peak_rss()
+        record = StageRecord(name, depth=len(self._open))
+        open_stage = _OpenStage(
+            record, time.perf_counter(), time.process_time(), current_kb, current_kb
+        )
+        self._open.append(open_stage)
+        profile = self._start_profile(name) if record.depth == 0 else None
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            self._open.pop()
+            record.wall_s = time.perf_counter() - open_stage.start_wall
+            record.cpu_s = time.process_time() - open_stage.start_cpu
+            open_stage.peak_rss_kb = max(open_stage.peak_rss_kb, rss_kb()[1])
+            for parent in self._open:
+                parent.peak_rss_kb = max(parent.peak_rss_kb, open_stage.peak_rss_kb)
+            record.peak_memory_delta_mb = round(
+                (open_stage.peak_rss_kb - open_stage.start_rss_kb) / 1024, 1
+            )
+            for child in open_stage.accumulated.values():
+                self._emit(child)
+            self._emit(record)
+
+    def _accumulated_stage(self, name: str) -> Iterator[StageRecord]:
+        """Time one run of an accumulated stage"""
+        parent = self._open[-1]
+        record = parent.accumulated.setdefault(
+            name, StageRecord(name, depth=len(self._open))
+        )
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_s += time.perf_counter() - start_wall
+            record.cpu_s += time.process_time() - start_cpu
+
+    def _start_profile(self, name: str) -> Optional[cProfile.Profile]:
+        """Resume the profile of a top-level stage, when profiling"""
+        if not self.profile:
+            return None
+        profile = self._profiles.setdefault(name, cProfile.Profile())
+        profile.enable()
+        return profile
+
+    def _emit(self, record: StageRecord) -> None:
+        """Keep a record and hand it to the sinks"""
+        self.records.append(record)
+        for sink in self.sinks:
+            sink.record(record)
+
+    def summary(self) -> List[StageRecord]:
+        """Records added up by stage, in the order stages first started"""
+        totals: Dict[str, StageRecord] = {}
+        for record in self.records:
+            total = totals.setdefault(record.stage, StageRecord(record.stage))
+            total.depth = record.depth
+            total.wall_s += record.wall_s
+            total.cpu_s += record.cpu_s
+            if record.peak_memory_delta_mb is not None:
+                total.peak_memory_delta_mb = max(
+                    total.peak_memory_delta_mb or 0.0, record.peak_memory_delta_mb
+                )
+            if record.rows is not None:
+                total.rows = (total.rows or 0) + record.rows
+            if record.bytes is not None:
+                total.bytes = (total.bytes or 0) + record.bytes
+        return sorted(totals.values(), key=lambda total: self._order[total.stage])
+
+    def hot_stage(self) -> Optional[str]:
+        """The top-level stage with the largest total wall time"""
+        top_level = [record for record in self.summary() if record.depth == 0]
+        if not top_level:
+            return None
+        return max(top_level, key=lambda record: record.wall_s).stage
+
+    def report(self) -> str:
+        """A table of the time, memory, rows and bytes written of every stage,
+        with the write throughput of the stages that wrote"""
+        lines = [
+            f"{'stage':<24} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'rows':>10}"
+            f" {'out MB':>9} {'MB/s':>9}"
+        ]
+        for record in self.summary():
+            name = "  " * record.depth + record.stage
+            peak = (
+                "-"
+                if record.peak_memory_delta_mb is None
+                else f"{record.peak_memory_delta_mb:.1f}"
+            )
+            rows = "-" if record.rows is None else f"{record.rows:,}"
+            out_mb = mb_s = "-"
+            if record.bytes is not None:
+                out_mb = f"{record.bytes / 2**20:.1f}"
+                mb_s = f"{write_rate_mb_s(record.bytes, record.wall_s):.1f}"
+            lines.append(
+                f"{name:<24} {record.wall_s:>9.3f} {record.cpu_s:>9.3f} "
+                f"{peak:>9} {rows:>10} {out_mb:>9} {mb_s:>9}"
+            )
+        return "\n".join(lines)
+
+    def dump_hot_profile(self, output_file_path: Union[str, Path]) -> Optional[str]:
+        """Save the cProfile stats of the hot stage; returns the stage name"""
+        hot_stage = self.hot_stage()
+        if hot_stage is None or hot_stage not in self._profiles:
+            return None
+        self._profiles[hot_stage].dump_stats(str(output_file_path))
+        return hot_stage
+
+
+_ACTIVE: ContextVar[Optional[Instrumentation]] = ContextVar(
+    "instrumentation", default=None
+)
+
+
+@contextmanager
+def instrumented(instrumentation: Optional[Instrumentation]) -> Iterator[None]:
+    """Make `instrumentation` measure the stages run in the context"""
+    if instrumentation is None:
+        yield
+        return
+    token = _ACTIVE.set(instrumentation)
+    try:
+        yield
+    finally:
+        _ACTIVE.reset(token)
+
+
+@contextmanager
+def stage(name: str, accumulate: bool = False) -> Iterator[StageRecord]:
+    """Mark the code run in the context as stage `name` (see Instrumentation.stage).
+
+    The yielded record's `rows` can be set; it is discarded when no
+    instrumentation is active."""
+    instrumentation = _ACTIVE.get()
+    if instrumentation is None:
+        yield StageRecord(name)
+        return
+    with instrumentation.stage(name, accumulate) as record:
+        yield record
+
+
+def write_rate_mb_s(n_bytes: int, wall_s: float) -> float:
+    """Throughput of writing `n_bytes` in `wall_s` seconds, in MB/s"""
+    return n_bytes / 2**20 / max(wall_s, 1e-9)
+
+
+def reset_peak_rss() -> None:
+    """Reset the peak RSS of this process to its current RSS (Linux only)"""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+
+def rss_kb() -> Tuple[int, int]:
+    """Current and peak RSS of this process in KB.
+
+    Outside Linux only the peak is known (and not resettable), so it is
+    returned for both."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as file:
+            fields = dict(line.split(":", 1) for line in file if ":" in line)
+        return int(fields["VmRSS"].split()[0]), int(fields["VmHWM"].split()[0])
+    except (OSError, KeyError):
+        pass
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return 0, 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    if sys.platform == "darwin":
+        peak //= 1024
+    return peak, peak
@@ -0,0 +1,155 @@
+"""
+This module provides the JSON parsers JSON inputs can be read with, and
+the incremental parsing of the top-level array of records of JSON inputs
+with them.
+
+It only imports the standard library (orjson is imported when its backend
+is created), so the command line can list the parsers without loading the
+loading strategies.
+"""
+
+from abc import ABC, abstractmethod
+import json
+import re
+from typing import IO, Any, Iterator, List, Optional, Tuple, Union
+
+
+class JSONParserBackend(ABC):
+    """Abstract class for the JSON parsers of JSONFileLoadingStrategy"""
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Parse a JSON document given as UTF-8 bytes or a str; invalid
+        documents raise a ValueError"""
+
+
+class StdlibJSONBackend(JSONParserBackend):
+    """JSON parser of the standard library"""
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonJSONBackend(JSONParserBackend):
+    """JSON parser of orjson, which parses UTF-8 bytes about twice as fast"""
+
+    def __init__(self) -> None:
+        self._orjson = _import_orjson()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)  # pylint: disable=no-member
+
+
+JSON_BACKENDS = {"stdlib": StdlibJSONBackend, "orjson": OrjsonJSONBackend}
+
+
+def json_backend(name: Optional[str] = None) -> JSONParserBackend:
+    """The JSON parser backend `name` (one of JSON_BACKENDS); by default orjson
+    if it is installed and the standard library otherwise"""
+    if name is not None:
+        if name not in JSON_BACKENDS:
+            raise ValueError(f"Unsupported JSON parser: {name}")
+        return JSON_BACKENDS[name]()
+    try:
+        return OrjsonJSONBackend()
+    except ImportError:
+        return StdlibJSONBackend()
+
+
+def _import_orjson() -> Any:
+    """Import orjson, the optional faster JSON parser"""
+    try:
+        import orjson  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError(
+            "The orjson JSON parser needs orjson: pip install -e '.[json]'"
+        ) from err
+    return orjson
+
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def iter_json_batches(
+    stream: IO[bytes], read_size: int, backend: JSONParserBackend
+) -> Iterator[List[Any]]:
+    """Yield the elements of a top-level JSON array read incrementally from a
+    binary stream, as batches of the elements completed by each read."""
+    buffer = b""
+    opened = first = False
+    eof = False
+    while not eof:
+        block = stream.read(read_size)
+        eof = not block
+        buffer += block
+        if not opened:
+            buffer = buffer.lstrip()
+            if not buffer:
+                continue
+            if not buffer.startswith(b"["):
+                raise ValueError("Expected a JSON array of records")
+            buffer = buffer[1:]
+            opened = first = True
+        batch, buffer = _complete_elements(buffer, backend, first)
+        if batch:
+            first = False
+            yield batch
+    if not opened:
+        raise ValueError("Expected a JSON array of records")
+    if buffer.strip() != b"]":
+        # Let the parser say what is wrong with the rest
+        backend.loads(b"[" + buffer)
+        raise ValueError("Unexpected content after the JSON array")
+
+
+def _complete_elements(
+    buffer: bytes, backend: JSONParserBackend, first: bool
+) -> Tuple[List[Any], bytes]:
+    """The complete array elements at the start of `buffer` (the first ones of
+    the array if `first`) and the bytes after them"""
+    body = buffer.lstrip()
+    if not first:
+        if not body or body.startswith(b"]"):
+            return [], buffer
+        if not body.startswith(b","):
+            raise ValueError(f"Unexpected character {body[:1]!r} in JSON array")
+        body = body[1:]
+    # Fast path: records end with "}", so the buffer up to its last "}" is
+    # usually whole records. If that "}" was in a string or a nested object,
+    # the slice is not valid JSON and the stdlib decoder finds the ends
+    end = body.rfind(b"}")
+    if end >= 0:
+        try:
+            return backend.loads(b"[" + body[: end + 1] + b"]"), body[end + 1 :]
+        except ValueError:
+            pass
+    elements, rest = _leading_elements(body)
+    return elements, rest if elements else buffer
+
+
+def _leading_elements(body: bytes) -> Tuple[List[Any], bytes]:
+    """The complete comma-separated JSON values at the start of `body` and
+    the bytes after them, found with the stdlib decoder"""
+    # surrogateescape keeps a multi-byte character cut at the end intact
+    text = body.decode("utf-8", "surrogateescape")
+    decoder = json.JSONDecoder()
+    elements: List[Any] = []
+    end = 0
+    while True:
+        pos = end
+        if elements:
+            pos = _WHITESPACE.match(text, pos).end()  # type: ignore[union-attr]
+            if not text.startswith(",", pos):
+                break
+            pos += 1
+        pos = _WHITESPACE.match(text, pos).end()  # type: ignore[union-attr]
+        try:
+            element, element_end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        if element_end == len(text):
+            # A scalar may have been cut at the end of the buffer
+            break
+        elements.append(element)
+        end = element_end
+    return elements, text[end:].encode("utf-8", "surrogateescape")
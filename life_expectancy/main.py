@@ -1,79 +1,749 @@
-""" This module is the main module of the life_expectancy package. 
+""" This module is the main module of the life_expectancy package.
 It is responsible for executing the 3 steps - loading, cleaning and saving"""
 
+# Heavy modules (pandas, the strategies, the cache) are imported by the
+# functions that need them, so that the command line starts fast
+# pylint: disable=import-outside-toplevel
+
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from importlib import import_module
+import logging
 from pathlib import Path
 import argparse
-import pandas as pd
-from life_expectancy.file_handler import (
-    FileHandler,
-    CSVFileLoadingStrategy,
-    JSONFileLoadingStrategy,
-    ZipFileLoadingStrategy,
-)
-from life_expectancy.data_cleaning import (
-    DataCleaner,
-    CSVCleaningStrategy,
-    JSONCleaningStrategy,
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+from life_expectancy.formats import input_extensions, pipeline_builder
+from life_expectancy.json_backends import JSON_BACKENDS
+from life_expectancy.projection import CLEANED_COLUMNS, Projection
+from life_expectancy.region import REGION_GROUPS, Region, resolve_regions
+from life_expectancy.instrumentation import (
+    Instrumentation,
+    JSONLinesSink,
+    instrumented,
+    stage,
 )
-from life_expectancy.region import Region
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from life_expectancy.aggregates import AggregateCube
+    from life_expectancy.cache import DatasetCache
+    from life_expectancy.data_cleaning import DataCleaner
+    from life_expectancy.file_handler import ChunkWriter, FileHandler
+    from life_expectancy.file_handler import FileSavingStrategy
+    from life_expectancy.incremental import RefreshManifest, RefreshReport
+    from life_expectancy.store import LifeExpectancyStore
 
-def loading_cleaning_saving(
-    country: Region, input_file: Path, input_file_ext: str
-) -> pd.DataFrame:
+# Names this module used to import eagerly, by module; they are imported on
+# first access (e.g. to patch life_expectancy.main.FileHandler)
+_LAZY_ATTRIBUTES = {
+    "life_expectancy.file_handler": (
+        "ChunkWriter",
+        "FileHandler",
+        "FileSavingStrategy",
+        "CSVFileSavingStrategy",
+        "ParquetFileSavingStrategy",
+        "FeatherFileSavingStrategy",
+        "CSVFileLoadingStrategy",
+        "JSONFileLoadingStrategy",
+        "ZipFileLoadingStrategy",
+        "ParquetFileLoadingStrategy",
+        "ArrowMemoryMapLoadingStrategy",
+    ),
+    "life_expectancy.data_cleaning": (
+        "DataCleaner",
+        "CleaningStrategy",
+        "CSVCleaningStrategy",
+        "JSONCleaningStrategy",
+        "CleanedDataCleaningStrategy",
+    ),
+    "life_expectancy.cache": ("DatasetCache", "file_key"),
+    "life_expectancy.incremental": (
+        "RefreshManifest",
+        "RefreshReport",
+        "RegionChanges",
+        "RegionHashes",
+    ),
+    "life_expectancy.store": ("LifeExpectancyStore",),
+    "life_expectancy.aggregates": ("AggregateCube",),
+}
+
+
+def __getattr__(name: str) -> Any:
+    for module_name, names in _LAZY_ATTRIBUTES.items():
+        if name in names:
+            value = getattr(import_module(module_name), name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Output formats: file extension of the outputs
+OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+# Validation modes: log the violations of the cleaned data, or raise
+VALIDATION_MODES = ("warn", "strict")
+
+
+@dataclass
+class PipelineOptions:  # pylint: disable=too-many-instance-attributes
     """
-    loading_cleaning_saving function responsible for executing the 3 steps -
-    loading, cleaning and saving
+    Optional settings of the pipeline entry points:
+    - cache: cache of the cleaned data of every region (see DatasetCache)
+    - write_threads: number of threads writing region files in batch mode
+    - output_format: one of OUTPUT_FORMATS
+    - compression: compression codec of the outputs: for CSV one of
+      life_expectancy.output_files.COMPRESSIONS, which also adds its
+      extension to the file names (default: uncompressed), else a Parquet or
+      Feather codec
+    - chunk_size: number of input rows (or records) processed at a time by
+      loading_cleaning_saving_chunked
+    - workers: number of processes cleaning the input (see
+      life_expectancy.parallel); chunks are always cleaned serially
+    - instrumentation: records the time and memory of each stage of the run
+      (see life_expectancy.instrumentation)
+    - json_parser: parser of JSON inputs, one of
+      life_expectancy.json_backends.JSON_BACKENDS (default: orjson if it is
+      installed, else the standard library)
+    - projection: columns and years to load (see life_expectancy.projection);
+      the rest of the input is skipped
+    - zip_members: name pattern of the members of zip inputs to load (see
+      ZipFileLoadingStrategy); None loads every member
+    - validation: one of VALIDATION_MODES, to validate the cleaned data
+      against life_expectancy.validation.CLEANED_SCHEMA; None skips it
+    - aggregate: also save the aggregates of the regions of a batch run (see
+      life_expectancy.aggregates) in aggregates_dir_path()
+    - spill_dir: directory in which loading_cleaning_saving_out_of_core
+      creates its temporary spill files (default: the system temp directory)
+    - spill_buffer_rows: number of cleaned rows loading_cleaning_saving_out_of_core
+      buffers before spilling them (see life_expectancy.out_of_core)
     """
+
+    cache: Optional["DatasetCache"] = None
+    write_threads: int = 1
+    output_format: str = "csv"
+    compression: Optional[str] = None
+    chunk_size: int = 2_000
+    workers: int = 1
+    instrumentation: Optional[Instrumentation] = None
+    json_parser: Optional[str] = None
+    projection: Optional[Projection] = None
+    zip_members: Optional[str] = None
+    validation: Optional[str] = "warn"
+    aggregate: bool = False
+    spill_dir: Optional[Path] = None
+    spill_buffer_rows: int = 250_000
+
+    def saving_strategy(self) -> "FileSavingStrategy":
+        """Saving strategy for the output format"""
+        from life_expectancy.file_handler import (
+            CSVFileSavingStrategy,
+            FeatherFileSavingStrategy,
+            ParquetFileSavingStrategy,
+        )
+
+        if self.output_format == "csv":
+            return CSVFileSavingStrategy(self.compression)
+        if self.output_format == "parquet":
+            return ParquetFileSavingStrategy(self.compression or "snappy")
+        if self.output_format == "feather":
+            return FeatherFileSavingStrategy(
+                self.compression or "uncompressed"  # type: ignore[arg-type]
+            )
+        raise ValueError(f"Unsupported output format: {self.output_format}")
+
+    def compression_suffix(self) -> str:
+        """Extension the compression of CSV outputs adds to their file names"""
+        if self.output_format != "csv" or self.compression is None:
+            return ""
+        from life_expectancy.output_files import COMPRESSIONS
+
+        return COMPRESSIONS[self.compression]
+
+    def output_path(self, country: Region) -> Path:
+        """Path of the output file of a region"""
+        path = output_file_path(country, self.output_format)
+        return path.with_name(path.name + self.compression_suffix())
+
+
+def output_file_path(country: Region, output_format: str = "csv") -> Path:
+    """Path of the cleaned output file for a region"""
     # Get absolute path of this file and its directory path
     FILE_PATH = Path(__file__).resolve()
     BASE_PATH = FILE_PATH.parent
 
     # Define output file path relative to base path
-    OUTPUT_FILE_PATH = (
-        BASE_PATH / "data" / f"{str(country.value).lower()}_life_expectancy.csv"
-    )
-
-    # Choose the appropriate strategy based on the input file type
-    if input_file_ext in (".csv", ".tsv"):
-        filehandler = FileHandler(CSVFileLoadingStrategy())
-        # Define variables cleaning  and filtering data
-        composed_col = "unit,sex,age,geo\\time"
-        decomposed_cols = ["unit", "sex", "age", "region"]
-        cleaner = DataCleaner(CSVCleaningStrategy(composed_col, decomposed_cols))
-    elif input_file_ext == ".json":
-        filehandler = FileHandler(JSONFileLoadingStrategy())
-        cleaner = DataCleaner(JSONCleaningStrategy())
-    elif input_file_ext == ".zip":
-        filehandler = FileHandler(ZipFileLoadingStrategy())
-        cleaner = DataCleaner(JSONCleaningStrategy())
-    else:
-        raise ValueError(f"Unsupported file type: {input_file_ext}")
+    file_name = f"{str(country.value).lower()}_life_expectancy"
+    return BASE_PATH / "data" / f"{file_name}{OUTPUT_FORMATS[output_format]}"
 
-    df_raw = filehandler.load_data(input_file)
 
-    df_final = cleaner.clean_data(df_raw, country)
+def aggregates_dir_path() -> Path:
+    """Directory of the saved aggregates, next to the cleaned output files"""
+    return output_file_path(Region.PT).parent / "aggregates"
+
+
+def build_pipeline(
+    input_file_ext: str,
+    regions: Optional[Sequence[Region]] = None,
+    options: Optional[PipelineOptions] = None,
+) -> Tuple["FileHandler", "DataCleaner"]:
+    """
+    Choose the loading, cleaning and saving strategies for an input file type,
+    from the registry of input formats (see life_expectancy.formats).
+    `regions` and `options.projection` are pushed down into the loader; None
+    loads every region (and every column and year).
+    """
+    from life_expectancy.data_cleaning import DataCleaner
+    from life_expectancy.file_handler import FileHandler
+    from life_expectancy.validation import CLEANED_SCHEMA
+
+    options = options or PipelineOptions()
+    if options.validation not in (None, *VALIDATION_MODES):
+        raise ValueError(f"Unsupported validation mode: {options.validation}")
+    saving_strategy = options.saving_strategy()
+    loading_strategy, cleaning_strategy = pipeline_builder(input_file_ext)(
+        regions, options
+    )
+    return (
+        FileHandler(loading_strategy, saving_strategy),
+        DataCleaner(
+            cleaning_strategy,
+            options.workers,
+            schema=CLEANED_SCHEMA if options.validation else None,
+            strict=options.validation == "strict",
+        ),
+    )
+
+
+def input_variant(input_file_ext: str, options: Optional[PipelineOptions]) -> str:
+    """What, besides the input file, the cleaned data depends on: its type,
+    the projection and the zip members loaded"""
+    if options is None:
+        return input_file_ext
+    variant = input_file_ext
+    if options.projection is not None:
+        variant += options.projection.key()
+    if options.zip_members is not None and input_file_ext == ".zip":
+        variant += f";members={options.zip_members}"
+    return variant
+
+
+def load_cleaned(
+    input_file: Path,
+    input_file_ext: str,
+    cache: "DatasetCache",
+    options: Optional[PipelineOptions] = None,
+) -> Tuple["FileHandler", "DataCleaner", "pd.DataFrame"]:
+    """
+    Load and clean every region of the input file (with compact dtypes),
+    reusing the cached result when the input file has not changed
+    """
+    filehandler, cleaner = build_pipeline(input_file_ext, options=options)
+    with stage("cache_load"):
+        key = cache.key(input_file, variant=input_variant(input_file_ext, options))
+        df_cleaned = cache.load(key)
+    if df_cleaned is None:
+        df_raw = filehandler.load_data(input_file)
+        df_cleaned = cleaner.clean(df_raw, compact=True)
+        with stage("cache_store"):
+            cache.store(key, df_cleaned)
+    return filehandler, cleaner, df_cleaned
+
+
+def loading_cleaning_saving(
+    country: Region,
+    input_file: Path,
+    input_file_ext: str,
+    options: Optional[PipelineOptions] = None,
+) -> "pd.DataFrame":
+    """
+    loading_cleaning_saving function responsible for executing the 3 steps -
+    loading, cleaning and saving. With a cache in `options`, the cleaned data
+    of every region is cached and the loading and cleaning are skipped on a hit.
+    """
+    options = options or PipelineOptions()
+    with instrumented(options.instrumentation):
+        if options.cache is None:
+            filehandler, cleaner = build_pipeline(input_file_ext, [country], options)
+            df_raw = filehandler.load_data(input_file)
+            df_final = cleaner.clean_data(
+                df_raw, country, available=filehandler.regions_seen()
+            )
+        else:
+            filehandler, cleaner, df_cleaned = load_cleaned(
+                input_file, input_file_ext, options.cache, options
+            )
+            df_final = cleaner.select_region(df_cleaned, country)
 
-    filehandler.save_data(df_final, OUTPUT_FILE_PATH, country.value)
+        filehandler.save_data(df_final, options.output_path(country), country.value)
 
     return df_final
 
 
+def load_cleaned_by_region(
+    countries: Optional[Sequence[Region]],
+    input_file: Path,
+    input_file_ext: str,
+    options: PipelineOptions,
+) -> Tuple["FileHandler", Dict[Region, "pd.DataFrame"]]:
+    """
+    Load and clean the input and split it by region (`countries=None` means
+    every region present in the input), using the cache if `options` has one
+    """
+    if options.cache is None:
+        filehandler, cleaner = build_pipeline(input_file_ext, countries, options)
+        df_raw = filehandler.load_data(input_file)
+        return filehandler, cleaner.clean_data_by_region(
+            df_raw, countries, available=filehandler.regions_seen()
+        )
+    filehandler, cleaner, df_cleaned = load_cleaned(
+        input_file, input_file_ext, options.cache, options
+    )
+    return filehandler, cleaner.split_by_region(df_cleaned, countries)
+
+
+def loading_cleaning_saving_batch(
+    countries: Optional[Sequence[Region]],
+    input_file: Path,
+    input_file_ext: str,
+    options: Optional[PipelineOptions] = None,
+) -> Dict[Region, "pd.DataFrame"]:
+    """
+    Batch version of loading_cleaning_saving: the input is loaded and cleaned
+    once and one output file is written per region. `countries=None` means
+    every region present in the input. With `options.write_threads > 1` the
+    output files are written concurrently.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    options = options or PipelineOptions()
+    with instrumented(options.instrumentation):
+        filehandler, df_by_region = load_cleaned_by_region(
+            countries, input_file, input_file_ext, options
+        )
+
+        def save(country: Region) -> None:
+            filehandler.save_data(
+                df_by_region[country], options.output_path(country), country.value
+            )
+
+        if options.write_threads > 1:
+            # Stages are only measured in this thread: time the writes as a whole
+            with stage("save") as record, ThreadPoolExecutor(
+                max_workers=options.write_threads
+            ) as executor:
+                list(executor.map(save, df_by_region))
+                record.rows = sum(len(df) for df in df_by_region.values())
+        else:
+            for country in df_by_region:
+                save(country)
+
+        if options.aggregate:
+            save_aggregates(df_by_region, filehandler, options)
+
+    return df_by_region
+
+
+def save_aggregates(
+    df_by_region: Dict[Region, "pd.DataFrame"],
+    filehandler: "FileHandler",
+    options: PipelineOptions,
+) -> "AggregateCube":
+    """Aggregate the cleaned data of the regions and save one file per table
+    of the aggregates in aggregates_dir_path()"""
+    from life_expectancy.aggregates import AggregateCube
+
+    with stage("aggregate") as record:
+        cube = AggregateCube.from_cleaned(df_by_region.values())
+        record.rows = len(cube.changes)
+
+    output_dir = aggregates_dir_path()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    extension = OUTPUT_FORMATS[options.output_format] + options.compression_suffix()
+    for name, table in cube.tables().items():
+        filehandler.save_data(
+            table, output_dir / f"{name}{extension}", name, label="aggregate table"
+        )
+    return cube
+
+
+def load_aggregates(
+    output_format: str = "csv", compression: Optional[str] = None
+) -> "AggregateCube":
+    """Load the aggregates saved by a batch run with `options.aggregate`,
+    in its `options.output_format` and `options.compression`"""
+    from life_expectancy.aggregates import AggregateCube
+
+    # As in compression_suffix(), only CSV outputs carry their compression
+    # in their file names
+    return AggregateCube.load(
+        aggregates_dir_path(),
+        OUTPUT_FORMATS[output_format],
+        compression if output_format == "csv" else None,
+    )
+
+
+def loading_cleaning_saving_chunked(
+    countries: Optional[Sequence[Region]],
+    input_file: Path,
+    input_file_ext: str,
+    options: Optional[PipelineOptions] = None,
+) -> Dict[Region, int]:
+    """
+    Streaming version of loading_cleaning_saving_batch: the input is read,
+    cleaned and split by region `options.chunk_size` rows at a time and each
+    chunk is appended to the region output files, so memory is bounded by the
+    chunk size rather than the input size. Output rows are ordered chunk by
+    chunk. Returns the number of rows written per region.
+    """
+    options = options or PipelineOptions()
+    with instrumented(options.instrumentation):
+        filehandler, cleaner = build_pipeline(
+            input_file_ext, countries, replace(options, workers=1)
+        )
+
+        rows: Dict[Region, int] = {}
+        with ExitStack() as stack:
+            writers: Dict[Region, "ChunkWriter"] = {}
+            for by_region in cleaner.clean_chunks(
+                filehandler.load_data_chunks(input_file, options.chunk_size), countries
+            ):
+                for country, df_chunk in by_region.items():
+                    if country not in writers:
+                        writers[country] = stack.enter_context(
+                            filehandler.open_chunk_writer(options.output_path(country))
+                        )
+                    with stage("save") as record:
+                        written = writers[country].bytes
+                        writers[country].write(df_chunk)
+                        record.rows = len(df_chunk)
+                        record.bytes = writers[country].bytes - written
+                    rows[country] = writers[country].rows
+            close_writers(writers)
+
+    for country, n_rows in rows.items():
+        logging.info(
+            "Successfully saved %d rows for region %s at %s (%s bytes)",
+            n_rows,
+            country.value,
+            options.output_path(country),
+            f"{writers[country].bytes:,}",
+        )
+    return rows
+
+
+def close_writers(writers: Dict[Region, "ChunkWriter"]) -> None:
+    """Finish the output files of the regions, measured as saves: writers
+    hold back the end of the files (compressor buffers, collected chunks)"""
+    for writer in writers.values():
+        with stage("save") as record:
+            written = writer.bytes
+            writer.close()
+            record.bytes = writer.bytes - written
+
+
+def loading_cleaning_saving_out_of_core(
+    countries: Optional[Sequence[Region]],
+    input_file: Path,
+    input_file_ext: str,
+    options: Optional[PipelineOptions] = None,
+) -> Dict[Region, int]:
+    """
+    Out-of-core version of loading_cleaning_saving_batch, for inputs larger
+    than memory: the input is cleaned `options.chunk_size` rows at a time and
+    spilled to disk by region, then each region is read back and saved on its
+    own (in `options.workers` processes), with the same outputs as the batch
+    pipeline (see life_expectancy.out_of_core). Returns the number of rows
+    written per region.
+    """
+    import tempfile
+    from life_expectancy.out_of_core import OutOfCoreEngine
+
+    options = options or PipelineOptions()
+    with instrumented(options.instrumentation), tempfile.TemporaryDirectory(
+        prefix="life_expectancy_spill_", dir=options.spill_dir
+    ) as spill_dir:
+        filehandler, cleaner = build_pipeline(
+            input_file_ext, countries, replace(options, workers=1)
+        )
+        engine = OutOfCoreEngine(
+            filehandler,
+            cleaner,
+            Path(spill_dir),
+            countries,
+            buffer_rows=options.spill_buffer_rows,
+        )
+        engine.spill(filehandler.load_data_chunks(input_file, options.chunk_size))
+        return engine.finish(
+            options.output_path,
+            options.workers,
+        )
+
+
+def loading_cleaning_saving_incremental(
+    countries: Optional[Sequence[Region]],
+    input_file: Path,
+    input_file_ext: str,
+    options: Optional[PipelineOptions] = None,
+    manifest: Optional["RefreshManifest"] = None,
+) -> "RefreshReport":
+    """
+    Incremental version of loading_cleaning_saving_batch: the cleaned rows of
+    each region are diffed against the manifest of the last refresh and only
+    the outputs of regions that changed are rewritten. If the input file is
+    the one of the last refresh, it is not loaded at all. Returns what changed.
+    """
+    from life_expectancy import incremental
+    from life_expectancy.cache import file_key
+
+    options = options or PipelineOptions()
+    if options.projection is not None and options.projection.fields is not None:
+        raise ValueError("Incremental refreshes need every column: drop the fields")
+    manifest = manifest or incremental.RefreshManifest()
+
+    with instrumented(options.instrumentation):
+        input_key = file_key(input_file, variant=input_variant(input_file_ext, options))
+        if manifest.is_current(input_key, countries, options.output_path):
+            report = incremental.RefreshReport(input_unchanged=True)
+            logging.info("%s", report)
+            return report
+
+        filehandler, df_by_region = load_cleaned_by_region(
+            countries, input_file, input_file_ext, options
+        )
+        report = incremental.RefreshReport()
+        for country, df_region in df_by_region.items():
+            with stage("diff"):
+                hashes = incremental.RegionHashes.from_frame(df_region)
+            if manifest.output_matches(country, hashes, options.output_path(country)):
+                manifest.update(country, input_key, options.output_path(country))
+                report.unchanged.append(country)
+                continue
+            report.rewritten[country] = incremental.RegionChanges.between(
+                manifest.hashes(country), hashes, df_region
+            )
+            filehandler.save_data(
+                df_region, options.output_path(country), country.value
+            )
+            manifest.update(country, input_key, options.output_path(country), hashes)
+
+        if countries is None:
+            report.missing = [
+                Region(code)
+                for code in manifest.data.get("all_regions", [])
+                if Region(code) not in df_by_region
+            ]
+            manifest.save(input_key, list(df_by_region))
+        else:
+            manifest.save()
+
+    logging.info("%s", report)
+    return report
+
+
+def load_store(
+    input_file: Path,
+    input_file_ext: str,
+    options: Optional[PipelineOptions] = None,
+) -> "LifeExpectancyStore":
+    """
+    Load and clean every region of the input file into a LifeExpectancyStore,
+    for services answering many lookups from one load. The cache in
+    `options`, if any, is used like in loading_cleaning_saving.
+    """
+    from life_expectancy.store import LifeExpectancyStore
+
+    options = options or PipelineOptions()
+    with instrumented(options.instrumentation):
+        if options.cache is None:
+            filehandler, cleaner = build_pipeline(input_file_ext, options=options)
+            df_cleaned = cleaner.clean(filehandler.load_data(input_file), compact=True)
+        else:
+            _, _, df_cleaned = load_cleaned(
+                input_file, input_file_ext, options.cache, options
+            )
+        with stage("index") as record:
+            store = LifeExpectancyStore(df_cleaned)
+            record.rows = len(store)
+    return store
+
+
+def parse_regions(values: Sequence[str]) -> Optional[List[Region]]:
+    """Parse the --region values: region codes and names of region groups
+    (e.g. EU27); `all` selects every region (None)"""
+    if any(value.lower() == "all" for value in values):
+        return None
+    return resolve_regions(values)
+
+
+def parse_projection(
+    years: Optional[str], fields: Optional[str]
+) -> Optional[Projection]:
+    """Parse the --years (e.g. `2000-2021` or `2021`) and --fields (e.g.
+    `sex,age,value`) values; None if neither is given"""
+    if years is None and fields is None:
+        return None
+    year_range = None
+    if years is not None:
+        first, _, last = years.partition("-")
+        year_range = (int(first), int(last or first))
+    field_names = None
+    if fields is not None:
+        field_names = tuple(field.strip() for field in fields.split(",") if field)
+    return Projection(field_names, year_range)
+
+
 if __name__ == "__main__":  # pragma: no cover
     parser = argparse.ArgumentParser(description="Clean European life expectancy data")
     parser.add_argument(
         "--region",
-        type=Region,
-        default=Region.PT,
-        help="The region code to filter the data by (default: PT)",
+        nargs="+",
+        default=[Region.PT.value],
+        help="One or more region codes or groups of regions "
+        f"({', '.join(REGION_GROUPS)}) to filter the data by, or `all` (default: PT)",
     )
     parser.add_argument(
         "--input-file",
         type=Path,
         default=None,
-        help="The input file containing life expectancy data (default: eu_life_expectancy_raw.tsv)",
+        help="The input file containing life expectancy data, one of "
+        f"{', '.join(input_extensions())} (default: eu_life_expectancy_raw.tsv)",
+    )
+    parser.add_argument(
+        "--write-threads",
+        type=int,
+        default=1,
+        help="Number of threads writing region files in batch mode (default: 1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the cache of cleaned data",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore any cached cleaned data and rebuild it",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=512,
+        help="Size limit of the cache of cleaned data in MB (default: 512)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=sorted(OUTPUT_FORMATS),
+        default="csv",
+        help="Format of the region output files (default: csv)",
+    )
+    parser.add_argument(
+        "--compression",
+        default=None,
+        help="Compression of CSV (gzip, bz2 or xz; default: uncompressed), "
+        "Parquet (default: snappy) or Feather (default: uncompressed) outputs",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Process the input this many rows at a time to bound memory use",
+    )
+    parser.add_argument(
+        "--out-of-core",
+        action="store_true",
+        help="Spill the cleaned input to disk by region and save the regions one "
+        "at a time, for inputs larger than memory (rows per chunk: --chunk-size)",
+    )
+    parser.add_argument(
+        "--spill-dir",
+        type=Path,
+        default=None,
+        help="Directory of the temporary spill files of --out-of-core "
+        "(default: the system temp directory)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes cleaning the input, or saving the regions "
+        "with --out-of-core (default: 1)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time, CPU and memory of each stage of the run",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=Path,
+        default=None,
+        help="Save a cProfile (pstats) file of the slowest stage (implies --profile)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        help="Append the measurements of each stage to this JSON lines file",
+    )
+    parser.add_argument(
+        "--years",
+        default=None,
+        help="Only load these years, e.g. 2000-2021 or 2021 (default: every year)",
+    )
+    parser.add_argument(
+        "--fields",
+        default=None,
+        help=f"Only load these comma-separated columns among {','.join(CLEANED_COLUMNS)}"
+        " (region and value are always loaded; default: every column)",
+    )
+    parser.add_argument(
+        "--json-parser",
+        choices=sorted(JSON_BACKENDS),
+        default=None,
+        help="Parser of JSON inputs (default: orjson if installed, else stdlib)",
+    )
+    parser.add_argument(
+        "--zip-members",
+        default=None,
+        help="Only load the members of a zip input matching this pattern, "
+        "e.g. '*_life_expectancy.json' (default: every member)",
+    )
+    parser.add_argument(
+        "--validation",
+        choices=["off", *VALIDATION_MODES],
+        default="warn",
+        help="Validate the cleaned data (dtypes, codes, year and value ranges, "
+        "unique keys) and log the violations (warn) or stop at the first failed "
+        "validation (strict) (default: warn)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rewrite the region outputs whose data changed since the last "
+        "incremental run",
+    )
+    parser.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="Also save the mean, min, max, yearly changes and sex gap of the "
+        "regions (with `--region all`: of the EU) next to the outputs",
     )
     args = parser.parse_args()
+    try:
+        selected_regions = parse_regions(args.region)
+    except ValueError as error:
+        parser.error(f"argument --region: {error}")
+    if args.aggregate and (args.incremental or args.chunk_size is not None):
+        parser.error("--aggregate is not supported with --incremental or --chunk-size")
+    if args.out_of_core and (args.incremental or args.aggregate):
+        parser.error("--out-of-core is not supported with --incremental or --aggregate")
+    if args.output_format == "csv" and args.compression is not None:
+        from life_expectancy import output_files
+
+        if args.compression not in output_files.COMPRESSIONS:
+            parser.error(
+                f"CSV outputs support --compression {sorted(output_files.COMPRESSIONS)}"
+            )
+    logging.basicConfig(level=logging.INFO)
 
     # If input file is not provided, use the default input file path
     if args.input_file is None:
@@ -84,4 +754,64 @@ if __name__ == "__main__":  # pragma: no cover
     # Get the file extension of the input file
     file_ext = args.input_file.suffix.lower()
 
-    loading_cleaning_saving(args.region, args.input_file, file_ext)
+    dataset_cache = None
+    if not args.no_cache:
+        from life_expectancy.cache import DatasetCache
+
+        dataset_cache = DatasetCache(
+            max_bytes=args.cache_size * 1024**2, refresh=args.refresh_cache
+        )
+
+    pipeline_options = PipelineOptions(
+        cache=dataset_cache,
+        write_threads=args.write_threads,
+        output_format=args.output_format,
+        compression=args.compression,
+        workers=args.workers,
+        json_parser=args.json_parser,
+        projection=parse_projection(args.years, args.fields),
+        zip_members=args.zip_members,
+        validation=None if args.validation == "off" else args.validation,
+        aggregate=args.aggregate,
+        spill_dir=args.spill_dir,
+    )
+    if args.profile or args.profile_output or args.metrics_file:
+        pipeline_options.instrumentation = Instrumentation(
+            sinks=[JSONLinesSink(args.metrics_file)] if args.metrics_file else [],
+            profile=args.profile_output is not None,
+        )
+
+    if args.incremental:
+        loading_cleaning_saving_incremental(
+            selected_regions, args.input_file, file_ext, pipeline_options
+        )
+    elif args.out_of_core:
+        if args.chunk_size is not None:
+            pipeline_options.chunk_size = args.chunk_size
+        loading_cleaning_saving_out_of_core(
+            selected_regions, args.input_file, file_ext, pipeline_options
+        )
+    elif args.chunk_size is not None:
+        pipeline_options.chunk_size = args.chunk_size
+        loading_cleaning_saving_chunked(
+            selected_regions, args.input_file, file_ext, pipeline_options
+        )
+    elif (
+        selected_regions is not None
+        and len(selected_regions) == 1
+        and not args.aggregate
+    ):
+        loading_cleaning_saving(
+            selected_regions[0], args.input_file, file_ext, pipeline_options
+        )
+    else:
+        loading_cleaning_saving_batch(
+            selected_regions, args.input_file, file_ext, pipeline_options
+        )
+
+    instrumentation = pipeline_options.instrumentation
+    if instrumentation is not None and (args.profile or args.profile_output):
+        print(instrumentation.report())
+        if args.profile_output is not None:
+            hot_stage = instrumentation.dump_hot_profile(args.profile_output)
+            print(f"Profile of stage {hot_stage} saved at {args.profile_output}")
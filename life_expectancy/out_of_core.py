@@ -0,0 +1,235 @@
+"""
+This module provides an out-of-core engine for the pipeline, for inputs
+larger than memory.
+
+The input is read and cleaned `chunk_size` rows at a time. The cleaned rows
+of each region, without missing values, are appended to a spill file of the
+region as pickled frames, with their position in the data cleaned from the
+whole input (see CleaningStrategy.cleaned_order), while a `CompactDtypes`
+gathers what the compact dtypes of the whole depend on. Each region is then
+finished on its own: its spilled rows are read back, put back in input order
+and given the compact dtypes, so its output is the one
+loading_cleaning_saving_batch writes, while memory is bounded by the chunk
+size and the largest region rather than by the input size. Regions are
+finished one at a time, or in a pool of processes.
+
+Spill files are only read back by the run that wrote them, from a directory
+of its own.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pickle
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+)
+import numpy as np
+import pandas as pd
+from life_expectancy.data_cleaning import (
+    REGION_CATEGORIES,
+    CompactDtypes,
+    DataCleaner,
+)
+from life_expectancy.file_handler import FileHandler
+from life_expectancy.instrumentation import stage
+from life_expectancy.region import Region
+
+if TYPE_CHECKING:
+    from life_expectancy.file_handler import FileSavingStrategy
+    from life_expectancy.validation import Schema
+
+# Column of the spilled rows holding their position in the cleaned input
+ORDER_COLUMN = "_order"
+# Codes of the `Region`s
+REGION_SET = frozenset(REGION_CATEGORIES)
+
+
+class OutOfCoreEngine:  # pylint: disable=too-many-instance-attributes
+    """
+    Runs the pipeline out of core: `spill` the chunks of the input, then
+    `finish` the regions. Spill files are written in `spill_dir`, which must
+    be empty. `regions` are the regions to output; None means every region
+    present in the input. Cleaned chunks are buffered until they hold
+    `buffer_rows` rows, then split by region and spilled together, so inputs
+    mixing regions are not spilled in many tiny pieces.
+    """
+
+    def __init__(
+        self,
+        filehandler: "FileHandler",
+        cleaner: DataCleaner,
+        spill_dir: Path,
+        regions: Optional[Sequence[Region]] = None,
+        buffer_rows: int = 250_000,
+    ):
+        self.filehandler = filehandler
+        self.cleaner = cleaner
+        self.spill_dir = spill_dir
+        self.regions = regions
+        self.buffer_rows = buffer_rows
+        self.compact_dtypes = CompactDtypes()
+        # Columns of the cleaned data, and the `Region`s found in it
+        self.columns: Optional[List[str]] = None
+        self.found: Set[str] = set()
+
+    def spill_path(self, region: Region) -> Path:
+        """Spill file of a region"""
+        return self.spill_dir / f"{region.value}.pickle"
+
+    def spill(self, chunks: Iterable[pd.DataFrame]) -> None:
+        """Clean the chunks of raw data one by one and append their rows to
+        the spill files of their regions"""
+        buffered: List[pd.DataFrame] = []
+        offset = 0
+        for df_raw in chunks:
+            df_cleaned = self.cleaner.clean(df_raw)
+            with stage("spill") as record:
+                order = self.cleaner.cleaning_strategy.cleaned_order(
+                    len(df_raw), len(df_cleaned), offset
+                )
+                offset += len(df_raw)
+                self.compact_dtypes.update(df_cleaned)
+                if self.columns is None:
+                    self.columns = list(df_cleaned.columns)
+                buffered.append(df_cleaned.assign(**{ORDER_COLUMN: order}))
+                if sum(len(df) for df in buffered) >= self.buffer_rows:
+                    record.rows = self._spill_buffered(buffered)
+                    buffered = []
+        with stage("spill") as record:
+            record.rows = self._spill_buffered(buffered)
+
+    def _spill_buffered(self, buffered: List[pd.DataFrame]) -> int:
+        """Append the rows of the buffered chunks without missing values to
+        the spill files of their regions; returns the number of rows spilled"""
+        if not buffered:
+            return 0
+        df = pd.concat(buffered, ignore_index=True)
+        index = self.cleaner.region_index(df)
+        present = [code for code in index.regions() if code in REGION_SET]
+        self.found.update(present)
+        wanted = [
+            code
+            for code in present
+            if self.regions is None or Region(code) in self.regions
+        ]
+        frames = index.split(
+            df.drop(columns="region"), wanted, keep=df["value"].notna().to_numpy()
+        )
+        for code, df_region in frames.items():
+            with open(self.spill_path(Region(code)), "ab") as spill_file:
+                pickle.dump(df_region, spill_file, pickle.HIGHEST_PROTOCOL)
+        return sum(len(df_region) for df_region in frames.values())
+
+    def finish(
+        self, output_path: Callable[[Region], Path], workers: int = 1
+    ) -> Dict[Region, int]:
+        """Read back each spilled region, save it at `output_path(region)` and
+        return the number of rows saved per region. With `workers > 1`, that
+        many regions are finished at a time, in processes.
+
+        Requested regions without data raise ValueError, like in
+        DataCleaner.split_by_region."""
+        present = [region for region in Region if region.value in self.found]
+        regions = list(self.regions) if self.regions is not None else present
+        invalid = [region for region in regions if region.value not in self.found]
+        if invalid:
+            raise ValueError(
+                f"Invalid regions: {invalid}. "
+                f"Available regions: {[region.value for region in present]}"
+            )
+        columns = self.columns or []
+        dtypes = self.compact_dtypes.dtypes()
+
+        if workers > 1 and len(regions) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(regions))) as pool:
+                futures = {
+                    region: pool.submit(
+                        _finish_region,
+                        self.spill_path(region),
+                        region,
+                        output_path(region),
+                        columns=columns,
+                        dtypes=dtypes,
+                        saving_strategy=self.filehandler.saving_strategy,
+                        schema=self.cleaner.schema,
+                        strict=self.cleaner.strict,
+                    )
+                    for region in regions
+                }
+                return {region: f.result() for region, f in futures.items()}
+
+        rows: Dict[Region, int] = {}
+        for region in regions:
+            with stage("merge") as record:
+                df_region = read_partition(
+                    self.spill_path(region), region, columns, dtypes
+                )
+                record.rows = len(df_region)
+            self.cleaner.validate(df_region)
+            self.filehandler.save_data(df_region, output_path(region), region.value)
+            rows[region] = len(df_region)
+        return rows
+
+
+def _read_pieces(path: Path) -> Iterator[pd.DataFrame]:
+    """Frames pickled one after the other in a spill file"""
+    with open(path, "rb") as spill_file:
+        while True:
+            try:
+                yield pickle.load(spill_file)
+            except EOFError:
+                return
+
+
+def read_partition(
+    path: Path, region: Region, columns: Sequence[str], dtypes: Dict[str, Any]
+) -> pd.DataFrame:
+    """Rows of a region spilled to `path`, in input order, with the columns
+    of the cleaned data and the compact `dtypes`"""
+    df = pd.concat(_read_pieces(path), ignore_index=True)
+    df = df.take(np.argsort(df[ORDER_COLUMN].to_numpy(), kind="stable"))
+    df = df.astype({col: dtype for col, dtype in dtypes.items() if col in df})
+    return _with_region(df, region, columns, dtypes)
+
+
+def _with_region(
+    df: pd.DataFrame, region: Region, columns: Sequence[str], dtypes: Dict[str, Any]
+) -> pd.DataFrame:
+    """Rows of a region, given back the region column the spill left out"""
+    code = REGION_CATEGORIES.index(region.value)
+    df = df.assign(
+        region=pd.Categorical.from_codes(
+            np.full(len(df), code, dtype="int8"), dtype=dtypes["region"]
+        )
+    )
+    return df[list(columns)].reset_index(drop=True)
+
+
+def _finish_region(  # pylint: disable=too-many-arguments
+    path: Path,
+    region: Region,
+    output_path: Path,
+    *,
+    columns: Sequence[str],
+    dtypes: Dict[str, Any],
+    saving_strategy: "FileSavingStrategy",
+    schema: Optional["Schema"],
+    strict: bool,
+) -> int:
+    """Finish a spilled region in a worker process"""
+    df_region = read_partition(path, region, columns, dtypes)
+    if schema is not None:
+        schema.validate(df_region).enforce(strict)
+    FileHandler(saving_strategy=saving_strategy).save_data(
+        df_region, output_path, region.value
+    )
+    return len(df_region)
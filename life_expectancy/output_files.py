@@ -0,0 +1,101 @@
+"""
+This module provides helpers to write output files: atomic replacement of
+the files and compressed text streams.
+"""
+
+import bz2
+from contextlib import contextmanager
+import gzip
+from io import TextIOWrapper
+import lzma
+import os
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, Optional
+import uuid
+from life_expectancy.instrumentation import write_rate_mb_s
+
+# Compressions of text outputs: file extension they add
+COMPRESSIONS = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+
+def _gzip_file(path: Path) -> gzip.GzipFile:
+    """Gzip stream without the file name and time in its header, which
+    GzipFile writes by default: identical data gives identical files, whatever
+    temporary path they were written to"""
+    file = open(path, "wb", buffering=0)  # pylint: disable=consider-using-with
+    # zlib's default level: GzipFile's 9 takes about 4 times as long for
+    # files under 10% smaller
+    gzip_file = gzip.GzipFile(
+        filename="", mode="wb", fileobj=file, compresslevel=6, mtime=0
+    )
+    # Closed with the stream, as when GzipFile opens the file itself
+    gzip_file.myfileobj = file
+    return gzip_file
+
+
+# Stdlib opener of the compressed binary stream of each compression
+_COMPRESSORS: Dict[str, Callable[[Path], Any]] = {
+    "gzip": _gzip_file,
+    "bz2": lambda path: bz2.BZ2File(path, "wb"),
+    "xz": lambda path: lzma.LZMAFile(path, "wb"),
+}
+
+
+def open_text(path: Path, compression: Optional[str] = None) -> IO[str]:
+    """Open a UTF-8 text file for writing, through the compressor of one of
+    COMPRESSIONS (None: uncompressed)"""
+    if compression is None:
+        return open(path, "w", encoding="utf-8", newline="")
+    return TextIOWrapper(_COMPRESSORS[compression](path), encoding="utf-8", newline="")
+
+
+def temporary_path(output_file_path: Path) -> Path:
+    """Hidden path next to `output_file_path` to write it to before moving it
+    in place (a rename within a directory, which is atomic)"""
+    return output_file_path.with_name(
+        f".{output_file_path.name}.{uuid.uuid4().hex[:8]}.tmp"
+    )
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Flush a directory entry change (a rename) to disk, where the platform
+    allows it: Windows cannot open directories"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def replace_durably(temp_path: Path, output_file_path: Path) -> None:
+    """Move the complete `temp_path` over `output_file_path`. Its data is
+    flushed to disk first, otherwise a crash after the rename can leave an
+    empty or partial file under the final name."""
+    with open(temp_path, "rb+") as file:
+        os.fsync(file.fileno())
+    os.replace(temp_path, output_file_path)
+    _fsync_directory(output_file_path.parent)
+
+
+@contextmanager
+def atomic_output(output_file_path: Path) -> Iterator[Path]:
+    """Path to write `output_file_path` to: it replaces `output_file_path`
+    when the context exits, so readers see the previous file or the complete
+    new one but never a partial one. On error it is removed instead."""
+    temp_path = temporary_path(output_file_path)
+    try:
+        yield temp_path
+        replace_durably(temp_path, output_file_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def throughput(n_bytes: int, wall_s: float) -> str:
+    """Bytes written and write throughput, for logs"""
+    return f"{n_bytes:,} bytes, {write_rate_mb_s(n_bytes, wall_s):.1f} MB/s"
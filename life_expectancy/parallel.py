@@ -0,0 +1,170 @@
+"""
+This module provides a process-pool engine for cleaning.
+
+The raw frame is split with `CleaningStrategy.partition`, each part is cleaned
+in a worker process and the cleaned columns are handed back through shared
+memory blocks instead of pickled frames. The parent concatenates the parts in
+partition order, so the result is identical to cleaning serially. The attrs of
+the cleaned parts hold counts (e.g. of unparseable values, see
+data_cleaning.parse_values), which are added up.
+"""
+
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, cast
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from life_expectancy.data_cleaning import CleaningStrategy
+
+
+@dataclass
+class SharedColumn:
+    """
+    A cleaned column held in a shared memory block:
+    - dtype: dtype of the cleaned column
+    - block: name of the shared memory block
+    - array_dtype, length: layout of the array in the block
+    - uniques: values the codes in the block refer to, for columns that are
+      dictionary-encoded (anything but numpy numeric and categorical columns)
+    """
+
+    name: str
+    dtype: Any
+    block: str
+    array_dtype: str
+    length: int
+    uniques: Optional[pd.Index] = None
+
+
+def clean_in_parallel(
+    strategy: "CleaningStrategy", df_raw: pd.DataFrame, workers: int
+) -> pd.DataFrame:
+    """Clean the raw data with `strategy` in up to `workers` processes"""
+    parts = strategy.partition(df_raw, workers)
+    if len(parts) <= 1:
+        return strategy.clean(df_raw)
+
+    # Workers must share this process's resource tracker: one of their own
+    # would unlink the blocks they created as soon as they exit
+    resource_tracker.ensure_running()
+    with ProcessPoolExecutor(max_workers=len(parts)) as executor:
+        futures = [executor.submit(_clean_part, strategy, part) for part in parts]
+    try:
+        results = [future.result() for future in futures]
+        df_cleaned = _gather([columns for columns, _ in results])
+        for key in {key for _, attrs in results for key in attrs}:
+            counts: Counter = Counter()
+            for _, attrs in results:
+                counts.update(attrs.get(key, {}))
+            df_cleaned.attrs[key] = dict(counts)
+        return df_cleaned
+    finally:
+        _release_all(futures)
+
+
+def _clean_part(
+    strategy: "CleaningStrategy", df_part: pd.DataFrame
+) -> Tuple[List[SharedColumn], Dict[Any, Any]]:
+    """Worker: clean one part and move its columns to shared memory; the
+    attrs of the cleaned part are returned with them"""
+    df_cleaned = strategy.clean(df_part)
+    columns: List[SharedColumn] = []
+    try:
+        for name in df_cleaned.columns:
+            columns.append(_share_column(name, df_cleaned[name]))
+    except BaseException:
+        for column in columns:
+            _release(column.block)
+        raise
+    return columns, df_cleaned.attrs
+
+
+def _share_column(name: str, column: pd.Series) -> SharedColumn:
+    """Copy a column to a new shared memory block"""
+    uniques = None
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        values = column.cat.codes.to_numpy()
+    elif isinstance(column.dtype, np.dtype) and column.dtype.kind in "biuf":
+        values = column.to_numpy()
+    else:
+        values, uniques = pd.factorize(column)
+
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, values.dtype, buffer=block.buf)[:] = values
+    finally:
+        block.close()
+    return SharedColumn(
+        name, column.dtype, block.name, values.dtype.str, len(values), uniques
+    )
+
+
+@contextmanager
+def _attached(columns: List[SharedColumn]) -> Iterator[List[np.ndarray]]:
+    """Views on the shared memory blocks of the parts of a column"""
+    blocks = [shared_memory.SharedMemory(name=column.block) for column in columns]
+    try:
+        yield [
+            np.ndarray(column.length, column.array_dtype, buffer=block.buf)
+            for column, block in zip(columns, blocks)
+        ]
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _gather(results: List[List[SharedColumn]]) -> pd.DataFrame:
+    """Concatenate the cleaned parts, column by column, in partition order"""
+    data: Dict[str, Any] = {}
+    for i, first in enumerate(results[0]):
+        parts = [result[i] for result in results]
+        if first.uniques is not None:
+            data[first.name] = _decode(parts)
+            continue
+        with _attached(parts) as views:
+            values = np.concatenate(views)
+        if isinstance(first.dtype, pd.CategoricalDtype):
+            data[first.name] = pd.Categorical.from_codes(values, dtype=first.dtype)
+        else:
+            data[first.name] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def _decode(parts: List[SharedColumn]) -> pd.Index:
+    """Concatenate the parts of a dictionary-encoded column"""
+    uniques = [cast(pd.Index, part.uniques) for part in parts]
+    # Codes of each part index its own uniques: offset them
+    offsets = np.cumsum(np.array([0] + [len(part) for part in uniques[:-1]]))
+    with _attached(parts) as views:
+        codes = np.concatenate(
+            [
+                np.where(view >= 0, view + offset, -1)
+                for view, offset in zip(views, offsets)
+            ]
+        )
+    return (
+        uniques[0]
+        .append(uniques[1:])
+        .take(codes, allow_fill=True, fill_value=np.nan)
+        .astype(parts[0].dtype)
+    )
+
+
+def _release_all(futures: List[Future]) -> None:
+    """Free the shared memory blocks of every part that was cleaned"""
+    for future in futures:
+        if future.exception() is None:
+            for column in future.result()[0]:
+                _release(column.block)
+
+
+def _release(block_name: str) -> None:
+    """Free a shared memory block"""
+    block = shared_memory.SharedMemory(name=block_name)
+    block.close()
+    block.unlink()
@@ -0,0 +1,92 @@
+"""
+This module provides the pipeline builders of the built-in input formats.
+
+Each builder returns the loading and cleaning strategies of a format, with
+`regions` and `options.projection` pushed down into the loader. They are
+registered by extension in life_expectancy.formats and looked up with
+`build_pipeline` (see life_expectancy.main).
+"""
+
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
+from life_expectancy.data_cleaning import (
+    CleanedDataCleaningStrategy,
+    CleaningStrategy,
+    CSVCleaningStrategy,
+    JSONCleaningStrategy,
+)
+from life_expectancy.file_handler import (
+    ArrowMemoryMapLoadingStrategy,
+    CSVFileLoadingStrategy,
+    FileLoadingStrategy,
+    JSONFileLoadingStrategy,
+    ParquetFileLoadingStrategy,
+    ZipFileLoadingStrategy,
+)
+from life_expectancy.json_backends import json_backend
+from life_expectancy.projection import Projection
+from life_expectancy.region import Region
+
+if TYPE_CHECKING:
+    from life_expectancy.main import PipelineOptions
+
+Pipeline = Tuple[FileLoadingStrategy, CleaningStrategy]
+
+
+def eurostat_tsv(
+    regions: Optional[Sequence[Region]], options: "PipelineOptions"
+) -> Pipeline:
+    """Raw Eurostat TSV (or CSV) extracts"""
+    # Define variables cleaning  and filtering data
+    composed_col = "unit,sex,age,geo\\time"
+    decomposed_cols = ["unit", "sex", "age", "region"]
+    return CSVFileLoadingStrategy(regions, options.projection), CSVCleaningStrategy(
+        composed_col,
+        decomposed_cols,
+        options.projection.columns() if options.projection else None,
+    )
+
+
+def eurostat_json(
+    regions: Optional[Sequence[Region]], options: "PipelineOptions"
+) -> Pipeline:
+    """Eurostat JSON records; without a projection, only the fields the
+    cleaning uses are loaded"""
+    loading_strategy = JSONFileLoadingStrategy(
+        regions=regions,
+        projection=options.projection or Projection(),
+        backend=json_backend(options.json_parser),
+    )
+    return loading_strategy, JSONCleaningStrategy()
+
+
+def eurostat_zip(
+    regions: Optional[Sequence[Region]], options: "PipelineOptions"
+) -> Pipeline:
+    """Zip archives of Eurostat JSON records"""
+    loading_strategy = ZipFileLoadingStrategy(
+        regions=regions,
+        projection=options.projection or Projection(),
+        backend=json_backend(options.json_parser),
+        members=options.zip_members,
+    )
+    return loading_strategy, JSONCleaningStrategy()
+
+
+def cleaned_parquet(
+    regions: Optional[Sequence[Region]], options: "PipelineOptions"
+) -> Pipeline:
+    """Cleaned data saved as Parquet"""
+    return (
+        ParquetFileLoadingStrategy(regions, options.projection),
+        CleanedDataCleaningStrategy(),
+    )
+
+
+def cleaned_arrow(
+    regions: Optional[Sequence[Region]], options: "PipelineOptions"
+) -> Pipeline:
+    """Cleaned data saved as Feather (Arrow IPC), memory-mapped"""
+    return (
+        ArrowMemoryMapLoadingStrategy(regions, options.projection),
+        CleanedDataCleaningStrategy(),
+    )
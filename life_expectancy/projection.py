@@ -0,0 +1,61 @@
+"""Module to represent the columns and years of the cleaned data to load"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Columns of cleaned data, in their order
+CLEANED_COLUMNS = ("unit", "sex", "age", "region", "year", "value")
+# Fields of the Eurostat JSON records holding each cleaned column
+JSON_FIELDS = {
+    "unit": "unit",
+    "sex": "sex",
+    "age": "age",
+    "region": "country",
+    "year": "year",
+    "value": "life_expectancy",
+}
+
+
+@dataclass(frozen=True)
+class Projection:
+    """
+    Columns and years of the cleaned data to load; loaders skip the rest of
+    the input:
+    - fields: cleaned columns to keep, among CLEANED_COLUMNS; `region` and
+      `value` are always kept, as data is filtered and saved by region and
+      rows without a value are dropped. None keeps every column
+    - years: first and last year to keep (inclusive); None keeps every year
+    """
+
+    fields: Optional[Tuple[str, ...]] = None
+    years: Optional[Tuple[int, int]] = None
+
+    def __post_init__(self) -> None:
+        if self.fields is not None:
+            unknown = sorted(set(self.fields) - set(CLEANED_COLUMNS))
+            if unknown:
+                raise ValueError(
+                    f"Unknown fields {unknown}; choose among {list(CLEANED_COLUMNS)}"
+                )
+        if self.years is not None and self.years[0] > self.years[1]:
+            raise ValueError(f"Empty range of years: {self.years}")
+
+    def columns(self) -> List[str]:
+        """Cleaned columns kept, in their order"""
+        if self.fields is None:
+            return list(CLEANED_COLUMNS)
+        return [
+            column
+            for column in CLEANED_COLUMNS
+            if column in self.fields or column in ("region", "value")
+        ]
+
+    def keeps_year(self, year: int) -> bool:
+        """Whether rows of a year are kept"""
+        return self.years is None or self.years[0] <= year <= self.years[1]
+
+    def key(self) -> str:
+        """Text identifying the projection (empty when it keeps everything)"""
+        if self.fields is None and self.years is None:
+            return ""
+        years = "" if self.years is None else f"{self.years[0]}-{self.years[1]}"
+        return f"fields={','.join(self.columns())};years={years}"
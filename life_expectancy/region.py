@@ -1,7 +1,9 @@
 """Module to represent different regions """
 import enum
-from typing import List
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class Region(enum.Enum):
@@ -32,9 +34,40 @@ class Region(enum.Enum):
     CH = "CH"
 
     @classmethod
-    def get_actual_countries(cls, df: pd.DataFrame, col_name: str) -> List[str]:
+    def get_actual_countries(cls, df: "pd.DataFrame", col_name: str) -> List[str]:
         """Returns a list of all the actual countries present in the input data
         that match the enum values"""
         countries = set(df[col_name].unique())
         actual_countries = [c.value for c in cls if c.value in countries]
         return actual_countries
+
+
+# Named groups of regions (e.g. `--region EU27`), by upper-case name
+REGION_GROUPS: Dict[str, Tuple[Region, ...]] = {}
+
+
+def register_region_group(name: str, regions: Iterable[Union[Region, str]]) -> None:
+    """Register (or replace) a named group of regions, given as regions or codes"""
+    REGION_GROUPS[name.upper()] = tuple(
+        region if isinstance(region, Region) else Region(region.upper())
+        for region in regions
+    )
+
+
+def resolve_regions(names: Sequence[Union[Region, str]]) -> List[Region]:
+    """Regions of a list of regions, region codes and group names, in order
+    and without repetitions; raises ValueError for unknown names"""
+    regions: Dict[Region, None] = {}
+    for name in names:
+        if isinstance(name, Region):
+            regions[name] = None
+        elif name.upper() in REGION_GROUPS:
+            regions.update(dict.fromkeys(REGION_GROUPS[name.upper()]))
+        else:
+            regions[Region(name.upper())] = None
+    return list(regions)
+
+
+# Members of the groups among the regions above
+register_region_group("EU27", [r for r in Region if r not in (Region.UK, Region.CH)])
+register_region_group("EFTA", [Region.CH])
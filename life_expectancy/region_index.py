@@ -0,0 +1,101 @@
+"""
+This module provides an index of the rows of each region of cleaned data.
+
+A `RegionIndex` is built in one pass over the region column (its category
+codes for compact data): the row positions are sorted by region with a
+stable radix sort, so the rows of each region are a contiguous run of
+positions in frame order. Checking which regions are present is then a
+dictionary lookup, and selecting one region, or a group of them, takes
+their rows without scanning the frame again.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+class RegionIndex:
+    """Positions of the rows of each region code of a frame"""
+
+    def __init__(self, column: pd.Series):
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            names = [str(name) for name in column.cat.categories]
+        else:
+            factorized, uniques = pd.factorize(column)
+            codes = factorized.astype(np.min_scalar_type(-len(uniques) - 1))
+            names = [str(name) for name in uniques]
+        # Missing codes (-1) sort first and are left out
+        counts = np.bincount(codes.astype("int64") + 1, minlength=len(names) + 1)
+        bounds = np.cumsum(counts)
+        self._positions = np.argsort(codes, kind="stable")
+        self._bounds: Dict[str, Tuple[int, int]] = {
+            name: (int(bounds[i]), int(bounds[i + 1]))
+            for i, name in enumerate(names)
+            if counts[i + 1]
+        }
+        self.rows = len(column)
+
+    def __contains__(self, region: str) -> bool:
+        return region in self._bounds
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def regions(self) -> List[str]:
+        """Codes of the regions with rows"""
+        return list(self._bounds)
+
+    def count(self, region: str) -> int:
+        """Number of rows of a region (0 if it has none)"""
+        start, stop = self._bounds.get(region, (0, 0))
+        return stop - start
+
+    def positions(self, regions: Iterable[str]) -> np.ndarray:
+        """Positions of the rows of the regions, region by region and in frame
+        order within a region; regions without rows are skipped"""
+        runs = [
+            self._positions[slice(*self._bounds[region])]
+            for region in regions
+            if region in self._bounds
+        ]
+        if len(runs) == 1:
+            return runs[0]
+        return np.concatenate(runs) if runs else np.empty(0, dtype="int64")
+
+    def split(
+        self,
+        df: pd.DataFrame,
+        regions: Sequence[str],
+        keep: Optional[np.ndarray] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """Rows of `df` (the indexed frame) of each region with rows, only
+        those where `keep` (a mask over the rows of `df`) is set if given.
+        The rows of every region are taken at once, and each region is a
+        slice of them."""
+        present = [region for region in regions if region in self._bounds]
+        positions = self.positions(present)
+        lengths = np.array([self.count(region) for region in present], dtype="int64")
+        if keep is not None:
+            kept = keep[positions]
+            positions = positions[kept]
+            run_ends = np.cumsum(kept)[np.cumsum(lengths) - 1] if len(kept) else lengths
+            lengths = np.diff(run_ends, prepend=0)
+        df_taken = df.take(positions)
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        return {
+            region: df_taken.iloc[bounds[i] : bounds[i + 1]].reset_index(drop=True)
+            for i, region in enumerate(present)
+        }
+
+    def select(self, df: pd.DataFrame, regions: Iterable[str]) -> pd.DataFrame:
+        """Rows of `df` (the indexed frame) of the regions"""
+        positions = self.positions(regions)
+        if (
+            len(positions)
+            and positions[-1] - positions[0] == len(positions) - 1
+            and bool(np.all(positions[1:] > positions[:-1]))
+        ):
+            # Consecutive rows: a slice instead of a copy
+            return df.iloc[positions[0] : positions[-1] + 1]
+        return df.take(positions)
@@ -0,0 +1,297 @@
+"""
+This module provides a long-running server of the cleaned data of an input file.
+
+Every run of the command line pays the imports and a full load and cleaning
+of the input. A `WarmDataset` loads and cleans it once and keeps every region
+in memory; `PipelineServer` serves them over HTTP on a local port, so repeated
+region requests cost a lookup of a response serialized on first use:
+
+    GET /regions                   codes of the regions in the data (JSON)
+    GET /regions/<code>[?format=]  cleaned data of a region, as csv (default)
+                                   or json records
+    GET /status                    input file, rows and reloads (JSON)
+
+A watcher thread polls the size and mtime of the input file and reloads it in
+the background when they change; requests keep being served from the previous
+data until the new one is ready. See life_expectancy.client for a client.
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+from pathlib import Path
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+import pandas as pd
+from life_expectancy.cache import DatasetCache
+from life_expectancy.main import PipelineOptions, load_cleaned_by_region
+from life_expectancy.region import Region
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Response formats: their content type
+RESPONSE_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+
+def _serialize(df: pd.DataFrame, response_format: str) -> bytes:
+    """Body of a region response"""
+    if response_format == "json":
+        return df.to_json(orient="records").encode("utf-8")
+    return df.to_csv(index=False).encode("utf-8")
+
+
+@dataclass
+class _Snapshot:
+    """
+    Data loaded from one version of the input file:
+    - signature: size and mtime of the file it was loaded from
+    - responses: bodies already serialized, by region and format
+    """
+
+    signature: Tuple[int, int]
+    by_region: Dict[Region, pd.DataFrame]
+    loaded_at: float
+    responses: Dict[Tuple[Region, str], bytes] = field(default_factory=dict)
+
+
+class WarmDataset:
+    """
+    Cleaned data of every region of an input file, kept in memory.
+
+    The file is loaded and cleaned on creation with the pipeline of its type
+    (and the cache of `options`, if any). `reload_if_changed` reloads it when
+    its size or mtime changed; a failed reload keeps the previous data.
+    """
+
+    def __init__(
+        self, input_file: Union[str, Path], options: Optional[PipelineOptions] = None
+    ):
+        self.input_file = Path(input_file)
+        self.input_file_ext = self.input_file.suffix.lower()
+        self.options = options or PipelineOptions()
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._failed_signature: Optional[Tuple[int, int]] = None
+        self._snapshot = self._load(self._signature())
+
+    def _signature(self) -> Tuple[int, int]:
+        """Size and mtime of the input file"""
+        stat = self.input_file.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load(self, signature: Tuple[int, int]) -> _Snapshot:
+        """Load and clean the input file"""
+        start = time.perf_counter()
+        _, by_region = load_cleaned_by_region(
+            None, self.input_file, self.input_file_ext, self.options
+        )
+        logging.info(
+            "Loaded %d regions of %s in %.2f s",
+            len(by_region),
+            self.input_file,
+            time.perf_counter() - start,
+        )
+        return _Snapshot(signature, by_region, time.time())
+
+    def reload_if_changed(self) -> bool:
+        """Reload the input file if it changed since it was loaded; returns
+        whether it was reloaded"""
+        with self._reload_lock:
+            try:
+                signature = self._signature()
+            except FileNotFoundError:
+                logging.error("Input file %s not found.", self.input_file)
+                return False
+            if signature in (self._snapshot.signature, self._failed_signature):
+                return False
+            try:
+                snapshot = self._load(signature)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # e.g. a file still being written: retry when it changes again
+                logging.exception("Reloading %s failed", self.input_file)
+                self._failed_signature = signature
+                return False
+            # Requests in flight finish with the snapshot they started with
+            self._snapshot = snapshot
+            self.reloads += 1
+            return True
+
+    def regions(self) -> List[str]:
+        """Codes of the regions in the data"""
+        return [region.value for region in self._snapshot.by_region]
+
+    def region(self, region: Region) -> pd.DataFrame:
+        """Cleaned data of a region; raises KeyError if it is not in the data"""
+        return self._snapshot.by_region[region]
+
+    def response(self, region: Region, response_format: str = "csv") -> bytes:
+        """Serialized data of a region, one of RESPONSE_FORMATS; raises
+        KeyError if the region is not in the data"""
+        snapshot = self._snapshot
+        key = (region, response_format)
+        body = snapshot.responses.get(key)
+        if body is None:
+            body = _serialize(snapshot.by_region[region], response_format)
+            snapshot.responses[key] = body
+        return body
+
+    def status(self) -> Dict[str, object]:
+        """Description of the loaded data"""
+        snapshot = self._snapshot
+        return {
+            "input_file": str(self.input_file),
+            "regions": len(snapshot.by_region),
+            "rows": sum(len(df) for df in snapshot.by_region.values()),
+            "loaded_at": snapshot.loaded_at,
+            "reloads": self.reloads,
+        }
+
+
+class _RegionRequestHandler(BaseHTTPRequestHandler):
+    """Handler of the requests of a PipelineServer"""
+
+    server: "PipelineServer"
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve the regions, a region or the status"""
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        dataset = self.server.dataset
+        if parts == ["regions"]:
+            self._send_json(dataset.regions())
+        elif parts == ["status"]:
+            self._send_json(dataset.status())
+        elif len(parts) == 2 and parts[0] == "regions":
+            response_format = parse_qs(url.query).get("format", ["csv"])[0]
+            if response_format not in RESPONSE_FORMATS:
+                self.send_error(
+                    HTTPStatus.BAD_REQUEST, f"Unsupported format: {response_format}"
+                )
+                return
+            try:
+                body = dataset.response(Region(parts[1].upper()), response_format)
+            except (KeyError, ValueError):
+                self.send_error(HTTPStatus.NOT_FOUND, f"Unknown region: {parts[1]}")
+                return
+            self._send(body, RESPONSE_FORMATS[response_format])
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def _send_json(self, content: object) -> None:
+        self._send(json.dumps(content).encode("utf-8"), RESPONSE_FORMATS["json"])
+
+    def _send(self, body: bytes, content_type: str) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=W0622
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+class PipelineServer(ThreadingHTTPServer):
+    """
+    HTTP server of a WarmDataset. Unless `watch_interval` is None, a thread
+    checks every `watch_interval` seconds whether the input file changed and
+    reloads it.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        dataset: WarmDataset,
+        address: Tuple[str, int] = (DEFAULT_HOST, DEFAULT_PORT),
+        watch_interval: Optional[float] = 1.0,
+    ):
+        super().__init__(address, _RegionRequestHandler)
+        self.dataset = dataset
+        self._stop_watching = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        if watch_interval is not None:
+            self._watcher = threading.Thread(
+                target=self._watch, args=(watch_interval,), daemon=True
+            )
+            self._watcher.start()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server"""
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def _watch(self, interval: float) -> None:
+        """Reload the input file whenever it changes"""
+        while not self._stop_watching.wait(interval):
+            self.dataset.reload_if_changed()
+
+    def server_close(self) -> None:
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        super().server_close()
+
+
+def serve(
+    input_file: Union[str, Path],
+    options: Optional[PipelineOptions] = None,
+    address: Tuple[str, int] = (DEFAULT_HOST, DEFAULT_PORT),
+    watch_interval: Optional[float] = 1.0,
+) -> None:
+    """Load the input file and serve its regions until interrupted"""
+    with PipelineServer(
+        WarmDataset(input_file, options), address, watch_interval
+    ) as server:
+        logging.info("Serving %s at %s", input_file, server.url)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Stopping the server")
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """Serve an input file given on the command line"""
+    parser = argparse.ArgumentParser(description="Serve the cleaned data by region")
+    parser.add_argument(
+        "--input-file",
+        type=Path,
+        default=Path(__file__).resolve().parent / "data" / "eu_life_expectancy_raw.tsv",
+        help="Input file to serve (default: data/eu_life_expectancy_raw.tsv)",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"default: {DEFAULT_HOST}")
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help=f"default: {DEFAULT_PORT}"
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between checks of the input file for changes; 0 disables "
+        "hot reloads (default: 1)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Load without the cleaned data cache"
+    )
+    parsed = parser.parse_args(args)
+    logging.basicConfig(level=logging.INFO)
+
+    serve(
+        parsed.input_file,
+        PipelineOptions(cache=None if parsed.no_cache else DatasetCache()),
+        (parsed.host, parsed.port),
+        parsed.watch_interval or None,
+    )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
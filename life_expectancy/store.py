@@ -0,0 +1,185 @@
+"""
+This module provides an in-memory index over cleaned data for repeated lookups.
+
+A `LifeExpectancyStore` is built once from the cleaned all-regions frame. Each
+row's (region, sex, age, unit, year) is encoded into a single int64 key whose
+order is the lexicographic order of the columns, and the keys are kept sorted
+next to their values. A point lookup is then one binary search and a range
+of years is a contiguous slice, instead of a boolean mask over the frame.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+from life_expectancy.region import Region
+
+# Key columns, from the most to the least significant
+KEY_COLUMNS = ["region", "sex", "age", "unit", "year"]
+DEFAULT_UNIT = "YR"
+
+RegionLike = Union[Region, str]
+
+
+class LifeExpectancyStore:
+    """
+    Sorted index of a cleaned frame on (region, sex, age, unit, year).
+
+    Lookups take region (a Region or its code), sex, age and year, and
+    optionally the unit (default: YR). Values have the dtype of the frame's
+    value column (float32 for compact frames) and are NaN where the data is
+    missing, like in the frame.
+    """
+
+    def __init__(self, df_cleaned: pd.DataFrame):
+        labels: List[pd.Index] = []
+        codes: List[np.ndarray] = []
+        for name in KEY_COLUMNS[:-1]:
+            column_codes, uniques = pd.factorize(df_cleaned[name])
+            # Sort the labels themselves: categories may be in any order
+            uniques = pd.Index(uniques.astype(str))
+            order = uniques.argsort()
+            ranks = np.empty(len(order), dtype="int64")
+            ranks[order] = np.arange(len(order))
+            codes.append(ranks[column_codes])
+            labels.append(uniques[order])
+        self._labels = labels
+        self._codes: List[Dict[str, int]] = [
+            {label: code for code, label in enumerate(index)} for index in labels
+        ]
+
+        years = df_cleaned["year"].to_numpy(dtype="int64")
+        self.first_year = int(years.min()) if len(years) else 0
+        self.last_year = int(years.max()) if len(years) else -1
+        # Multipliers turning the codes of a row into its key
+        sizes = [len(index) for index in labels]
+        sizes.append(self.last_year - self.first_year + 1)
+        self._strides = [int(np.prod(sizes[i + 1 :])) for i in range(len(sizes))]
+
+        keys = years - self.first_year
+        for column_codes, stride in zip(codes, self._strides):
+            keys += column_codes * stride
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        if len(self._keys) > 1 and not np.all(np.diff(self._keys)):
+            raise ValueError(f"Duplicate rows for the same {', '.join(KEY_COLUMNS)}")
+        self._values = df_cleaned["value"].to_numpy()[order]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _series_key(
+        self, region: RegionLike, sex: str, age: str, unit: str
+    ) -> Optional[int]:
+        """Key of the first year of a series, or None if it is not in the store"""
+        key = 0
+        labels = (region.value if isinstance(region, Region) else region, sex, age)
+        for codes, label, stride in zip(self._codes, (*labels, unit), self._strides):
+            code = codes.get(label)
+            if code is None:
+                return None
+            key += code * stride
+        return key
+
+    def value(
+        self,
+        region: RegionLike,
+        sex: str,
+        age: str,
+        year: int,
+        unit: str = DEFAULT_UNIT,
+    ) -> np.floating:
+        """The value of one row; raises KeyError if there is no such row"""
+        key = self._series_key(region, sex, age, unit)
+        if key is not None and self.first_year <= year <= self.last_year:
+            key += int(year) - self.first_year
+            position = int(np.searchsorted(self._keys, key))
+            if position < len(self._keys) and self._keys[position] == key:
+                return self._values[position]
+        raise KeyError((region, sex, age, unit, year))
+
+    def series(
+        self,
+        region: RegionLike,
+        sex: str,
+        age: str,
+        years: Tuple[Optional[int], Optional[int]] = (None, None),
+        unit: str = DEFAULT_UNIT,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Years and values of the rows with years from `years[0]` to
+        `years[1]` (inclusive; None is unbounded), in year order.
+
+        The values are a read-only view on the store."""
+        key = self._series_key(region, sex, age, unit)
+        start, end = years
+        start = self.first_year if start is None else max(int(start), self.first_year)
+        end = self.last_year if end is None else min(int(end), self.last_year)
+        if key is None or start > end:
+            return np.empty(0, dtype="int64"), self._values[:0]
+        low = np.searchsorted(self._keys, key + start - self.first_year, "left")
+        high = np.searchsorted(self._keys, key + end - self.first_year, "right")
+        values = self._values[low:high]
+        values.flags.writeable = False
+        return self._years(self._keys[low:high]), values
+
+    def values(
+        self,
+        regions: Union[RegionLike, Sequence[RegionLike], np.ndarray],
+        sexes: Union[str, Sequence[str], np.ndarray],
+        ages: Union[str, Sequence[str], np.ndarray],
+        years: Union[int, Sequence[int], np.ndarray],
+        units: Union[str, Sequence[str], np.ndarray] = DEFAULT_UNIT,
+    ) -> np.ndarray:
+        """Values of many rows at once; arguments are broadcast against each
+        other like NumPy arrays. Rows that are not in the store are NaN."""
+        regions = np.asarray(regions, dtype=object)
+        region_codes = np.array(
+            [
+                region.value if isinstance(region, Region) else region
+                for region in regions.ravel()
+            ],
+            dtype=object,
+        ).reshape(regions.shape)
+        keys, found = self._encode(
+            [
+                region_codes,
+                *(np.asarray(column, dtype=object) for column in (sexes, ages, units)),
+            ],
+            np.asarray(years, dtype="int64"),
+        )
+        if not self._keys.size:
+            return np.full(keys.shape, np.nan)
+        positions = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        found &= self._keys[positions] == keys
+        return np.where(found, self._values[positions], np.nan)
+
+    def _encode(
+        self, labels: List[np.ndarray], years: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Keys of the broadcast labels and years, and whether each of their
+        parts is known to the store"""
+        keys = years - self.first_year
+        keys = np.broadcast_to(
+            keys, np.broadcast_shapes(keys.shape, *(array.shape for array in labels))
+        ).copy()
+        found = (keys >= 0) & (keys <= self.last_year - self.first_year)
+        for index, array, stride in zip(self._labels, labels, self._strides):
+            codes = index.get_indexer(pd.Index(array.ravel())).reshape(array.shape)
+            found &= codes >= 0
+            keys += codes * stride
+        return keys, found
+
+    def _years(self, keys: np.ndarray) -> np.ndarray:
+        """Years of keys"""
+        return keys % self._strides[-2] + self.first_year
+
+    def to_frame(self) -> pd.DataFrame:
+        """The values as a frame indexed by the sorted (region, sex, age, unit,
+        year) multi-index"""
+        levels = [
+            pd.Categorical.from_codes((self._keys // stride) % len(index), index)
+            for stride, index in zip(self._strides, self._labels)
+        ]
+        index = pd.MultiIndex.from_arrays(
+            [*levels, self._years(self._keys)], names=KEY_COLUMNS
+        )
+        return pd.DataFrame({"value": self._values}, index=index)
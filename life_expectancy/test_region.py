@@ -1,7 +1,13 @@
 """Tests for the Region class."""
 
 import pandas as pd
-from life_expectancy.region import Region
+import pytest
+from life_expectancy.region import (
+    REGION_GROUPS,
+    Region,
+    register_region_group,
+    resolve_regions,
+)
 
 
 def test_get_actual_countries():
@@ -25,3 +31,19 @@ def test_get_actual_countries():
     # assert that the list of actual countries matches the expected list
     expected_countries = []
     assert actual_countries == expected_countries
+
+
+def test_resolve_regions():
+    """Test that region codes and groups resolve to regions, once each."""
+    assert resolve_regions(["pt", Region.ES, "PT"]) == [Region.PT, Region.ES]
+    assert resolve_regions(["EFTA"]) == [Region.CH]
+    eu27 = resolve_regions(["eu27"])
+    assert Region.PT in eu27 and Region.UK not in eu27 and Region.CH not in eu27
+
+    register_region_group("iberia", ["PT", Region.ES])
+    try:
+        assert resolve_regions(["IBERIA", "FR"]) == [Region.PT, Region.ES, Region.FR]
+    finally:
+        del REGION_GROUPS["IBERIA"]
+    with pytest.raises(ValueError):
+        resolve_regions(["ATLANTIS"])
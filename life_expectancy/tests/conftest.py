@@ -1,7 +1,13 @@
 """Pytest configuration file"""
 import json
+import threading
+from typing import Dict, List
+from unittest import mock
+import zipfile
+import numpy as np
 import pandas as pd
 import pytest
+from life_expectancy.server import PipelineServer, WarmDataset
 from . import FIXTURES_DIR, OUTPUT_DIR
 
 
@@ -17,6 +23,18 @@ def run_before_and_after_tests():
     file_path.unlink(missing_ok=True)
 
 
+@pytest.fixture(name="output_file_path")
+def fixture_output_file_path(tmp_path):
+    """Pipeline output paths in tmp_path: the patched
+    life_expectancy.main.output_file_path, which tests can call for the path of
+    a region output"""
+    with mock.patch("life_expectancy.main.output_file_path") as output_file_path:
+        output_file_path.side_effect = lambda country, output_format="csv": (
+            tmp_path / f"{country.value.lower()}_life_expectancy.{output_format}"
+        )
+        yield output_file_path
+
+
 @pytest.fixture(scope="session")
 def pt_life_expectancy_expected() -> pd.DataFrame:
     """Fixture to load the expected output of the cleaning script"""
@@ -45,6 +63,25 @@ def eu_life_expectancy_zip_file_good_json():
     return "eu_life_expectancy_expected_good.zip"
 
 
+@pytest.fixture
+def multi_member_zip(tmp_path):
+    """Fixture writing a zip of the raw json data with one member per country,
+    named like the region outputs, and a readme"""
+    with open(FIXTURES_DIR / "eu_life_expectancy_expected.json", encoding="utf-8") as f:
+        records = json.load(f)
+    by_country: Dict[str, List[Dict]] = {}
+    for record in records:
+        by_country.setdefault(record["country"], []).append(record)
+    zip_path = tmp_path / "eu_life_expectancy_by_country.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr("README.txt", "One file per country")
+        for country, country_records in by_country.items():
+            zip_ref.writestr(
+                f"{country.lower()}_life_expectancy.json", json.dumps(country_records)
+            )
+    return zip_path
+
+
 @pytest.fixture
 def eu_life_expectancy_zip_file_bad_zip():
     """Fixture to load the raw life expectancy data zip format"""
@@ -61,3 +98,55 @@ def nonexistent_file_json():
 def non_existing_file_path_csv():
     """Fixture to load the raw life expectancy data zip format"""
     return "non_existing_file_path.csv"
+
+
+@pytest.fixture
+def sample_frame() -> pd.DataFrame:
+    """Small frame mixing categorical, numeric and string columns"""
+    return pd.DataFrame(
+        {
+            "region": pd.Categorical(["PT", "ES", "PT"], categories=["PT", "ES"]),
+            "year": np.array([2021, 2020, 2019], dtype="int16"),
+            "value": np.array([21.7, np.nan, 20.1], dtype="float32"),
+            "flag": pd.Series(["e", None, "p"], dtype=str),
+        }
+    )
+
+
+@pytest.fixture
+def small_raw_tsv(tmp_path):
+    """Fixture writing a small TSV in the raw Eurostat format"""
+    content = (
+        "unit,sex,age,geo\\time\t2021 \t2020 \n"
+        "YR,F,Y65,ES\t23.1 e\t22.4 \n"
+        "YR,F,Y65,PT\t21.7 e\t21.0 \n"
+        "YR,M,Y65,ES\t19.3 ep\t18.5 \n"
+        "YR,M,Y65,PT\t17.8 e\t: \n"
+        "YR,T,Y65,PT\t19.9 \t19.4 b\n"
+        "YR,T,Y65,EU27_2020\t19.9 \t19.4 b\n"
+    )
+    path = tmp_path / "eu_life_expectancy_raw.tsv"
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def start_server():
+    """Fixture starting pipeline servers of input files on free ports; they
+    are stopped after the test"""
+    started = []
+
+    def start(input_file, watch_interval=None) -> PipelineServer:
+        server = PipelineServer(
+            WarmDataset(input_file), ("127.0.0.1", 0), watch_interval
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        started.append((server, thread))
+        return server
+
+    yield start
+    for server, thread in started:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,95 @@
+"""Tests for the aggregates module"""
+import numpy as np
+import pandas as pd
+import pytest
+from life_expectancy.aggregates import AggregateCube
+from life_expectancy.main import build_pipeline
+from life_expectancy.region import Region
+
+
+@pytest.fixture(name="cleaned")
+def fixture_cleaned(small_raw_tsv) -> pd.DataFrame:
+    """Compact cleaned data of the small raw TSV"""
+    filehandler, cleaner = build_pipeline(".tsv")
+    return cleaner.clean(filehandler.load_data(small_raw_tsv), compact=True)
+
+
+@pytest.fixture(name="cube")
+def fixture_cube(cleaned) -> AggregateCube:
+    """Aggregates of the small raw TSV, built from one frame per region"""
+    regions = [df for _, df in cleaned.groupby("region", observed=True)]
+    return AggregateCube.from_cleaned(regions)
+
+
+@pytest.mark.unit
+def test_cube_by_year_matches_group_by(cube, cleaned):
+    """Test that the by-year table holds the group-by of the detail rows"""
+    df = cleaned.astype({key: str for key in ["sex", "age", "unit"]})
+    expected = df.groupby(["sex", "age", "unit", "year"])["value"].agg(
+        ["mean", "min", "max", "count"]
+    )
+
+    by_year = cube.by_year
+    np.testing.assert_allclose(by_year["mean"], expected["mean"], rtol=1e-6)
+    np.testing.assert_allclose(by_year["min"], expected["min"])
+    np.testing.assert_allclose(by_year["max"], expected["max"])
+    assert by_year["regions"].tolist() == expected["count"].tolist()
+
+    female = cube.regions_by_year("F", "Y65")
+    assert female.index.tolist() == [2020, 2021]
+    assert female.loc[2021, "mean_delta"] == pytest.approx(
+        (23.1 + 21.7) / 2 - (22.4 + 21.0) / 2, abs=1e-5
+    )
+    assert np.isnan(female.loc[2020, "mean_delta"])
+    # The missing male value of PT in 2020 is left out of the aggregates
+    assert cube.regions_by_year("M", "Y65", (2020, 2020))["regions"].tolist() == [1]
+
+
+@pytest.mark.unit
+def test_cube_sex_gap_and_changes(cube):
+    """Test the sex gap and year-over-year changes of a region"""
+    gap = cube.gap(Region.ES, "Y65")
+    np.testing.assert_allclose(gap.to_numpy(), [22.4 - 18.5, 23.1 - 19.3], rtol=1e-5)
+    assert np.isnan(cube.gap("PT", "Y65", (2020, 2020)).iloc[0])
+
+    changes = cube.yearly_changes("PT", "T", "Y65")
+    assert changes.index.tolist() == [2020, 2021]
+    assert changes.loc[2021, "delta"] == pytest.approx(0.5, abs=1e-5)
+    assert cube.change("PT", "F", "Y65", (2020, 2021)) == pytest.approx(0.7, abs=1e-5)
+
+    with pytest.raises(KeyError):
+        cube.yearly_changes("FR", "T", "Y65")
+    with pytest.raises(KeyError):
+        cube.change("PT", "T", "Y65", (2019, 2021))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("extension", [".csv", ".parquet", ".feather"])
+def test_cube_save_and_load(cube, tmp_path, extension):
+    """Test that the saved tables load back into the same aggregates"""
+    writers = {
+        ".csv": lambda df, path: df.to_csv(path, index=False),
+        ".parquet": pd.DataFrame.to_parquet,
+        ".feather": pd.DataFrame.to_feather,
+    }
+    for name, table in cube.tables().items():
+        writers[extension](table, tmp_path / f"{name}{extension}")
+
+    loaded = AggregateCube.load(tmp_path, extension)
+
+    for name in ["by_year", "sex_gap", "changes"]:
+        pd.testing.assert_frame_equal(getattr(loaded, name), getattr(cube, name))
+
+
+@pytest.mark.unit
+def test_cube_load_compressed(cube, tmp_path):
+    """Test that compressed CSV tables load back into the same aggregates"""
+    for name, table in cube.tables().items():
+        table.to_csv(tmp_path / f"{name}.csv.xz", index=False)
+
+    loaded = AggregateCube.load(tmp_path, ".csv", "xz")
+
+    for name in ["by_year", "sex_gap", "changes"]:
+        pd.testing.assert_frame_equal(getattr(loaded, name), getattr(cube, name))
+    with pytest.raises(ValueError, match="Only CSV tables are compressed"):
+        AggregateCube.load(tmp_path, ".parquet", "xz")
@@ -0,0 +1,77 @@
+"""Tests for the cache module"""
+import os
+from unittest import mock
+import pandas as pd
+import pytest
+from life_expectancy.cache import DatasetCache
+from life_expectancy.main import PipelineOptions, loading_cleaning_saving
+from life_expectancy.region import Region
+from . import FIXTURES_DIR
+
+
+@pytest.mark.unit
+def test_store_and_load_roundtrip(tmp_path, sample_frame):
+    """Test that a stored frame is loaded back unchanged"""
+    cache = DatasetCache(tmp_path)
+    cache.store("abc", sample_frame)
+
+    pd.testing.assert_frame_equal(cache.load("abc"), sample_frame)
+    assert cache.load("missing") is None
+
+
+@pytest.mark.unit
+def test_refresh_ignores_existing_entries(tmp_path, sample_frame):
+    """Test that a refreshing cache never returns stored entries"""
+    DatasetCache(tmp_path).store("abc", sample_frame)
+
+    assert DatasetCache(tmp_path, refresh=True).load("abc") is None
+
+
+@pytest.mark.unit
+def test_key_changes_with_file_content(tmp_path):
+    """Test that the key depends on the input file content"""
+    input_file = tmp_path / "input.json"
+    input_file.write_text("[]", encoding="utf-8")
+    cache = DatasetCache(tmp_path / "cache")
+    key = cache.key(input_file)
+
+    assert cache.key(input_file) == key
+    assert cache.key(input_file, variant=".zip") != key
+    input_file.write_text("[{}]", encoding="utf-8")
+    assert cache.key(input_file) != key
+
+
+@pytest.mark.unit
+def test_evict_least_recently_used(tmp_path, sample_frame):
+    """Test that the least recently used entries are evicted first"""
+    cache = DatasetCache(tmp_path)
+    for key in ("old", "used", "new"):
+        cache.store(key, sample_frame)
+    entry_size = sum(f.stat().st_size for f in (tmp_path / "new").iterdir())
+    os.utime(tmp_path / "old", (1, 1))
+    os.utime(tmp_path / "used", (2, 2))
+    os.utime(tmp_path / "new", (3, 3))
+    cache.load("used")
+
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["new", "used"]
+
+
+@mock.patch("life_expectancy.main.FileHandler.save_data")
+def test_loading_cleaning_saving_with_cache(
+    mock_save_data, tmp_path, pt_life_expectancy_expected
+):
+    """Test that a warm run is served from the cache without loading the input"""
+    input_file = FIXTURES_DIR / "eu_life_expectancy_expected_good.zip"
+    options = PipelineOptions(cache=DatasetCache(tmp_path))
+
+    cold = loading_cleaning_saving(Region.PT, input_file, ".zip", options)
+    with mock.patch("life_expectancy.main.FileHandler.load_data") as mock_load_data:
+        warm = loading_cleaning_saving(Region.PT, input_file, ".zip", options)
+        mock_load_data.assert_not_called()
+
+    pd.testing.assert_frame_equal(cold, warm)
+    assert warm.to_csv(index=False) == pt_life_expectancy_expected.to_csv(index=False)
+    assert mock_save_data.call_count == 2
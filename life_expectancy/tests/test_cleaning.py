@@ -1,12 +1,19 @@
 """Tests for the cleaning module"""
+import numpy as np
 import pytest
 import pandas as pd
 from life_expectancy.region import Region
 
 from life_expectancy.data_cleaning import (
+    CompactDtypes,
     DataCleaner,
     JSONCleaningStrategy,
     CSVCleaningStrategy,
+    parse_values,
+    to_compact_dtypes,
+    AGE_CATEGORIES,
+    REGION_CATEGORIES,
+    SEX_CATEGORIES,
 )
 
 
@@ -42,3 +49,170 @@ def test_clean_data_with_json_strategy(
     pd.testing.assert_frame_equal(
         pt_life_expectancy_actual, pt_life_expectancy_expected
     )
+
+
+@pytest.mark.unit
+def test_clean_data_by_region(eu_life_expectancy_raw_json, pt_life_expectancy_expected):
+    """Run `clean_data_by_region` and check it splits the cleaned data by region"""
+    datacleaner = DataCleaner(cleaning_strategy=JSONCleaningStrategy())
+
+    by_region = datacleaner.clean_data_by_region(
+        eu_life_expectancy_raw_json, compact=False
+    )
+
+    assert set(by_region) == set(Region)
+    pd.testing.assert_frame_equal(by_region[Region.PT], pt_life_expectancy_expected)
+    assert (by_region[Region.FR]["region"] == "FR").all()
+
+
+@pytest.mark.unit
+def test_clean_data_by_region_invalid(eu_life_expectancy_raw_json):
+    """Run `clean_data_by_region` with a region missing from the data"""
+    df_raw = eu_life_expectancy_raw_json[eu_life_expectancy_raw_json["country"] == "PT"]
+    datacleaner = DataCleaner(cleaning_strategy=JSONCleaningStrategy())
+
+    with pytest.raises(ValueError):
+        datacleaner.clean_data_by_region(df_raw, [Region.PT, Region.ES])
+
+
+@pytest.mark.unit
+def test_parse_values_strips_flags():
+    """Test that `parse_values` strips Eurostat flags and handles missings"""
+    values = np.array(
+        ["21.7 e", "84.3 bp", ": ", None, 17.8, "21.7 e", "7"], dtype=object
+    )
+
+    parsed, unparseable = parse_values(values)
+
+    np.testing.assert_array_equal(
+        parsed, np.array([21.7, 84.3, np.nan, np.nan, 17.8, 21.7, 7.0])
+    )
+    assert not unparseable
+
+
+@pytest.mark.unit
+def test_parse_values_rejects_malformed_flags():
+    """Test that `parse_values` only strips flags suffixed after a space, and
+    counts the cells of the unparseable values as they were"""
+    values = np.array(["12.5 bc", "12.5bc", "abc", ": c", "abc"], dtype=object)
+
+    parsed, unparseable = parse_values(values)
+
+    np.testing.assert_array_equal(
+        parsed, np.array([12.5, np.nan, np.nan, np.nan, np.nan])
+    )
+    assert unparseable == {"12.5bc": 1, "abc": 2}
+
+
+@pytest.mark.unit
+def test_clean_data_by_region_compact(
+    eu_life_expectancy_raw_json, pt_life_expectancy_expected
+):
+    """Run `clean_data_by_region` with compact dtypes (the default)"""
+    datacleaner = DataCleaner(cleaning_strategy=JSONCleaningStrategy())
+
+    by_region = datacleaner.clean_data_by_region(eu_life_expectancy_raw_json)
+    pt_actual = by_region[Region.PT]
+
+    assert pt_actual["region"].dtype == pd.CategoricalDtype(REGION_CATEGORIES)
+    assert pt_actual["age"].dtype == pd.CategoricalDtype(AGE_CATEGORIES)
+    assert pt_actual["year"].dtype == "int16"
+    assert pt_actual["value"].dtype == "float32"
+    # Written out, the compact frame is identical to the regular one
+    assert pt_actual.to_csv(index=False) == pt_life_expectancy_expected.to_csv(
+        index=False
+    )
+    regular_size = pt_life_expectancy_expected.memory_usage(deep=True).sum()
+    assert pt_actual.memory_usage(deep=True).sum() * 4 < regular_size
+
+
+@pytest.mark.unit
+def test_to_compact_dtypes_keeps_float64_when_lossy():
+    """Test that `to_compact_dtypes` only downcasts values when lossless"""
+    df = pd.DataFrame(
+        {
+            "unit": ["YR", "YR"],
+            "sex": ["X", "F"],
+            "age": ["Y65", "Y65"],
+            "region": ["PT", "EU27_2020"],
+            "year": [2021, 2021],
+            "value": [21.123456789, 20.0],
+        }
+    )
+
+    compact = to_compact_dtypes(df)
+
+    assert compact["region"].tolist() == ["PT"]
+    assert compact["value"].dtype == "float64"
+    assert list(compact["sex"].cat.categories) == SEX_CATEGORIES + ["X"]
+
+
+@pytest.mark.unit
+def test_compact_dtypes_from_parts():
+    """Test that the dtypes decided from parts of the data are the ones of
+    `to_compact_dtypes` on the whole"""
+    df = pd.DataFrame(
+        {
+            "unit": ["YR", "YR", "YR", "YR"],
+            "sex": ["F", "X", "M", "T"],
+            "age": ["Y65", "Y65", "Y1", "Y65"],
+            "region": ["PT", "EU27_2020", "ES", "PT"],
+            "year": [2021, 2021, 2020, 1999],
+            "value": [21.5, 20.123456789, 19.25, np.nan],
+        }
+    )
+    parts = [df.iloc[:1], df.iloc[1:3], df.iloc[3:]]
+
+    for data in (df, df.drop(index=1)):
+        compact_dtypes = CompactDtypes()
+        for part in parts:
+            compact_dtypes.update(part.loc[part.index.isin(data.index)])
+        assert compact_dtypes.dtypes() == to_compact_dtypes(data).dtypes.to_dict()
+
+    # Each part fits float32 at a different precision than the whole
+    lossy = df.assign(value=[0.1, 20.0, 0.123456789, 1.0])
+    compact_dtypes = CompactDtypes()
+    compact_dtypes.update(lossy.iloc[:1])
+    assert compact_dtypes.dtypes()["value"] == "float32"
+    compact_dtypes.update(lossy.iloc[1:])
+    assert "value" not in compact_dtypes.dtypes()
+    assert to_compact_dtypes(lossy)["value"].dtype == "float64"
+
+
+@pytest.mark.unit
+def test_cleaned_order(eu_life_expectancy_raw_expected):
+    """Test that the order keys of cleaned chunks give the order of cleaning
+    the whole input"""
+    strategy = CSVCleaningStrategy(
+        "unit,sex,age,geo\\time", ["unit", "sex", "age", "region"]
+    )
+    df_raw = eu_life_expectancy_raw_expected.iloc[:500]
+    chunks = [df_raw.iloc[start : start + 120] for start in range(0, 500, 120)]
+
+    cleaned = [strategy.clean(chunk) for chunk in chunks]
+    orders = [
+        strategy.cleaned_order(len(chunk), len(df_chunk), start)
+        for chunk, df_chunk, start in zip(chunks, cleaned, range(0, 500, 120))
+    ]
+    df_chunked = pd.concat(cleaned, ignore_index=True)
+    df_chunked = df_chunked.take(np.argsort(np.concatenate(orders), kind="stable"))
+
+    pd.testing.assert_frame_equal(
+        df_chunked.reset_index(drop=True), strategy.clean(df_raw)
+    )
+    json_order = JSONCleaningStrategy().cleaned_order(3, 3, 10)
+    assert json_order.tolist() == [10, 11, 12]
+
+
+@pytest.mark.unit
+def test_filter_by_region_compact(eu_life_expectancy_raw_json):
+    """Test that filtering a compact frame compares region codes"""
+    datacleaner = DataCleaner(cleaning_strategy=JSONCleaningStrategy())
+    df_cleaned = datacleaner.clean(eu_life_expectancy_raw_json, compact=True)
+
+    pt_actual = datacleaner.filter_by_region(df_cleaned, Region.PT)
+
+    assert (pt_actual["region"] == "PT").all()
+    assert len(pt_actual) == len(
+        df_cleaned[(df_cleaned["region"] == "PT") & df_cleaned["value"].notna()]
+    )
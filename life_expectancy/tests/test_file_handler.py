@@ -1,18 +1,35 @@
 """Tests for the file_handler module"""
 
 from unittest import mock
+from io import BytesIO
 import json
+import logging
+import zipfile
 from pathlib import Path
-from typing import Union
+from typing import List, Union
+import numpy as np
 import pytest
 import pandas as pd
 from life_expectancy.file_handler import (
+    ArrowMemoryMapLoadingStrategy,
     FileHandler,
     FileLoadingStrategy,
     CSVFileLoadingStrategy,
+    CSVFileSavingStrategy,
     ZipFileLoadingStrategy,
     JSONFileLoadingStrategy,
+    ParquetFileLoadingStrategy,
+    ParquetFileSavingStrategy,
+    FeatherFileLoadingStrategy,
+    FeatherFileSavingStrategy,
+    member_region,
 )
+from life_expectancy.json_backends import (
+    OrjsonJSONBackend,
+    StdlibJSONBackend,
+    json_backend,
+)
+from life_expectancy.projection import Projection
 from life_expectancy.region import Region
 from . import FIXTURES_DIR
 
@@ -48,13 +65,96 @@ def test_load_data_with_zip_strategy(mock_load_data, eu_life_expectancy_raw_json
 
 
 @pytest.mark.unit
-@mock.patch("pandas.DataFrame.to_csv")
-def test_save_data(mock_to_csv, pt_life_expectancy_expected):
+def test_save_data(tmp_path, caplog, pt_life_expectancy_expected):
     """Run the `save_data` function and compare the output to the expected output"""
+    caplog.set_level(logging.INFO)
     filehandler = FileHandler()
-    output_file_path = "life_expectancy/data/pt_life_expectancy.csv"
+    output_file_path = tmp_path / "pt_life_expectancy.csv"
+    with mock.patch(
+        "pandas.DataFrame.to_csv", autospec=True, side_effect=pd.DataFrame.to_csv
+    ) as mock_to_csv:
+        filehandler.save_data(pt_life_expectancy_expected, output_file_path, Region.PT)
+
+    mock_to_csv.assert_called_once_with(
+        pt_life_expectancy_expected, mock.ANY, index=False
+    )
+    pd.testing.assert_frame_equal(
+        pd.read_csv(output_file_path), pt_life_expectancy_expected
+    )
+    # Written next to the output and moved in place
+    assert [path.name for path in tmp_path.iterdir()] == ["pt_life_expectancy.csv"]
+    assert f"{output_file_path.stat().st_size:,} bytes" in caplog.text
+
+
+@pytest.mark.unit
+def test_save_data_is_atomic(tmp_path, pt_life_expectancy_expected):
+    """Test that a save failing midway leaves the previous output as it was"""
+    output_file_path = tmp_path / "pt_life_expectancy.csv"
+    output_file_path.write_text("previous", encoding="utf-8")
+
+    def fail_midway(_df, file, **_kwargs):
+        file.write("unit,sex,age,region,year,value\n")
+        raise RuntimeError("disk full")
+
+    with mock.patch("pandas.DataFrame.to_csv", autospec=True, side_effect=fail_midway):
+        with pytest.raises(RuntimeError):
+            FileHandler().save_data(
+                pt_life_expectancy_expected, output_file_path, Region.PT
+            )
+
+    assert output_file_path.read_text(encoding="utf-8") == "previous"
+    assert [path.name for path in tmp_path.iterdir()] == ["pt_life_expectancy.csv"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunked", [False, True])
+def test_save_data_is_durable(tmp_path, pt_life_expectancy_expected, chunked):
+    """Test that outputs are flushed to disk before they are moved in place,
+    and the rename after"""
+    output_file_path = tmp_path / "pt_life_expectancy.csv"
+    synced = []
+
+    def record_fsync(_fd):
+        synced.append(output_file_path.exists())
+
+    with mock.patch("os.fsync", side_effect=record_fsync):
+        filehandler = FileHandler()
+        if chunked:
+            with filehandler.open_chunk_writer(output_file_path) as writer:
+                writer.write(pt_life_expectancy_expected)
+        else:
+            filehandler.save_data(
+                pt_life_expectancy_expected, output_file_path, Region.PT
+            )
+
+    # The temporary file before the rename, then its directory
+    assert synced == [False, True]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "compression, suffix", [("gzip", ".gz"), ("bz2", ".bz2"), ("xz", ".xz")]
+)
+def test_save_data_compressed(
+    tmp_path, pt_life_expectancy_expected, compression, suffix
+):
+    """Test that compressed CSV outputs read back to the saved data, and that
+    saving the same data again gives the same file"""
+    filehandler = FileHandler(saving_strategy=CSVFileSavingStrategy(compression))
+    output_file_path = tmp_path / f"pt_life_expectancy.csv{suffix}"
+
+    filehandler.save_data(pt_life_expectancy_expected, output_file_path, Region.PT)
+    saved = output_file_path.read_bytes()
     filehandler.save_data(pt_life_expectancy_expected, output_file_path, Region.PT)
-    mock_to_csv.assert_called_with(output_file_path, index=False)
+
+    assert output_file_path.read_bytes() == saved
+    assert len(saved) < len(pt_life_expectancy_expected.to_csv(index=False))
+    pd.testing.assert_frame_equal(
+        pd.read_csv(output_file_path), pt_life_expectancy_expected
+    )
+
+    with pytest.raises(ValueError, match="Unsupported CSV compression"):
+        CSVFileSavingStrategy("zip")
 
 
 @pytest.mark.unit
@@ -135,14 +235,15 @@ def test_save_data_with_none_dataframe(mock_to_csv, caplog):
 
 @pytest.mark.unit
 @mock.patch("pandas.DataFrame.to_csv", side_effect=PermissionError)
-def test_save_data_with_permission_error(mock_to_csv, caplog):
+def test_save_data_with_permission_error(mock_to_csv, caplog, tmp_path):
     """Test save_data method when there is a permission error"""
     filehandler = FileHandler()
-    output_file_path = "life_expectancy/data/pt_life_expectancy.csv"
+    output_file_path = tmp_path / "pt_life_expectancy.csv"
     df_final = pd.DataFrame({"col1": [1, 2, 3], "col2": [4, 5, 6]})
     filehandler.save_data(df_final, output_file_path, Region.PT)
-    mock_to_csv.assert_called_once_with(output_file_path, index=False)
+    mock_to_csv.assert_called_once_with(mock.ANY, index=False)
     assert "could not be created or written to." in caplog.text
+    assert not list(tmp_path.iterdir())
 
 
 @pytest.mark.unit
@@ -182,6 +283,21 @@ def test_load_data_from_content():
     pd.testing.assert_frame_equal(expected, result)
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "strategy",
+    [
+        ParquetFileLoadingStrategy(),
+        FeatherFileLoadingStrategy(),
+        ArrowMemoryMapLoadingStrategy(),
+    ],
+)
+def test_binary_load_data_from_content(strategy):
+    """Test that binary formats refuse to load data from a string"""
+    with pytest.raises(TypeError, match="binary format"):
+        strategy.load_data_from_content("unit,sex,age,region,year,value\n")
+
+
 @pytest.mark.unit
 def test_zip_file_loading_strategy_load_data(eu_life_expectancy_raw_json):
     """Test that the ZipFileLoadingStrategy.load_data method works as expected"""
@@ -194,3 +310,504 @@ def test_zip_file_loading_strategy_load_data(eu_life_expectancy_raw_json):
     # Check that the data was loaded correctly
 
     pd.testing.assert_frame_equal(df, eu_life_expectancy_raw_json)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("backend_name", ["stdlib", "orjson"])
+def test_json_strategy_load_data_from_stream_in_chunks(backend_name):
+    """Test that streaming a JSON array in small chunks matches `json.loads`"""
+    pytest.importorskip(backend_name if backend_name == "orjson" else "json")
+    records = [
+        {
+            "unit": "YR",
+            "sex": "F",
+            "age": "Y65",
+            "country": "PT",
+            "year": 2021,
+            "life_expectancy": 21.7,
+            "flag": "e",
+            "flag_detail": "estimated",
+        },
+        {
+            "unit": "YR",
+            "sex": "M",
+            "age": "Y65",
+            "country": "PT",
+            "year": 2021,
+            "life_expectancy": 17.8,
+            "flag": "",
+            "flag_detail": None,
+        },
+        {
+            "unit": "YR",
+            "sex": "T",
+            "age": "Y65",
+            "country": "PT",
+            "year": 2020,
+            "life_expectancy": 19.9,
+            "flag": "",
+            "flag_detail": None,
+        },
+    ]
+    content = json.dumps(records, indent=2)
+    expected = pd.DataFrame(records)
+
+    strategy = JSONFileLoadingStrategy(
+        chunk_size=2, read_size=7, backend=json_backend(backend_name)
+    )
+    result = strategy.load_data_from_stream(BytesIO(content.encode("utf-8")))
+
+    pd.testing.assert_frame_equal(expected, result)
+
+
+@pytest.mark.unit
+def test_json_strategy_load_data_from_stream_empty_array():
+    """Test that streaming an empty JSON array returns an empty dataframe"""
+    strategy = JSONFileLoadingStrategy()
+    result = strategy.load_data_from_stream(BytesIO(b" [ ] "))
+    assert result.empty
+
+
+@pytest.mark.unit
+def test_json_strategy_load_data_from_stream_invalid():
+    """Test that streaming a document that is not an array raises an error"""
+    strategy = JSONFileLoadingStrategy()
+    with pytest.raises(ValueError):
+        strategy.load_data_from_stream(BytesIO(b'{"col1": [1, 2, 3]}'))
+
+
+@pytest.mark.unit
+def test_csv_strategy_region_pushdown():
+    """Test that rows of other regions are skipped while loading a TSV"""
+    content = (
+        "unit,sex,age,geo\\time\t2021 \t2020 \n"
+        "YR,F,Y65,PT\t21.7 e\t21.0 \n"
+        "YR,F,Y65,ES\t23.1 e\t22.4 \n"
+        "YR,M,Y65,PT\t17.8 e\t: \n"
+    )
+    strategy = CSVFileLoadingStrategy(regions=[Region.PT])
+
+    from_content = strategy.load_data_from_content(content)
+    from_stream = strategy.load_data_from_stream(BytesIO(content.encode("utf-8")))
+
+    assert from_content["unit,sex,age,geo\\time"].tolist() == [
+        "YR,F,Y65,PT",
+        "YR,M,Y65,PT",
+    ]
+    pd.testing.assert_frame_equal(from_content, from_stream)
+    assert strategy.regions_seen == {"PT", "ES"}
+
+    # Without rows of the region, the columns are still those of the input
+    absent = CSVFileLoadingStrategy(regions=[Region.FR]).load_data_from_content(content)
+    assert absent.empty
+    assert list(absent.columns) == list(from_content.columns)
+
+
+@pytest.mark.unit
+def test_json_strategy_region_pushdown():
+    """Test that records of other regions are skipped while loading JSON"""
+    records = [
+        {
+            "unit": "YR",
+            "sex": "F",
+            "age": "Y65",
+            "country": "PT",
+            "year": 2021,
+            "life_expectancy": 21.7,
+        },
+        {
+            "unit": "YR",
+            "sex": "F",
+            "age": "Y65",
+            "country": "ES",
+            "year": 2021,
+            "life_expectancy": 23.1,
+        },
+    ]
+    content = json.dumps(records)
+    strategy = JSONFileLoadingStrategy(regions=[Region.PT])
+
+    from_content = strategy.load_data_from_content(content)
+    from_stream = strategy.load_data_from_stream(BytesIO(content.encode("utf-8")))
+
+    pd.testing.assert_frame_equal(from_content, pd.DataFrame(records[:1]))
+    pd.testing.assert_frame_equal(from_stream, pd.DataFrame(records[:1]))
+    assert strategy.regions_seen == {"PT", "ES"}
+
+    # Without records of the region, the columns are the fields cleaning uses
+    absent = JSONFileLoadingStrategy(regions=[Region.FR]).load_data_from_stream(
+        BytesIO(content.encode("utf-8"))
+    )
+    assert absent.empty
+    assert list(absent.columns) == list(records[0])
+
+
+@pytest.mark.unit
+def test_zip_strategy_region_pushdown(eu_life_expectancy_raw_json):
+    """Test that the zip strategy forwards the region filter to the inner strategy"""
+    df = ZipFileLoadingStrategy(regions=[Region.PT]).load_data(
+        input_file_path=FIXTURES_DIR / "eu_life_expectancy_expected_good.zip"
+    )
+    expected = eu_life_expectancy_raw_json[
+        eu_life_expectancy_raw_json["country"] == "PT"
+    ].reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "name, region",
+    [
+        ("pt_life_expectancy.json", Region.PT),
+        ("data/ES.tsv", Region.ES),
+        ("FR/life_expectancy.json", Region.FR),
+        ("eu_life_expectancy_raw.tsv", None),
+        ("partial.json", None),
+    ],
+)
+def test_member_region(name, region):
+    """Test that zip members named after a region are recognised"""
+    assert member_region(name) == region
+
+
+@pytest.mark.unit
+def test_zip_strategy_only_opens_requested_members(multi_member_zip):
+    """Test that only the members of the requested regions are decompressed
+    from an archive split by region"""
+    expected = ZipFileLoadingStrategy(regions=[Region.PT, Region.ES]).load_data(
+        FIXTURES_DIR / "eu_life_expectancy_expected_good.zip"
+    )
+    strategy = ZipFileLoadingStrategy(
+        regions=[Region.PT, Region.ES], members="*.json", max_workers=2
+    )
+    with mock.patch.object(
+        zipfile.ZipFile, "open", autospec=True, side_effect=zipfile.ZipFile.open
+    ) as mock_open:
+        df = strategy.load_data(multi_member_zip)
+
+    opened = sorted(call.args[1] for call in mock_open.call_args_list)
+    assert opened == ["es_life_expectancy.json", "pt_life_expectancy.json"]
+    pd.testing.assert_frame_equal(
+        df.sort_values(["country", "year"], ignore_index=True),
+        expected.sort_values(["country", "year"], ignore_index=True),
+    )
+
+
+@pytest.mark.unit
+def test_zip_strategy_loads_members_in_archive_order(
+    multi_member_zip, eu_life_expectancy_raw_json
+):
+    """Test that every selected member is loaded and concatenated in order"""
+    df = ZipFileLoadingStrategy(
+        projection=Projection(), members="*_life_expectancy.json"
+    ).load_data(multi_member_zip)
+
+    with zipfile.ZipFile(multi_member_zip) as zip_ref:
+        countries = [name.split("_life")[0].upper() for name in zip_ref.namelist()]
+    order = eu_life_expectancy_raw_json["country"].map(countries.index)
+    expected = eu_life_expectancy_raw_json.iloc[order.argsort(kind="stable")]
+    pd.testing.assert_frame_equal(df, expected[list(df.columns)].reset_index(drop=True))
+
+
+@pytest.mark.unit
+def test_zip_strategy_select_members():
+    """Test that members not named after a region are kept when no member is
+    named after the requested ones"""
+    names = ["data/", "README.txt", "es_life_expectancy.json", "eu_all.json"]
+    strategy = ZipFileLoadingStrategy(regions=[Region.PT], members="*.json")
+
+    assert strategy.select_members(names) == ["eu_all.json"]
+    assert ZipFileLoadingStrategy().select_members(names) == names[1:]
+
+
+@pytest.mark.unit
+def test_zip_strategy_no_matching_member(caplog, multi_member_zip):
+    """Test that an archive without any selected member loads nothing"""
+    df = ZipFileLoadingStrategy(members="*.tsv").load_data(multi_member_zip)
+
+    assert df.empty
+    assert "No member of" in caplog.text
+
+
+@pytest.mark.unit
+def test_parquet_save_and_load_by_region(tmp_path, pt_life_expectancy_expected):
+    """Test that Parquet output has one row group per region and that the
+    loading strategy reads back only the requested regions"""
+    pq = pytest.importorskip("pyarrow.parquet")
+    es_life_expectancy = pt_life_expectancy_expected.assign(region="ES")
+    df = pd.concat([pt_life_expectancy_expected, es_life_expectancy], ignore_index=True)
+    output_file_path = tmp_path / "life_expectancy.parquet"
+
+    FileHandler(saving_strategy=ParquetFileSavingStrategy("zstd")).save_data(
+        df, output_file_path, "PT"
+    )
+
+    assert pq.ParquetFile(output_file_path).num_row_groups == 2
+    pd.testing.assert_frame_equal(
+        ParquetFileLoadingStrategy().load_data(output_file_path), df
+    )
+    pd.testing.assert_frame_equal(
+        ParquetFileLoadingStrategy(regions=[Region.PT]).load_data(output_file_path),
+        pt_life_expectancy_expected,
+    )
+
+
+@pytest.mark.unit
+def test_feather_save_and_load(tmp_path, pt_life_expectancy_expected):
+    """Test that Feather output can be loaded back, optionally by region"""
+    pytest.importorskip("pyarrow")
+    output_file_path = tmp_path / "pt_life_expectancy.feather"
+
+    FileHandler(saving_strategy=FeatherFileSavingStrategy()).save_data(
+        pt_life_expectancy_expected, output_file_path, "PT"
+    )
+
+    pd.testing.assert_frame_equal(
+        FeatherFileLoadingStrategy().load_data(output_file_path),
+        pt_life_expectancy_expected,
+    )
+    assert (
+        FeatherFileLoadingStrategy(regions=[Region.ES])
+        .load_data(output_file_path)
+        .empty
+    )
+
+
+@pytest.mark.unit
+def test_binary_loading_strategies_file_not_found(caplog):
+    """Test the Parquet and Feather strategies when the file is not found"""
+    assert ParquetFileLoadingStrategy().load_data("nonexistent.parquet").empty
+    assert FeatherFileLoadingStrategy().load_data("nonexistent.feather").empty
+    assert "not found" in caplog.text
+
+
+@pytest.mark.unit
+def test_arrow_memory_map_loading_is_zero_copy(tmp_path):
+    """Test that memory-mapped Arrow columns are not copied into the heap"""
+    pa = pytest.importorskip("pyarrow")
+    n_rows = 200_000
+    df = pd.DataFrame(
+        {
+            "region": pd.Categorical(["PT", "ES"] * (n_rows // 2)),
+            "year": np.arange(n_rows, dtype="int32"),
+            "value": np.linspace(0, 90, n_rows),
+        }
+    )
+    input_file_path = tmp_path / "life_expectancy.arrow"
+    FeatherFileSavingStrategy().save_data(df, input_file_path)
+
+    allocated_before = pa.total_allocated_bytes()
+    df_mapped = ArrowMemoryMapLoadingStrategy().load_data(input_file_path)
+
+    pd.testing.assert_frame_equal(df_mapped, df)
+    assert not df_mapped["value"].to_numpy().flags.owndata
+    assert pa.total_allocated_bytes() - allocated_before < df["value"].nbytes // 10
+
+
+@pytest.mark.unit
+def test_arrow_memory_map_loading_by_region(tmp_path, pt_life_expectancy_expected):
+    """Test that the memory-mapped reader filters by region, from files and streams"""
+    pytest.importorskip("pyarrow")
+    es_life_expectancy = pt_life_expectancy_expected.assign(region="ES")
+    df = pd.concat([es_life_expectancy, pt_life_expectancy_expected], ignore_index=True)
+    input_file_path = tmp_path / "life_expectancy.feather"
+    FeatherFileSavingStrategy().save_data(df, input_file_path)
+    strategy = ArrowMemoryMapLoadingStrategy(regions=[Region.PT])
+
+    pd.testing.assert_frame_equal(
+        strategy.load_data(input_file_path), pt_life_expectancy_expected
+    )
+    with open(input_file_path, "rb") as stream:
+        pd.testing.assert_frame_equal(
+            strategy.load_data_from_stream(stream), pt_life_expectancy_expected
+        )
+    assert ArrowMemoryMapLoadingStrategy().load_data(tmp_path / "missing.arrow").empty
+
+
+@pytest.mark.unit
+def test_csv_strategy_load_data_chunks(small_raw_tsv):
+    """Test that a TSV is loaded in chunks of bounded size, optionally by region"""
+    chunks = list(CSVFileLoadingStrategy().load_data_chunks(small_raw_tsv, 4))
+    pt_chunks = list(
+        CSVFileLoadingStrategy(regions=[Region.PT]).load_data_chunks(small_raw_tsv, 2)
+    )
+
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    assert [len(chunk) for chunk in pt_chunks] == [2, 1]
+    missing = CSVFileLoadingStrategy().load_data_chunks("non_existing_file_path.csv", 2)
+    assert not list(missing)
+
+
+@pytest.mark.unit
+def test_json_strategy_load_data_chunks(tmp_path):
+    """Test that a JSON file is loaded in chunks of bounded size"""
+    input_file_path = tmp_path / "records.json"
+    input_file_path.write_text(
+        json.dumps([{"country": "PT", "year": year} for year in range(5)]),
+        encoding="utf-8",
+    )
+
+    chunks = list(JSONFileLoadingStrategy().load_data_chunks(input_file_path, 2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+    # Records left over from a read fill the next chunks before reading on
+    stream = BytesIO(input_file_path.read_bytes())
+    with mock.patch(
+        "life_expectancy.file_handler.open", create=True, return_value=stream
+    ), mock.patch.object(stream, "read", wraps=stream.read) as read:
+        chunks = JSONFileLoadingStrategy().load_data_chunks(input_file_path, 1)
+        next(chunks)
+        reads = read.call_count
+        next(chunks)
+        assert read.call_count == reads
+
+
+@pytest.mark.unit
+def test_chunk_writers(tmp_path, pt_life_expectancy_expected):
+    """Test that chunk writers produce the same file as a one-shot save"""
+    pytest.importorskip("pyarrow")
+    chunks = [pt_life_expectancy_expected[:100], pt_life_expectancy_expected[100:]]
+
+    for strategy, suffix, read in (
+        (CSVFileSavingStrategy(), ".csv", pd.read_csv),
+        (CSVFileSavingStrategy("gzip"), ".csv.gz", pd.read_csv),
+        (ParquetFileSavingStrategy(), ".parquet", pd.read_parquet),
+        (FeatherFileSavingStrategy(), ".feather", pd.read_feather),
+    ):
+        output_file_path = tmp_path / f"pt_life_expectancy{suffix}"
+        with FileHandler(saving_strategy=strategy).open_chunk_writer(
+            output_file_path
+        ) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+
+        assert writer.rows == len(pt_life_expectancy_expected)
+        assert writer.bytes == output_file_path.stat().st_size
+        pd.testing.assert_frame_equal(
+            read(output_file_path), pt_life_expectancy_expected
+        )
+
+
+@pytest.mark.unit
+def test_chunk_writers_abort(tmp_path, pt_life_expectancy_expected):
+    """Test that chunk writers exiting with an error leave the previous output
+    as it was"""
+    pytest.importorskip("pyarrow")
+    for strategy, suffix in (
+        (CSVFileSavingStrategy(), ".csv"),
+        (ParquetFileSavingStrategy(), ".parquet"),
+        (FeatherFileSavingStrategy(), ".feather"),
+    ):
+        output_file_path = tmp_path / f"pt_life_expectancy{suffix}"
+        output_file_path.write_bytes(b"previous")
+
+        with pytest.raises(RuntimeError):
+            with FileHandler(saving_strategy=strategy).open_chunk_writer(
+                output_file_path
+            ) as writer:
+                writer.write(pt_life_expectancy_expected)
+                raise RuntimeError("cleaning failed")
+
+        assert output_file_path.read_bytes() == b"previous"
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("read_size", [1, 5, 1 << 20])
+def test_json_strategy_stream_tricky_records(read_size):
+    """Test that records with "}" in strings, nested objects and multi-byte
+    characters are split correctly whatever the read size"""
+    records = [
+        {"country": "PT", "flag_detail": "a } b }", "life_expectancy": 21.7},
+        {"country": "ES", "flag_detail": {"note": "é}"}, "life_expectancy": 23.1},
+        {"country": "FR", "flag_detail": "ção", "life_expectancy": 1e2},
+    ]
+    content = json.dumps(records, ensure_ascii=False).encode("utf-8")
+
+    strategy = JSONFileLoadingStrategy(read_size=read_size)
+    result = strategy.load_data_from_stream(BytesIO(content))
+
+    pd.testing.assert_frame_equal(result, pd.DataFrame(records))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "content", [b"[{}, {}", b'[{"a": 1}] [', b'[{"a": 1} {"a": 2}]', b"", b"[1,]"]
+)
+def test_json_strategy_stream_invalid_arrays(content):
+    """Test that truncated or malformed arrays raise an error"""
+    strategy = JSONFileLoadingStrategy(backend=StdlibJSONBackend())
+    with pytest.raises(ValueError):
+        strategy.load_data_from_stream(BytesIO(content))
+
+
+@pytest.mark.unit
+def test_json_strategy_projection(eu_life_expectancy_raw_json):
+    """Test that only the fields and years of a projection are loaded"""
+    projection = Projection(fields=("year", "value"), years=(2019, 2020))
+
+    strategy = JSONFileLoadingStrategy(regions=[Region.PT], projection=projection)
+    result = strategy.load_data(FIXTURES_DIR / "eu_life_expectancy_expected.json")
+
+    raw = eu_life_expectancy_raw_json
+    expected = raw[(raw["country"] == "PT") & raw["year"].between(2019, 2020)]
+    expected = expected[["country", "year", "life_expectancy"]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.unit
+def test_csv_strategy_projection_skips_years():
+    """Test that only the composed column and the projected years are read"""
+    content = (
+        "unit,sex,age,geo\\time\t2021 \t2020 \t2019 \n"
+        "YR,F,Y65,PT\t21.7 e\t21.0 \t21.9 \n"
+    )
+    strategy = CSVFileLoadingStrategy(projection=Projection(years=(2020, 2030)))
+
+    result = strategy.load_data_from_content(content)
+
+    assert list(result.columns) == ["unit,sex,age,geo\\time", "2021 ", "2020 "]
+
+
+@pytest.mark.unit
+def test_json_backend_selection():
+    """Test that the default JSON backend is orjson when it is installed"""
+    orjson = pytest.importorskip("orjson")
+
+    assert json_backend().loads(b'{"a": [1]}') == orjson.loads(b'{"a": [1]}')
+    assert isinstance(json_backend(), OrjsonJSONBackend)
+    assert isinstance(json_backend("stdlib"), StdlibJSONBackend)
+    with pytest.raises(ValueError, match="Unsupported JSON parser"):
+        json_backend("simdjson")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("extension", ["parquet", "feather"])
+def test_cleaned_data_projection(tmp_path, pt_life_expectancy_expected, extension):
+    """Test that Parquet and Arrow inputs only load the projected data"""
+    pytest.importorskip("pyarrow")
+    output_file_path = tmp_path / f"pt_life_expectancy.{extension}"
+    saving_strategy = (
+        ParquetFileSavingStrategy()
+        if extension == "parquet"
+        else FeatherFileSavingStrategy()
+    )
+    FileHandler(saving_strategy=saving_strategy).save_data(
+        pt_life_expectancy_expected, output_file_path, "PT"
+    )
+    projection = Projection(fields=("age", "value"), years=(2019, 2020))
+    strategies: List[FileLoadingStrategy] = [
+        ArrowMemoryMapLoadingStrategy(projection=projection),
+        FeatherFileLoadingStrategy(projection=projection),
+    ]
+    if extension == "parquet":
+        strategies = [ParquetFileLoadingStrategy(projection=projection)]
+
+    df = pt_life_expectancy_expected
+    expected = df[df["year"].between(2019, 2020)][["age", "region", "value"]]
+    for strategy in strategies:
+        result = strategy.load_data(output_file_path)
+        assert list(result.columns) == ["age", "region", "value"]
+        assert result.to_csv(index=False) == expected.to_csv(index=False)
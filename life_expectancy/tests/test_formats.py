@@ -0,0 +1,43 @@
+"""Tests for the formats module"""
+import pytest
+from life_expectancy import formats
+from life_expectancy.data_cleaning import JSONCleaningStrategy
+from life_expectancy.file_handler import JSONFileLoadingStrategy
+from life_expectancy.formats import (
+    input_extensions,
+    pipeline_builder,
+    register_input_format,
+)
+from life_expectancy.main import PipelineOptions, build_pipeline
+from life_expectancy.pipelines import eurostat_json
+
+
+@pytest.mark.unit
+def test_builtin_input_formats():
+    """Test that every built-in extension resolves to its pipeline builder"""
+    assert input_extensions() == [
+        ".arrow",
+        ".csv",
+        ".feather",
+        ".json",
+        ".parquet",
+        ".tsv",
+        ".zip",
+    ]
+    assert pipeline_builder(".JSON") is eurostat_json
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        pipeline_builder(".xlsx")
+
+
+@pytest.mark.unit
+def test_register_input_format(monkeypatch):
+    """Test that a registered format is built from its builder"""
+    # pylint: disable=protected-access
+    monkeypatch.setattr(formats, "_INPUT_FORMATS", dict(formats._INPUT_FORMATS))
+    monkeypatch.setattr(formats, "_BUILDERS", {})
+    register_input_format([".jsonl"], "life_expectancy.pipelines:eurostat_json")
+
+    filehandler, cleaner = build_pipeline(".jsonl", options=PipelineOptions())
+
+    assert isinstance(filehandler.strategy, JSONFileLoadingStrategy)
+    assert isinstance(cleaner.cleaning_strategy, JSONCleaningStrategy)
@@ -0,0 +1,64 @@
+"""Tests for the incremental module"""
+import pandas as pd
+import pytest
+from life_expectancy.data_cleaning import to_compact_dtypes
+from life_expectancy.incremental import RefreshManifest, RegionChanges, RegionHashes
+from life_expectancy.main import loading_cleaning_saving_incremental
+from life_expectancy.region import Region
+
+
+@pytest.mark.unit
+def test_region_hashes_ignore_dtypes(pt_life_expectancy_expected):
+    """Test that compact and plain frames of the same rows hash alike"""
+    compact = to_compact_dtypes(pt_life_expectancy_expected)
+
+    assert (
+        RegionHashes.from_frame(compact).digest()
+        == RegionHashes.from_frame(pt_life_expectancy_expected).digest()
+    )
+
+
+@pytest.mark.unit
+def test_region_changes_between(pt_life_expectancy_expected):
+    """Test that added, removed and revised rows are counted"""
+    old = pt_life_expectancy_expected
+    new = pd.concat(
+        [old.iloc[1:], old.iloc[:1].assign(year=2030)], ignore_index=True
+    ).assign(value=lambda df: df["value"].where(df.index != 5, -1.0))
+    new_hashes = RegionHashes.from_frame(new)
+
+    changes = RegionChanges.between(RegionHashes.from_frame(old), new_hashes, new)
+    first = RegionChanges.between(None, new_hashes, new)
+
+    assert changes == RegionChanges(added=1, removed=1, changed=1, new_years=[2030])
+    assert (first.added, first.removed, first.changed) == (len(new), 0, 0)
+
+
+def test_loading_cleaning_saving_incremental(output_file_path, tmp_path, small_raw_tsv):
+    """Test that only the outputs of regions whose rows changed are rewritten"""
+
+    def refresh():
+        manifest = RefreshManifest(tmp_path / "manifest")
+        return loading_cleaning_saving_incremental(
+            None, small_raw_tsv, ".tsv", manifest=manifest
+        )
+
+    first = refresh()
+    again = refresh()
+    small_raw_tsv.write_text(
+        small_raw_tsv.read_text(encoding="utf-8").replace("23.1 e", "23.3 e"),
+        encoding="utf-8",
+    )
+    revised = refresh()
+    output_file_path(Region.PT).unlink()
+    restored = refresh()
+
+    assert {region: changes.added for region, changes in first.rewritten.items()} == {
+        Region.ES: 4,
+        Region.PT: 5,
+    }
+    assert again.input_unchanged
+    assert revised.rewritten == {Region.ES: RegionChanges(changed=1)}
+    assert revised.unchanged == [Region.PT]
+    assert list(restored.rewritten) == [Region.PT]
+    assert pd.read_csv(output_file_path(Region.ES))["value"].max() == 23.3
@@ -0,0 +1,112 @@
+"""Tests for the ingestion module"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import time
+from typing import List
+import pandas as pd
+import pytest
+from life_expectancy import ingestion
+from life_expectancy.ingestion import IngestedFile, ingest, ingest_all, load_file
+from life_expectancy.region import Region
+from . import FIXTURES_DIR
+
+INPUTS = [
+    FIXTURES_DIR / "eu_life_expectancy_raw.tsv",
+    FIXTURES_DIR / "eu_life_expectancy_expected.json",
+    FIXTURES_DIR / "eu_life_expectancy_expected_good.zip",
+]
+
+
+def collect(**kwargs) -> List[IngestedFile]:
+    """Run `ingest` to completion"""
+
+    async def run() -> List[IngestedFile]:
+        return [ingested async for ingested in ingest(**kwargs)]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_ingest_mixed_inputs():
+    """Test that every input is loaded with the strategies of its type"""
+    ingested = collect(paths=INPUTS, regions=[Region.PT])
+
+    assert sorted(file.path for file in ingested) == sorted(INPUTS)
+    for file in ingested:
+        pd.testing.assert_frame_equal(file.data, load_file(file.path, [Region.PT]).data)
+        assert file.seconds > 0
+
+
+@pytest.mark.unit
+def test_ingest_all_cleaned_inputs_share_columns(pt_life_expectancy_expected):
+    """Test that cleaned inputs of every type have the same columns"""
+    frames = ingest_all(INPUTS, regions=[Region.PT], clean=True)
+
+    assert sorted(frames) == sorted(INPUTS)
+    for df in frames.values():
+        assert list(df.columns) == list(pt_life_expectancy_expected.columns)
+        assert set(df["region"]) == {"PT"}
+
+
+@pytest.mark.unit
+def test_ingest_yields_in_completion_order(monkeypatch):
+    """Test that a fast file is yielded before a slow one submitted earlier"""
+    delays = {"slow.json": 0.3, "fast.json": 0.0}
+
+    def fake_load_file(path, regions=None, clean=False):
+        del regions, clean
+        time.sleep(delays[path.name])
+        return IngestedFile(path, pd.DataFrame(), delays[path.name])
+
+    monkeypatch.setattr(ingestion, "load_file", fake_load_file)
+
+    ingested = collect(paths=["slow.json", "fast.json"], max_pending=2)
+
+    assert [file.path.name for file in ingested] == ["fast.json", "slow.json"]
+
+
+@pytest.mark.unit
+def test_ingest_bounds_pending_files(monkeypatch):
+    """Test that no more than `max_pending` files are loaded ahead of the consumer"""
+    lock = threading.Lock()
+    started: List[str] = []
+
+    def fake_load_file(path, regions=None, clean=False):
+        del regions, clean
+        with lock:
+            started.append(path.name)
+        return IngestedFile(path, pd.DataFrame(), 0.0)
+
+    monkeypatch.setattr(ingestion, "load_file", fake_load_file)
+
+    async def run() -> List[int]:
+        ahead = []
+        consumed = 0
+        async for _ in ingest([f"{i}.json" for i in range(10)], max_pending=2):
+            consumed += 1
+            await asyncio.sleep(0.01)
+            ahead.append(len(started) - consumed)
+        return ahead
+
+    ahead = asyncio.run(run())
+
+    assert len(started) == 10
+    assert max(ahead) <= 2
+
+
+@pytest.mark.unit
+def test_ingest_raises_load_errors():
+    """Test that an unsupported input raises when its turn comes"""
+    with pytest.raises(ValueError, match="Unsupported file type: .txt"):
+        collect(paths=[INPUTS[0], "eu_life_expectancy.txt"])
+
+
+@pytest.mark.unit
+def test_ingest_in_process_pool():
+    """Test that files can be loaded by a process pool"""
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        ingested = collect(paths=INPUTS[1:], regions=[Region.PT], executor=executor)
+
+    assert sorted(file.path for file in ingested) == sorted(INPUTS[1:])
+    assert all(len(file.data) > 0 for file in ingested)
@@ -0,0 +1,114 @@
+"""Tests for the instrumentation module"""
+import json
+import pstats
+import pytest
+from life_expectancy.instrumentation import (
+    CallbackSink,
+    Instrumentation,
+    JSONLinesSink,
+    instrumented,
+    stage,
+)
+from life_expectancy.main import PipelineOptions, loading_cleaning_saving
+from life_expectancy.region import Region
+from . import FIXTURES_DIR
+
+
+@pytest.mark.unit
+def test_stage_is_not_measured_when_inactive():
+    """Test that stages run outside an active instrumentation are not kept"""
+    instrumentation = Instrumentation()
+
+    with stage("load") as record:
+        record.rows = 3
+
+    assert not instrumentation.records
+
+
+@pytest.mark.unit
+def test_nested_and_accumulated_stages(tmp_path):
+    """Test that stages are measured with their depth, rows and sinks"""
+    received = []
+    metrics_file = tmp_path / "metrics.jsonl"
+    instrumentation = Instrumentation(
+        sinks=[CallbackSink(received.append), JSONLinesSink(metrics_file)]
+    )
+
+    with instrumented(instrumentation):
+        with stage("load") as record:
+            for _ in range(3):
+                with stage("unzip", accumulate=True):
+                    pass
+            with stage("parse") as parse_record:
+                parse_record.rows = 10
+            record.rows = 10
+        with stage("clean"):
+            pass
+
+    assert [(r.stage, r.depth) for r in received] == [
+        ("parse", 1),
+        ("unzip", 1),
+        ("load", 0),
+        ("clean", 0),
+    ]
+    assert received[1].peak_memory_delta_mb is None
+    assert all(r.wall_s >= 0 and r.cpu_s >= 0 for r in received)
+    assert [
+        json.loads(line)["stage"] for line in metrics_file.read_text().splitlines()
+    ] == [
+        "parse",
+        "unzip",
+        "load",
+        "clean",
+    ]
+    assert [r.stage for r in instrumentation.summary()] == [
+        "load",
+        "unzip",
+        "parse",
+        "clean",
+    ]
+    assert instrumentation.summary()[0].rows == 10
+    assert instrumentation.report().splitlines()[1].startswith("load")
+
+
+@pytest.mark.unit
+def test_stage_error_is_recorded():
+    """Test that a stage failing is still measured and the error raised"""
+    instrumentation = Instrumentation()
+
+    with pytest.raises(ValueError), instrumented(instrumentation):
+        with stage("clean"):
+            raise ValueError("bad data")
+
+    assert [r.stage for r in instrumentation.records] == ["clean"]
+
+
+def test_loading_cleaning_saving_instrumented(output_file_path, tmp_path):
+    """Test the stage breakdown and hot stage profile of a pipeline run"""
+    instrumentation = Instrumentation(profile=True)
+
+    loading_cleaning_saving(
+        Region.PT,
+        FIXTURES_DIR / "eu_life_expectancy_expected_good.zip",
+        ".zip",
+        PipelineOptions(instrumentation=instrumentation),
+    )
+
+    summary = {r.stage: r for r in instrumentation.summary()}
+    assert list(summary) == [
+        "load",
+        "parse",
+        "unzip",
+        "construct",
+        "clean",
+        "region_index",
+        "filter",
+        "validate",
+        "save",
+    ]
+    assert summary["save"].rows == summary["filter"].rows > 0
+    assert summary["validate"].rows == summary["filter"].rows
+    assert summary["save"].bytes == output_file_path(Region.PT).stat().st_size
+    assert instrumentation.hot_stage() == "load"
+    assert instrumentation.dump_hot_profile(tmp_path / "hot.pstats") == "load"
+    assert pstats.Stats(str(tmp_path / "hot.pstats")).total_calls > 0
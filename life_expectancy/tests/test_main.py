@@ -1,9 +1,30 @@
 """Tests for the main module."""
 from unittest import mock
+from io import StringIO
+import json
+import logging
+import re
+import subprocess
+import sys
+import zipfile
 from pathlib import Path
+import pytest
 import pandas as pd
-from life_expectancy.main import loading_cleaning_saving
+from life_expectancy.main import (
+    PipelineOptions,
+    input_variant,
+    loading_cleaning_saving,
+    loading_cleaning_saving_batch,
+    loading_cleaning_saving_chunked,
+    loading_cleaning_saving_incremental,
+    load_aggregates,
+    parse_projection,
+    parse_regions,
+)
+from life_expectancy.data_cleaning import DataCleaner
+from life_expectancy.projection import Projection
 from life_expectancy.region import Region
+from . import FIXTURES_DIR
 
 
 @mock.patch("life_expectancy.main.FileHandler.load_data")
@@ -23,7 +44,9 @@ def test_loading_cleaning_saving_csv(
     result = loading_cleaning_saving(Region.PT, Path("test.csv"), ".csv")
 
     mock_load_data.assert_called_once_with(Path("test.csv"))
-    mock_clean_data.assert_called_once_with(eu_life_expectancy_raw_expected, Region.PT)
+    mock_clean_data.assert_called_once_with(
+        eu_life_expectancy_raw_expected, Region.PT, available=None
+    )
     mock_save_data.assert_called_once_with(
         pt_life_expectancy_expected, mock.ANY, Region.PT.value
     )
@@ -49,10 +72,307 @@ def test_loading_cleaning_saving_json(
     result = loading_cleaning_saving(Region.PT, Path("test.json"), ".json")
 
     mock_load_data.assert_called_once_with(Path("test.json"))
-    mock_clean_data.assert_called_once_with(eu_life_expectancy_raw_json, Region.PT)
+    mock_clean_data.assert_called_once_with(
+        eu_life_expectancy_raw_json, Region.PT, available=None
+    )
     mock_save_data.assert_called_once_with(
         pt_life_expectancy_expected, mock.ANY, Region.PT.value
     )
 
     assert isinstance(result, pd.DataFrame)
     pd.testing.assert_frame_equal(result, pt_life_expectancy_expected)
+
+
+@mock.patch("life_expectancy.main.FileHandler.save_data")
+def test_loading_cleaning_saving_batch(mock_save_data, pt_life_expectancy_expected):
+    """Test loading_cleaning_saving_batch loads once and saves every region."""
+    input_file = FIXTURES_DIR / "eu_life_expectancy_expected_good.zip"
+
+    result = loading_cleaning_saving_batch(
+        [Region.PT, Region.ES], input_file, ".zip", PipelineOptions(write_threads=2)
+    )
+
+    assert list(result) == [Region.PT, Region.ES]
+    assert result[Region.PT].to_csv(index=False) == pt_life_expectancy_expected.to_csv(
+        index=False
+    )
+    assert (result[Region.ES]["region"] == "ES").all()
+    assert mock_save_data.call_count == 2
+    saved_paths = {call.args[1] for call in mock_save_data.call_args_list}
+    options = PipelineOptions()
+    assert saved_paths == {
+        options.output_path(Region.PT),
+        options.output_path(Region.ES),
+    }
+
+
+def test_parse_regions():
+    """Test parsing of the --region command line values."""
+    assert parse_regions(["PT", "es"]) == [Region.PT, Region.ES]
+    assert parse_regions(["all"]) is None
+    assert parse_regions(["EFTA", "pt"]) == [Region.CH, Region.PT]
+
+
+def test_parquet_output_as_pipeline_input(
+    output_file_path, pt_life_expectancy_expected
+):
+    """Test that Parquet outputs can be fed back to the pipeline."""
+    pytest.importorskip("pyarrow")
+    input_file = FIXTURES_DIR / "eu_life_expectancy_expected_good.zip"
+
+    loading_cleaning_saving_batch(
+        [Region.PT], input_file, ".zip", PipelineOptions(output_format="parquet")
+    )
+    result = loading_cleaning_saving(
+        Region.PT, output_file_path(Region.PT, "parquet"), ".parquet"
+    )
+
+    assert result.to_csv(index=False) == pt_life_expectancy_expected.to_csv(index=False)
+
+
+def test_loading_cleaning_saving_chunked(output_file_path, small_raw_tsv):
+    """Test that the chunked pipeline writes the same rows as the batch one."""
+    expected = {
+        country: df.to_csv(index=False)
+        for country, df in loading_cleaning_saving_batch(
+            None, small_raw_tsv, ".tsv"
+        ).items()
+    }
+
+    rows = loading_cleaning_saving_chunked(
+        None, small_raw_tsv, ".tsv", PipelineOptions(chunk_size=2)
+    )
+
+    assert rows == {Region.PT: 5, Region.ES: 4}
+    for country, content in expected.items():
+        df_chunked = pd.read_csv(output_file_path(country, "csv"))
+        df_expected = pd.read_csv(StringIO(content))
+        keys = ["sex", "year"]
+        pd.testing.assert_frame_equal(
+            df_chunked.sort_values(keys).reset_index(drop=True),
+            df_expected.sort_values(keys).reset_index(drop=True),
+        )
+
+
+def test_loading_cleaning_saving_compressed(output_file_path, small_raw_tsv):
+    """Test that compressed CSV outputs get the extension of their compression
+    and hold the rows of the uncompressed ones, in batch and chunked runs."""
+    expected = loading_cleaning_saving_batch(None, small_raw_tsv, ".tsv")
+    options = PipelineOptions(compression="gzip", chunk_size=2)
+
+    for run in (loading_cleaning_saving_batch, loading_cleaning_saving_chunked):
+        run(None, small_raw_tsv, ".tsv", options)
+        for country in expected:
+            path = options.output_path(country)
+            assert path.name == f"{country.value.lower()}_life_expectancy.csv.gz"
+            # Chunked outputs are ordered chunk by chunk
+            df_compressed, df_expected = (
+                pd.read_csv(source).sort_values(["sex", "year"], ignore_index=True)
+                for source in (path, output_file_path(country, "csv"))
+            )
+            pd.testing.assert_frame_equal(df_compressed, df_expected)
+
+
+@pytest.mark.usefixtures("output_file_path")
+def test_loading_cleaning_saving_batch_aggregates(tmp_path, caplog, small_raw_tsv):
+    """Test that batch runs save aggregates that load back for queries."""
+    caplog.set_level(logging.INFO)
+
+    loading_cleaning_saving_batch(
+        None,
+        small_raw_tsv,
+        ".tsv",
+        PipelineOptions(output_format="parquet", aggregate=True),
+    )
+
+    assert sorted(path.name for path in (tmp_path / "aggregates").iterdir()) == [
+        "by_year.parquet",
+        "changes.parquet",
+        "sex_gap.parquet",
+    ]
+    assert "Successfully saved aggregate table by_year at" in caplog.text
+    assert "cleaned data for region by_year" not in caplog.text
+    cube = load_aggregates("parquet")
+    assert cube.regions_by_year("F", "Y65")["regions"].tolist() == [2, 2]
+    assert cube.change("PT", "T", "Y65", (2020, 2021)) == pytest.approx(0.5, abs=1e-5)
+
+
+@pytest.mark.usefixtures("output_file_path")
+def test_loading_cleaning_saving_batch_compressed_aggregates(tmp_path, small_raw_tsv):
+    """Test that compressed CSV aggregates load back for queries."""
+    options = PipelineOptions(compression="gzip", aggregate=True)
+    loading_cleaning_saving_batch(None, small_raw_tsv, ".tsv", options)
+    # Left over by an earlier uncompressed run: not to be read instead
+    (tmp_path / "aggregates" / "by_year.csv").write_text("stale\n")
+
+    assert sorted(path.name for path in (tmp_path / "aggregates").iterdir()) == [
+        "by_year.csv",
+        "by_year.csv.gz",
+        "changes.csv.gz",
+        "sex_gap.csv.gz",
+    ]
+    cube = load_aggregates("csv", "gzip")
+    assert cube.regions_by_year("F", "Y65")["regions"].tolist() == [2, 2]
+    assert cube.change("PT", "T", "Y65", (2020, 2021)) == pytest.approx(0.5, abs=1e-5)
+
+
+def test_loading_cleaning_saving_chunked_missing_region(small_raw_tsv):
+    """Test that the chunked pipeline reports requested regions without data."""
+    with pytest.raises(DataCleaner.NoDataException):
+        loading_cleaning_saving_chunked([Region.FR], small_raw_tsv, ".tsv")
+
+
+@pytest.fixture(name="absent_region_input")
+def fixture_absent_region_input(request, tmp_path, small_raw_tsv):
+    """Inputs of every type holding ES and PT rows: TSV, JSON, a zip of the
+    JSON and a zip with one member per region"""
+    if request.param == "tsv":
+        return small_raw_tsv
+    records = [
+        {"unit": "YR", "sex": sex, "age": "Y65", "country": country, "year": 2021}
+        for sex in ("F", "M")
+        for country in ("ES", "PT")
+    ]
+    for record in records:
+        record.update(life_expectancy=20.5, flag="e")
+    json_path = tmp_path / "eu_life_expectancy_raw.json"
+    json_path.write_text(json.dumps(records), encoding="utf-8")
+    if request.param == "json":
+        return json_path
+    zip_path = tmp_path / "eu_life_expectancy_raw.zip"
+    with zipfile.ZipFile(zip_path, "w") as zip_ref:
+        if request.param == "zip":
+            zip_ref.write(json_path, "eu_life_expectancy_raw.json")
+            return zip_path
+        for country in ("ES", "PT"):
+            zip_ref.writestr(
+                f"{country.lower()}_life_expectancy.json",
+                json.dumps([r for r in records if r["country"] == country]),
+            )
+    return zip_path
+
+
+@pytest.mark.parametrize(
+    "absent_region_input", ["tsv", "json", "zip", "zip_by_region"], indirect=True
+)
+def test_loading_cleaning_saving_absent_region(absent_region_input):
+    """Test that a region the input lacks raises the Invalid region error with
+    the regions of the input, although the loader filtered them out"""
+    input_file_ext = absent_region_input.suffix
+    available = re.escape("Available regions: ['PT', 'ES']")
+    with pytest.raises(ValueError, match=rf"Invalid region: Region.FR\. {available}"):
+        loading_cleaning_saving(Region.FR, absent_region_input, input_file_ext)
+    with pytest.raises(ValueError, match=rf"Invalid regions: .*\. {available}"):
+        loading_cleaning_saving_batch([Region.FR], absent_region_input, input_file_ext)
+
+
+def test_parse_projection():
+    """Test that --years and --fields values are parsed into a projection"""
+    assert parse_projection(None, None) is None
+    assert parse_projection("2000-2021", None) == Projection(years=(2000, 2021))
+    assert parse_projection("2021", "sex, age,value") == Projection(
+        fields=("sex", "age", "value"), years=(2021, 2021)
+    )
+    with pytest.raises(ValueError):
+        parse_projection(None, "sex,flag")
+
+
+@pytest.mark.parametrize(
+    "input_file_path, input_file_ext",
+    [
+        (FIXTURES_DIR / "eu_life_expectancy_raw.tsv", ".tsv"),
+        (FIXTURES_DIR / "eu_life_expectancy_expected_good.zip", ".zip"),
+    ],
+)
+@pytest.mark.usefixtures("output_file_path")
+def test_loading_cleaning_saving_projection(input_file_path, input_file_ext):
+    """Test that a projection gives the matching part of the full output"""
+    projection = Projection(fields=("sex", "age", "value"), years=(2015, 2021))
+
+    result = loading_cleaning_saving_batch(
+        [Region.PT],
+        input_file_path,
+        input_file_ext,
+        PipelineOptions(projection=projection),
+    )[Region.PT]
+
+    full = loading_cleaning_saving_batch([Region.PT], input_file_path, input_file_ext)[
+        Region.PT
+    ]
+    expected = full[full["year"].between(2015, 2021)][["sex", "age", "region", "value"]]
+    assert list(result.columns) == ["sex", "age", "region", "value"]
+    assert result.to_csv(index=False) == expected.to_csv(index=False)
+
+
+@pytest.mark.parametrize(
+    "input_file_path, input_file_ext",
+    [
+        (FIXTURES_DIR / "eu_life_expectancy_raw.tsv", ".tsv"),
+        (FIXTURES_DIR / "eu_life_expectancy_expected_good.zip", ".zip"),
+    ],
+)
+@pytest.mark.parametrize("fields", [("sex", "age"), ("sex", "age", "year")])
+def test_loading_cleaning_saving_projection_without_value(
+    output_file_path, input_file_path, input_file_ext, fields
+):
+    """Test that projections leaving out `value` keep it, as rows without a
+    value are dropped, in single region and batch runs"""
+    options = PipelineOptions(projection=Projection(fields=fields))
+    full = loading_cleaning_saving_batch([Region.PT], input_file_path, input_file_ext)[
+        Region.PT
+    ]
+    expected = full[Projection(fields=fields).columns()].to_csv(index=False)
+
+    single = loading_cleaning_saving(
+        Region.PT, input_file_path, input_file_ext, options
+    )
+    batch = loading_cleaning_saving_batch(
+        [Region.PT], input_file_path, input_file_ext, options
+    )[Region.PT]
+
+    assert single.to_csv(index=False) == batch.to_csv(index=False) == expected
+    assert pd.read_csv(output_file_path(Region.PT)).to_csv(index=False) == expected
+
+
+def test_loading_cleaning_saving_incremental_needs_every_field(small_raw_tsv):
+    """Test that incremental refreshes refuse projections of fields"""
+    options = PipelineOptions(projection=Projection(fields=("value",)))
+    with pytest.raises(ValueError, match="every column"):
+        loading_cleaning_saving_incremental(None, small_raw_tsv, ".tsv", options)
+
+
+@pytest.mark.usefixtures("output_file_path")
+def test_loading_cleaning_saving_zip_members(multi_member_zip):
+    """Test that the selected members of a zip input are loaded and cleaned,
+    and that they are part of the cache key"""
+    options = PipelineOptions(zip_members="pt_*")
+
+    df = loading_cleaning_saving(Region.PT, multi_member_zip, ".zip", options)
+
+    assert not df.empty and set(df["region"]) == {"PT"}
+    assert input_variant(".zip", options) != input_variant(".zip", PipelineOptions())
+
+
+def test_main_imports_lazily():
+    """Test that importing the main module does not import pandas, and that
+    the strategies it used to import are still reachable from it"""
+    code = (
+        "import sys, life_expectancy.main as main\n"
+        "assert 'pandas' not in sys.modules\n"
+        "from life_expectancy.file_handler import FileHandler\n"
+        "assert main.FileHandler is FileHandler\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_main_rejects_unknown_region():
+    """Test that an unknown --region code is a usage error, not a traceback"""
+    result = subprocess.run(
+        [sys.executable, "-m", "life_expectancy.main", "--region", "XX"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 2
+    assert "error: argument --region: 'XX' is not a valid Region" in result.stderr
+    assert "Traceback" not in result.stderr
@@ -0,0 +1,161 @@
+"""Tests for the out_of_core module"""
+import json
+from pathlib import Path
+import tracemalloc
+from typing import Callable
+from unittest import mock
+import numpy as np
+import pytest
+from life_expectancy.data_cleaning import AGE_CATEGORIES, SEX_CATEGORIES
+from life_expectancy.main import (
+    PipelineOptions,
+    loading_cleaning_saving_batch,
+    loading_cleaning_saving_out_of_core,
+)
+from life_expectancy.region import Region
+from . import FIXTURES_DIR
+
+# Memory the out-of-core pipeline may use on top of what it uses for a tiny
+# input, in bytes; the synthetic input is bigger than that
+MEMORY_CAP = 1_000_000
+
+
+@pytest.fixture(name="output_dir")
+def fixture_output_dir(tmp_path):
+    """Directory of the outputs, one subdirectory per pipeline"""
+    with mock.patch("life_expectancy.main.output_file_path") as output_file_path:
+        output_file_path.side_effect = lambda country, output_format: (
+            tmp_path / output_file_path.pipeline / f"{country.value}.{output_format}"
+        )
+
+        def use(pipeline: str) -> Path:
+            output_file_path.pipeline = pipeline
+            (tmp_path / pipeline).mkdir(exist_ok=True)
+            return tmp_path / pipeline
+
+        yield use
+
+
+@pytest.fixture(name="small_raw_json")
+def fixture_small_raw_json(tmp_path):
+    """Fixture writing the first records of the raw JSON data, which mix
+    several regions"""
+    with open(FIXTURES_DIR / "eu_life_expectancy_expected.json", encoding="utf-8") as f:
+        records = json.load(f)
+    path = tmp_path / "eu_life_expectancy_raw.json"
+    path.write_text(json.dumps(records[:3000]), encoding="utf-8")
+    return path
+
+
+def write_synthetic_tsv(path: Path, first_year: int) -> Path:
+    """Write a raw TSV with every region, sex and age and the years from
+    `first_year` to 2100"""
+    years = range(2100, first_year - 1, -1)
+    rng = np.random.default_rng(0)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("unit,sex,age,geo\\time\t" + "\t".join(f"{y} " for y in years) + "\n")
+        for sex in SEX_CATEGORIES:
+            for age in AGE_CATEGORIES:
+                for region in Region:
+                    values = rng.integers(100, 900, len(years)) / 10
+                    cells = "\t".join(f"{value:.1f} e" for value in values)
+                    f.write(f"YR,{sex},{age},{region.value}\t{cells}\n")
+    return path
+
+
+def peak_memory(run: Callable[[], object]) -> int:
+    """Peak memory allocated while calling `run`: Python and numpy
+    allocations plus the pyarrow memory pool (string columns)"""
+    pa = pytest.importorskip("pyarrow")
+    default_pool = pa.default_memory_pool()
+    pool = pa.proxy_memory_pool(default_pool)
+    pa.set_memory_pool(pool)
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1] + pool.max_memory()
+    finally:
+        tracemalloc.stop()
+        pa.set_memory_pool(default_pool)
+
+
+def assert_same_outputs(expected_dir: Path, actual_dir: Path) -> None:
+    """Assert that two pipelines wrote the same files"""
+    expected = sorted(path.name for path in expected_dir.iterdir())
+    assert expected == sorted(path.name for path in actual_dir.iterdir())
+    for name in expected:
+        assert (actual_dir / name).read_bytes() == (expected_dir / name).read_bytes()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "input_fixture, extension, workers",
+    [
+        ("small_raw_tsv", ".tsv", 1),
+        ("small_raw_json", ".json", 1),
+        ("small_raw_json", ".json", 2),
+    ],
+)
+def test_out_of_core_matches_batch(
+    request, output_dir, input_fixture, extension, workers
+):
+    """Test that the out-of-core pipeline writes the files of the batch one,
+    with the input spilled in several chunks and buffers"""
+    input_file = request.getfixturevalue(input_fixture)
+    batch_dir = output_dir("batch")
+    batch = loading_cleaning_saving_batch(None, input_file, extension)
+
+    out_of_core_dir = output_dir("out_of_core")
+    rows = loading_cleaning_saving_out_of_core(
+        None,
+        input_file,
+        extension,
+        PipelineOptions(
+            chunk_size=2 if extension == ".tsv" else 700,
+            workers=workers,
+            spill_buffer_rows=5 if extension == ".tsv" else 1_000,
+        ),
+    )
+
+    assert rows == {country: len(df) for country, df in batch.items()}
+    assert list(rows) == list(batch)
+    assert_same_outputs(batch_dir, out_of_core_dir)
+
+
+@pytest.mark.unit
+def test_out_of_core_regions(output_dir, small_raw_tsv):
+    """Test the requested regions, and regions without data"""
+    out_of_core_dir = output_dir("out_of_core")
+    rows = loading_cleaning_saving_out_of_core(
+        [Region.ES], small_raw_tsv, ".tsv", PipelineOptions(chunk_size=2)
+    )
+    assert rows == {Region.ES: 4}
+    assert [path.name for path in out_of_core_dir.iterdir()] == ["ES.csv"]
+
+    with pytest.raises(ValueError, match="Invalid regions"):
+        loading_cleaning_saving_out_of_core([Region.FR], small_raw_tsv, ".tsv")
+
+
+@pytest.mark.integration
+def test_out_of_core_memory_cap(output_dir, tmp_path):
+    """Test that an input bigger than the memory cap is saved within it, with
+    the outputs of the batch pipeline"""
+    tiny_input = write_synthetic_tsv(tmp_path / "tiny.tsv", first_year=2100)
+    big_input = write_synthetic_tsv(tmp_path / "big.tsv", first_year=2071)
+    assert big_input.stat().st_size > MEMORY_CAP
+    options = PipelineOptions(
+        output_format="feather", chunk_size=100, spill_buffer_rows=5_000
+    )
+
+    def run(input_file: Path) -> None:
+        loading_cleaning_saving_out_of_core(None, input_file, ".tsv", options)
+
+    out_of_core_dir = output_dir("out_of_core")
+    run(tiny_input)
+    tiny_peak = peak_memory(lambda: run(tiny_input))
+    big_peak = peak_memory(lambda: run(big_input))
+
+    assert big_peak - tiny_peak < MEMORY_CAP
+    batch_dir = output_dir("batch")
+    loading_cleaning_saving_batch(None, big_input, ".tsv", options)
+    assert_same_outputs(batch_dir, out_of_core_dir)
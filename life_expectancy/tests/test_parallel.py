@@ -0,0 +1,78 @@
+"""Tests for the parallel module"""
+import pandas as pd
+import pytest
+from life_expectancy.data_cleaning import (
+    CSVCleaningStrategy,
+    DataCleaner,
+    JSONCleaningStrategy,
+)
+from life_expectancy.parallel import clean_in_parallel
+
+COMPOSED_COL = "unit,sex,age,geo\\time"
+DECOMPOSED_COLS = ["unit", "sex", "age", "region"]
+
+
+class FailingCleaningStrategy(JSONCleaningStrategy):
+    """Cleaning strategy failing on the second part of the data"""
+
+    def clean(self, df_raw: pd.DataFrame) -> pd.DataFrame:
+        if df_raw.index[0] > 0:
+            raise ValueError("Cannot clean this part")
+        return super().clean(df_raw)
+
+
+@pytest.mark.unit
+def test_csv_partition_splits_year_columns(eu_life_expectancy_raw_expected):
+    """Test that raw TSV data is partitioned by year columns"""
+    strategy = CSVCleaningStrategy(COMPOSED_COL, DECOMPOSED_COLS)
+
+    parts = strategy.partition(eu_life_expectancy_raw_expected, 4)
+
+    assert len(parts) == 4
+    assert all(part.columns[0] == COMPOSED_COL for part in parts)
+    assert sum(part.shape[1] - 1 for part in parts) == (
+        eu_life_expectancy_raw_expected.shape[1] - 1
+    )
+
+
+@pytest.mark.unit
+def test_default_partition_splits_rows(sample_frame):
+    """Test that raw data is partitioned by row ranges, with no empty part"""
+    parts = JSONCleaningStrategy().partition(sample_frame, 100)
+
+    assert len(parts) == len(sample_frame)
+    pd.testing.assert_frame_equal(pd.concat(parts), sample_frame)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("compact", [False, True])
+def test_clean_in_parallel_csv(eu_life_expectancy_raw_expected, compact):
+    """Test that cleaning TSV data in parallel gives the serial output"""
+    strategy = CSVCleaningStrategy(COMPOSED_COL, DECOMPOSED_COLS)
+
+    serial = DataCleaner(strategy).clean(eu_life_expectancy_raw_expected, compact)
+    parallel = DataCleaner(strategy, workers=3).clean(
+        eu_life_expectancy_raw_expected, compact
+    )
+
+    # Comparing the written bytes is much faster than assert_frame_equal on
+    # categoricals
+    assert parallel.dtypes.equals(serial.dtypes)
+    assert parallel.to_csv(index=False) == serial.to_csv(index=False)
+
+
+@pytest.mark.unit
+def test_clean_in_parallel_json(eu_life_expectancy_raw_json):
+    """Test that cleaning JSON data in parallel gives the serial output"""
+    strategy = JSONCleaningStrategy()
+
+    parallel = clean_in_parallel(strategy, eu_life_expectancy_raw_json, 2)
+
+    pd.testing.assert_frame_equal(parallel, strategy.clean(eu_life_expectancy_raw_json))
+
+
+@pytest.mark.unit
+def test_clean_in_parallel_error(eu_life_expectancy_raw_json):
+    """Test that an error in a worker is raised in the caller"""
+    with pytest.raises(ValueError, match="Cannot clean this part"):
+        clean_in_parallel(FailingCleaningStrategy(), eu_life_expectancy_raw_json, 2)
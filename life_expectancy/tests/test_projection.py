@@ -0,0 +1,40 @@
+"""Tests for the projection module"""
+import pytest
+from life_expectancy.projection import CLEANED_COLUMNS, Projection
+
+
+@pytest.mark.unit
+def test_projection_columns():
+    """Test that the region and value are always kept and columns keep their
+    order"""
+    assert Projection().columns() == list(CLEANED_COLUMNS)
+    assert Projection(fields=("value", "sex")).columns() == ["sex", "region", "value"]
+    assert Projection(fields=("age",)).columns() == ["age", "region", "value"]
+
+
+@pytest.mark.unit
+def test_projection_years():
+    """Test that years are kept within the inclusive range"""
+    projection = Projection(years=(2000, 2021))
+
+    assert projection.keeps_year(2000) and projection.keeps_year(2021)
+    assert not projection.keeps_year(1999)
+    assert Projection().keeps_year(1960)
+
+
+@pytest.mark.unit
+def test_projection_key():
+    """Test that only projections that skip something have a key"""
+    assert Projection().key() == ""
+    assert (
+        Projection(years=(2000, 2021)).key()
+        != Projection(fields=("value",), years=(2000, 2021)).key()
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("fields, years", [(("flag",), None), (None, (2021, 2000))])
+def test_projection_validation(fields, years):
+    """Test that unknown fields and empty year ranges are rejected"""
+    with pytest.raises(ValueError):
+        Projection(fields, years)
@@ -0,0 +1,91 @@
+"""Tests for the region_index module"""
+import numpy as np
+import pandas as pd
+import pytest
+from life_expectancy.data_cleaning import CleanedDataCleaningStrategy, DataCleaner
+from life_expectancy.main import build_pipeline
+from life_expectancy.region import REGION_GROUPS, Region
+from life_expectancy.region_index import RegionIndex
+
+
+@pytest.fixture(name="cleaned")
+def fixture_cleaned(small_raw_tsv) -> pd.DataFrame:
+    """Compact cleaned data of the small raw TSV"""
+    filehandler, cleaner = build_pipeline(".tsv")
+    return cleaner.clean(filehandler.load_data(small_raw_tsv), compact=True)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("dtype", ["str", "category"])
+def test_region_index_positions(dtype):
+    """Test the rows of each region, with string or categorical codes"""
+    column = pd.Series(["PT", "ES", None, "PT", "FR", "ES"], dtype=dtype)
+    index = RegionIndex(column)
+
+    assert sorted(index.regions()) == ["ES", "FR", "PT"]
+    assert len(index) == 3 and "PT" in index and "DE" not in index
+    assert index.count("PT") == 2 and index.count("DE") == 0
+    assert index.positions(["PT"]).tolist() == [0, 3]
+    # Region by region, in the requested order; regions without rows skipped
+    assert index.positions(["ES", "DE", "PT"]).tolist() == [1, 5, 0, 3]
+    assert index.positions(["DE"]).tolist() == []
+
+
+@pytest.mark.unit
+def test_region_index_select():
+    """Test selecting and splitting rows of regions, in frame order"""
+    df = pd.DataFrame({"region": ["PT", "ES", "PT", "ES", "FR"], "value": range(5)})
+    index = RegionIndex(df["region"])
+
+    assert index.select(df, ["PT"])["value"].tolist() == [0, 2]
+    assert index.select(df, ["FR"])["value"].tolist() == [4]
+    assert index.select(df, ["PT", "ES"])["value"].tolist() == [0, 2, 1, 3]
+    assert index.select(df, ["DE"]).empty
+
+    keep = np.array([True, True, False, False, True])
+    split = index.split(df, ["ES", "DE", "PT"], keep=keep)
+    assert list(split) == ["ES", "PT"]
+    assert split["ES"]["value"].tolist() == [1]
+    assert split["PT"]["value"].tolist() == [0]
+    assert split["PT"].index.tolist() == [0]
+    assert index.split(df, ["FR"])["FR"]["value"].tolist() == [4]
+
+
+@pytest.mark.unit
+def test_cleaner_reuses_region_index(cleaned):
+    """Test that the index of a frame is built once, and rebuilt for another"""
+    cleaner = DataCleaner(CleanedDataCleaningStrategy())
+    index = cleaner.region_index(cleaned)
+
+    assert cleaner.region_index(cleaned) is index
+    assert cleaner.countries(cleaned) == ["PT", "ES"]
+    assert cleaner.region_index(cleaned.copy()) is not index
+
+
+@pytest.mark.unit
+def test_cleaner_selects_regions(cleaned):
+    """Test region selection and splitting against boolean masks"""
+    cleaner = DataCleaner(CleanedDataCleaningStrategy())
+    expected = {
+        region: cleaned[cleaned["region"] == region.value]
+        .dropna(subset=["value"])
+        .reset_index(drop=True)
+        for region in [Region.PT, Region.ES]
+    }
+
+    for region, df_region in cleaner.split_by_region(cleaned).items():
+        pd.testing.assert_frame_equal(df_region, expected[region])
+        pd.testing.assert_frame_equal(
+            cleaner.select_region(cleaned, region), expected[region]
+        )
+
+    group = cleaner.select_regions(cleaned, [Region.ES, Region.PT])
+    pd.testing.assert_frame_equal(
+        group, pd.concat([expected[Region.ES], expected[Region.PT]], ignore_index=True)
+    )
+    with pytest.raises(ValueError):
+        cleaner.select_regions(cleaned, list(REGION_GROUPS["EU27"]))
+    assert np.array_equal(
+        cleaner.region_index(cleaned).positions(["ES"]),
+        np.flatnonzero(cleaned["region"] == "ES"),
+    )
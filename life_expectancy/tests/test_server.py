@@ -0,0 +1,78 @@
+"""Tests for the server and client modules"""
+from io import StringIO
+import time
+from urllib.error import HTTPError
+import pandas as pd
+import pytest
+from life_expectancy.client import RegionClient
+from life_expectancy.main import PipelineOptions, load_cleaned_by_region
+from life_expectancy.region import Region
+from life_expectancy.server import WarmDataset
+
+
+def drop_region(path, region: str) -> None:
+    """Rewrite a raw TSV without the rows of a region"""
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    path.write_text(
+        "".join(line for line in lines if f",{region}\t" not in line),
+        encoding="utf-8",
+    )
+
+
+@pytest.mark.unit
+def test_server_serves_regions(start_server, small_raw_tsv):
+    """Test that the server serves the cleaned data of each region"""
+    client = RegionClient(start_server(small_raw_tsv).url)
+    _, expected = load_cleaned_by_region(None, small_raw_tsv, ".tsv", PipelineOptions())
+
+    assert client.regions() == ["PT", "ES"]
+    for region in ("PT", "ES"):
+        assert client.region(region).decode("utf-8") == expected[Region(region)].to_csv(
+            index=False
+        )
+    records = pd.read_json(StringIO(client.region("pt", "json").decode("utf-8")))
+    assert len(records) == len(expected[Region.PT])
+    assert client.status()["rows"] == sum(len(df) for df in expected.values())
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "path, status",
+    [("/regions/FR", 404), ("/regions/XX", 404), ("/regions/PT?format=xml", 400)],
+)
+def test_server_errors(start_server, small_raw_tsv, path, status):
+    """Test that unknown regions and formats are rejected"""
+    client = RegionClient(start_server(small_raw_tsv).url)
+    with pytest.raises(HTTPError) as err:
+        client._get(path)  # pylint: disable=protected-access
+    assert err.value.code == status
+
+
+@pytest.mark.unit
+def test_warm_dataset_reloads_changed_input(small_raw_tsv):
+    """Test that a changed input is reloaded and a broken one is not"""
+    dataset = WarmDataset(small_raw_tsv)
+    assert not dataset.reload_if_changed()
+
+    drop_region(small_raw_tsv, "ES")
+    assert dataset.reload_if_changed()
+    assert dataset.regions() == ["PT"]
+    with pytest.raises(KeyError):
+        dataset.response(Region.ES)
+
+    small_raw_tsv.write_text("not,a,valid\tinput\n", encoding="utf-8")
+    assert not dataset.reload_if_changed()
+    assert dataset.regions() == ["PT"]
+    assert dataset.reloads == 1
+
+
+@pytest.mark.unit
+def test_server_watches_input(start_server, small_raw_tsv):
+    """Test that the watcher reloads the input while the server runs"""
+    client = RegionClient(start_server(small_raw_tsv, watch_interval=0.05).url)
+
+    drop_region(small_raw_tsv, "ES")
+    deadline = time.monotonic() + 10
+    while client.status()["reloads"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert client.regions() == ["PT"]
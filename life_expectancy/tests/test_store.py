@@ -0,0 +1,99 @@
+"""Tests for the store module"""
+import numpy as np
+import pandas as pd
+import pytest
+from life_expectancy.main import build_pipeline, load_store
+from life_expectancy.region import Region
+from life_expectancy.store import KEY_COLUMNS, LifeExpectancyStore
+
+
+@pytest.fixture(name="cleaned")
+def fixture_cleaned(small_raw_tsv) -> pd.DataFrame:
+    """Compact cleaned data of the small raw TSV"""
+    filehandler, cleaner = build_pipeline(".tsv")
+    return cleaner.clean(filehandler.load_data(small_raw_tsv), compact=True)
+
+
+@pytest.mark.unit
+def test_store_point_lookups(cleaned):
+    """Test that point lookups return the value of the row, or raise KeyError"""
+    store = LifeExpectancyStore(cleaned)
+
+    assert len(store) == len(cleaned)
+    assert store.value(Region.PT, "F", "Y65", 2021) == np.float32(21.7)
+    assert store.value("ES", "M", "Y65", 2020) == np.float32(18.5)
+    assert np.isnan(store.value("PT", "M", "Y65", 2020))
+    for key in [("FR", "F", "Y65", 2021), ("PT", "F", "Y65", 2019)]:
+        with pytest.raises(KeyError):
+            store.value(*key)
+    with pytest.raises(KeyError):
+        store.value("PT", "F", "Y65", 2021, unit="HLY")
+
+
+@pytest.mark.unit
+def test_store_range_lookups(cleaned):
+    """Test that range lookups return the years in order, bounded or not"""
+    store = LifeExpectancyStore(cleaned)
+
+    years, values = store.series("PT", "T", "Y65")
+    assert years.tolist() == [2020, 2021]
+    np.testing.assert_array_equal(values, np.array([19.4, 19.9], dtype="float32"))
+    assert store.series("PT", "T", "Y65", (2021, 2030))[0].tolist() == [2021]
+    assert store.series("PT", "T", "Y65", (None, 2020))[0].tolist() == [2020]
+    assert len(store.series("PT", "T", "Y65", (2021, 2020))[0]) == 0
+    assert len(store.series("FR", "T", "Y65")[0]) == 0
+    with pytest.raises(ValueError):
+        values[0] = 0.0
+
+
+@pytest.mark.unit
+def test_store_batched_lookups(cleaned):
+    """Test that batched lookups broadcast and give NaN for missing rows"""
+    store = LifeExpectancyStore(cleaned)
+
+    values = store.values(
+        [Region.PT, "ES", "FR", "PT"], "F", "Y65", [2021, 2020, 2021, 1999]
+    )
+    np.testing.assert_array_equal(
+        values, np.array([21.7, 22.4, np.nan, np.nan], dtype="float32")
+    )
+    grid = store.values(np.array([["PT"], ["ES"]]), "F", "Y65", [2020, 2021])
+    assert grid.shape == (2, 2)
+    assert np.isnan(
+        LifeExpectancyStore(cleaned.iloc[:0]).values("PT", "F", "Y65", 2021)
+    )
+
+
+@pytest.mark.unit
+def test_store_matches_frame(eu_life_expectancy_raw_expected):
+    """Test that every row of the frame is found, in the sorted multi-index"""
+    _, cleaner = build_pipeline(".tsv")
+    cleaned = cleaner.clean(eu_life_expectancy_raw_expected, compact=True)
+    store = LifeExpectancyStore(cleaned)
+
+    values = store.values(
+        *(cleaned[column].astype(str).to_numpy() for column in KEY_COLUMNS[:3]),
+        cleaned["year"].to_numpy(),
+    )
+    np.testing.assert_array_equal(values, cleaned["value"].to_numpy())
+    df_store = store.to_frame()
+    assert df_store.index.is_monotonic_increasing
+    assert df_store.index.names == KEY_COLUMNS
+    assert df_store.loc[("PT", "F", "Y65", "YR", 2021), "value"] == store.value(
+        "PT", "F", "Y65", 2021
+    )
+
+
+@pytest.mark.unit
+def test_store_rejects_duplicate_rows(cleaned):
+    """Test that a frame with duplicate keys cannot be indexed"""
+    with pytest.raises(ValueError, match="Duplicate rows"):
+        LifeExpectancyStore(pd.concat([cleaned, cleaned.iloc[:1]]))
+
+
+@pytest.mark.unit
+def test_load_store(small_raw_tsv):
+    """Test that load_store loads and cleans every region of the input"""
+    store = load_store(small_raw_tsv, ".tsv")
+
+    assert store.value("ES", "F", "Y65", 2020) == np.float32(22.4)
@@ -0,0 +1,154 @@
+"""Tests for the validation module"""
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+from life_expectancy.data_cleaning import (
+    CleanedDataCleaningStrategy,
+    DataCleaner,
+    to_compact_dtypes,
+)
+from life_expectancy.main import (
+    PipelineOptions,
+    build_pipeline,
+    loading_cleaning_saving,
+)
+from life_expectancy.region import Region
+from life_expectancy.validation import CLEANED_SCHEMA, ValidationError
+
+
+@pytest.fixture(name="cleaned")
+def fixture_cleaned(small_raw_tsv) -> pd.DataFrame:
+    """Cleaned data of the small raw TSV, with string columns"""
+    filehandler, cleaner = build_pipeline(".tsv", options=PipelineOptions())
+    return cleaner.clean(filehandler.load_data(small_raw_tsv))
+
+
+@pytest.fixture(name="corrupted")
+def fixture_corrupted(cleaned) -> pd.DataFrame:
+    """Cleaned data with a bad code, year and value, and a duplicated row,
+    all in PT rows"""
+    df = pd.concat([cleaned, cleaned.iloc[[4]]], ignore_index=True)
+    df.loc[1, "sex"] = "X"
+    df.loc[3, "value"] = -1.0
+    df.loc[7, "year"] = 1850
+    return df
+
+
+def violations(report) -> dict:
+    """Count of each failed check of a report"""
+    return {(v.check, v.column): v.count for v in report.violations}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("compact", [False, True])
+def test_validate_clean_data(cleaned, compact):
+    """Test that cleaned data passes, with string or categorical columns"""
+    df = to_compact_dtypes(cleaned) if compact else cleaned
+    report = CLEANED_SCHEMA.validate(df)
+
+    assert report.ok
+    assert report.rows == len(df)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("compact", [False, True])
+def test_validate_reports_violations(corrupted, compact):
+    """Test that each check reports its offending rows, with a sample"""
+    df = to_compact_dtypes(corrupted) if compact else corrupted
+    report = CLEANED_SCHEMA.validate(df)
+
+    assert violations(report) == {
+        ("codes", "sex"): 1,
+        ("range", "year"): 1,
+        ("range", "value"): 1,
+        ("unique", "unit,sex,age,region,year"): 2,
+    }
+    samples = {v.column: v.sample for v in report.violations}
+    assert samples["sex"]["sex"].astype(str).tolist() == ["X"]
+    assert samples["year"]["year"].tolist() == [1850]
+    assert samples["value"]["value"].tolist() == [-1.0]
+    assert len(samples["unit,sex,age,region,year"]) == 2
+    assert "4 failed checks" in str(report)
+
+
+@pytest.mark.unit
+def test_validate_dtypes_and_projections(cleaned):
+    """Test the dtype check, and that projected-out columns are not checked"""
+    df = cleaned.astype({"year": "str"})
+    assert violations(CLEANED_SCHEMA.validate(df)) == {
+        ("dtype[integer]", "year"): len(df)
+    }
+
+    projected = cleaned[["region", "sex", "value"]]
+    assert CLEANED_SCHEMA.validate(projected).ok
+    # Missing codes are violations, missing values are not
+    projected.loc[0, ["sex", "value"]] = [None, np.nan]
+    assert violations(CLEANED_SCHEMA.validate(projected)) == {("codes", "sex"): 1}
+
+
+@pytest.mark.unit
+def test_cleaner_validation_modes(corrupted, caplog):
+    """Test that the cleaner logs violations, or raises them when strict"""
+    # Already cleaned data goes through the cleaning as is
+    cleaning_strategy = CleanedDataCleaningStrategy()
+
+    with caplog.at_level(logging.ERROR):
+        DataCleaner(cleaning_strategy, schema=CLEANED_SCHEMA).clean(
+            corrupted, compact=True
+        )
+    assert "Validation of the cleaned data failed" in caplog.text
+
+    strict = DataCleaner(cleaning_strategy, schema=CLEANED_SCHEMA, strict=True)
+    with pytest.raises(ValidationError) as error:
+        strict.clean(corrupted, compact=True)
+    assert len(error.value.report.violations) == 4
+    # Non-compact data is validated region by region
+    assert len(strict.clean(corrupted)) == len(corrupted)
+    with pytest.raises(ValidationError):
+        strict.clean_data(corrupted, Region.PT)
+    assert len(strict.clean_data(corrupted, Region.ES)) == 4
+
+
+@pytest.mark.unit
+@pytest.mark.usefixtures("output_file_path")
+@pytest.mark.parametrize("workers", [1, 2])
+def test_unparseable_values_fail_strict_validation(small_raw_tsv, caplog, workers):
+    """Test that values that cannot be parsed are a violation, which stops
+    strict runs, in serial and parallel cleaning"""
+    small_raw_tsv.write_text(
+        small_raw_tsv.read_text(encoding="utf-8").replace("21.7 e", "abc"),
+        encoding="utf-8",
+    )
+
+    with pytest.raises(ValidationError) as error:
+        loading_cleaning_saving(
+            Region.PT,
+            small_raw_tsv,
+            ".tsv",
+            PipelineOptions(validation="strict", workers=workers),
+        )
+    assert violations(error.value.report) == {("parse", "value"): 1}
+    assert error.value.report.violations[0].sample["value"].tolist() == ["abc"]
+
+    with caplog.at_level(logging.ERROR):
+        df = loading_cleaning_saving(
+            Region.PT, small_raw_tsv, ".tsv", PipelineOptions(workers=workers)
+        )
+    assert "parse(value): 1 rows" in caplog.text
+    assert len(df) == 4
+
+
+@pytest.mark.unit
+def test_pipeline_validation_options():
+    """Test that the pipeline options choose the validation of the cleaner"""
+    cleaner = build_pipeline(".tsv")[1]
+    assert cleaner.schema is CLEANED_SCHEMA and not cleaner.strict
+    strict = build_pipeline(".tsv", options=PipelineOptions(validation="strict"))[1]
+    assert strict.strict
+    assert (
+        build_pipeline(".tsv", options=PipelineOptions(validation=None))[1].schema
+        is None
+    )
+    with pytest.raises(ValueError):
+        build_pipeline(".tsv", options=PipelineOptions(validation="lenient"))
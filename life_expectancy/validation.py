@@ -0,0 +1,241 @@
+"""
+This module provides the validation of cleaned data against a schema.
+
+A `Schema` lists the expected dtype of each column, the allowed codes of the
+key columns, the range of the years and values, and the columns identifying
+a row. `Schema.validate` runs each check as one vectorized pass over the
+frame (over the category codes for categorical columns) and returns a
+`ValidationReport` with the number of offending rows of each check and a few
+of them as a sample. Columns left out by a projection are not checked.
+`Schema.validate_parsing` reports the raw values cleaning could not parse.
+"""
+
+from dataclasses import dataclass, field
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from life_expectancy.data_cleaning import (
+    AGE_CATEGORIES,
+    SEX_CATEGORIES,
+    UNIT_CATEGORIES,
+)
+
+
+@dataclass
+class Violation:
+    """Rows of a frame failing a check, with a sample of them"""
+
+    check: str
+    column: str
+    count: int
+    sample: pd.DataFrame
+
+    def __str__(self) -> str:
+        return f"{self.check}({self.column}): {self.count} rows"
+
+
+@dataclass
+class ValidationReport:
+    """Violations found in a frame of `rows` rows"""
+
+    rows: int
+    violations: List[Violation] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether every check passed"""
+        return not self.violations
+
+    def __str__(self) -> str:
+        if self.ok:
+            return f"{self.rows} rows, no violations"
+        lines = [f"{self.rows} rows, {len(self.violations)} failed checks:"]
+        for violation in self.violations:
+            lines.append(f"- {violation}")
+            if not violation.sample.empty:
+                lines.append(violation.sample.to_string(max_cols=8))
+        return "\n".join(lines)
+
+    def enforce(self, strict: bool = False) -> None:
+        """Log the violations, or raise ValidationError if `strict`"""
+        if self.ok:
+            return
+        if strict:
+            raise ValidationError(self)
+        logging.error("Validation of the cleaned data failed: %s", self)
+
+
+class ValidationError(ValueError):
+    """Raised when cleaned data fails strict validation"""
+
+    def __init__(self, report: ValidationReport):
+        super().__init__(str(report))
+        self.report = report
+
+
+def _codes(column: pd.Series) -> Tuple[np.ndarray, int]:
+    """Integer codes of a column (-1 for missing) and the number of codes"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy(), len(column.cat.categories)
+    if pd.api.types.is_integer_dtype(column.dtype) and len(column):
+        # Offsets from the minimum, e.g. for years
+        values = column.to_numpy().astype("int64")
+        low = values.min()
+        return values - low, int(values.max() - low) + 1
+    codes, uniques = pd.factorize(column)
+    return codes, len(uniques)
+
+
+@dataclass(frozen=True)
+class Schema:
+    """
+    Expected shape of cleaned data:
+    - dtypes: kind of each column, one of "string" (str, object or
+      categorical), "integer" or "float"
+    - codes: allowed codes of categorical columns; missing codes are violations
+    - years: inclusive range of `year`
+    - values: inclusive range of `value`; missing values are allowed
+    - keys: columns identifying a row, which must be unique
+    - samples: number of offending rows kept in each violation
+    """
+
+    dtypes: Dict[str, str]
+    codes: Dict[str, Tuple[str, ...]]
+    years: Tuple[int, int]
+    values: Tuple[float, float]
+    keys: Tuple[str, ...]
+    samples: int = 5
+
+    def validate(self, df: pd.DataFrame) -> ValidationReport:
+        """Check a cleaned frame against the schema"""
+        report = ValidationReport(len(df))
+        for column, kind in self.dtypes.items():
+            if column in df and not _has_kind(df[column], kind):
+                report.violations.append(
+                    Violation(f"dtype[{kind}]", column, len(df), df.iloc[0:0])
+                )
+        checks: List[Tuple[str, str, Optional[np.ndarray]]] = [
+            ("codes", column, self._invalid_codes(df[column], allowed))
+            for column, allowed in self.codes.items()
+            if column in df
+        ]
+        if "year" in df:
+            checks.append(("range", "year", _outside(df["year"], self.years)))
+        if "value" in df:
+            checks.append(("range", "value", _outside(df["value"], self.values)))
+        if all(key in df for key in self.keys):
+            checks.append(("unique", ",".join(self.keys), self._duplicates(df)))
+
+        for check, column, mask in checks:
+            if mask is not None:
+                rows = np.flatnonzero(mask)
+                sample = df.iloc[rows[: self.samples]]
+                report.violations.append(Violation(check, column, len(rows), sample))
+        return report
+
+    def validate_parsing(
+        self, rows: int, unparseable: Dict[str, int]
+    ) -> ValidationReport:
+        """Report of the non-empty cells of `rows` cleaned rows whose value
+        could not be parsed, given by their text with their number of cells
+        (see life_expectancy.data_cleaning.parse_values)"""
+        report = ValidationReport(rows)
+        if unparseable:
+            sample = pd.DataFrame(
+                {"value": list(unparseable), "cells": list(unparseable.values())}
+            )
+            report.violations.append(
+                Violation(
+                    "parse",
+                    "value",
+                    sum(unparseable.values()),
+                    sample.head(self.samples),
+                )
+            )
+        return report
+
+    @staticmethod
+    def _invalid_codes(
+        column: pd.Series, allowed: Tuple[str, ...]
+    ) -> Optional[np.ndarray]:
+        """Mask of the rows with a code outside `allowed`, None if there are none"""
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Check the categories once, then look the codes up
+            invalid = ~column.cat.categories.isin(allowed)
+            codes = column.cat.codes.to_numpy()
+            if invalid.any():
+                mask = np.append(invalid, True)[codes]
+            else:
+                mask = codes < 0
+        else:
+            mask = ~column.isin(allowed).to_numpy()
+        return mask if mask.any() else None
+
+    def _duplicates(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Mask of the rows sharing their keys with another row, None if
+        there are none; the keys are combined into a single integer"""
+        combined = np.zeros(len(df), dtype="int64")
+        capacity = 1
+        for key in self.keys:
+            codes, n_codes = _codes(df[key])
+            capacity *= n_codes + 1
+            if capacity >= 2**62:
+                mask = df.duplicated(list(self.keys), keep=False).to_numpy()
+                return mask if mask.any() else None
+            combined = combined * (n_codes + 1) + (codes.astype("int64") + 1)
+        if capacity <= 8 * len(df) + 2**16:
+            # Few possible keys: count them instead of hashing them
+            counts = np.bincount(combined, minlength=capacity)
+            if counts.max() <= 1:
+                return None
+            return counts[combined] > 1
+        mask = pd.Series(combined).duplicated(keep=False).to_numpy()
+        return mask if mask.any() else None
+
+
+def _has_kind(column: pd.Series, kind: str) -> bool:
+    """Whether a column has a dtype of the given kind"""
+    if kind == "string":
+        return (
+            pd.api.types.is_string_dtype(column.dtype)
+            or pd.api.types.is_object_dtype(column.dtype)
+            or isinstance(column.dtype, pd.CategoricalDtype)
+        )
+    if kind == "integer":
+        return pd.api.types.is_integer_dtype(column.dtype)
+    if kind == "float":
+        return pd.api.types.is_float_dtype(column.dtype)
+    raise ValueError(f"Unknown dtype kind: {kind}")
+
+
+def _outside(column: pd.Series, bounds: Tuple[float, float]) -> Optional[np.ndarray]:
+    """Mask of the rows outside the inclusive bounds, None if there are none;
+    missing values are not outside"""
+    values = column.to_numpy()
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        # Reported by the dtype check
+        return None
+    mask = (values < bounds[0]) | (values > bounds[1])
+    return mask if mask.any() else None
+
+
+# Schema of the cleaned data of the package
+CLEANED_SCHEMA = Schema(
+    dtypes={
+        "unit": "string",
+        "sex": "string",
+        "age": "string",
+        "region": "string",
+        "year": "integer",
+        "value": "float",
+    },
+    codes={
+        "unit": tuple(UNIT_CATEGORIES),
+        "sex": tuple(SEX_CATEGORIES),
+        "age": tuple(AGE_CATEGORIES),
+    },
+    years=(1900, 2100),
+    values=(0.0, 125.0),
+    keys=("unit", "sex", "age", "region", "year"),
+)